@@ -3,9 +3,11 @@ import types
 import importlib
 import sys
 import os
+import time
+from typing import Callable
 from .log import get_logger
 from .config import load_config
-from .main_cli import cli
+from . import main_cli
 
 # Add CWD to path to allow import of local extensions
 sys.path.append(os.getcwd())
@@ -15,6 +17,10 @@ _std_extensions = [
     "artisan_tools.version",
     "artisan_tools.parser",
     "artisan_tools.container",
+    "artisan_tools.daemon",
+    "artisan_tools.batch",
+    "artisan_tools.multi",
+    "artisan_tools.debug",
 ]
 
 
@@ -23,14 +29,21 @@ class App:
     Artisan Tools Application.
     """
 
-    def __init__(self):
+    def __init__(self, config_dir: str | None = None):
         """
         Artisan Tools Application.
+
+        Args:
+        config_dir: Directory containing artisan.yaml, defaults to the current
+            directory.
         """
-        self.cli = cli
-        self.extensions = {}
+        self.cli = main_cli.factory()
+        self.extensions: dict[str, object] = {}
+        self.hooks: dict[str, Callable] = {}
+        self.setup_times: dict[str, float] = {}
+        self.cleanups: list[Callable[[], None]] = []
         self.logger = get_logger("App")
-        self.config = load_config()
+        self.config = load_config(config_dir)
 
     def load_extensions(self):
         """
@@ -49,6 +62,17 @@ class App:
         self.cli.add_typer(cli)
         self.logger.debug(f"Added sub-cli: {cli}")
 
+    def add_command(self, command: Callable, name: str | None = None):
+        """
+        Add a top level command to this app.
+
+        Args:
+        command: The function implementing the command.
+        name: The name of the command, defaults to the function name.
+        """
+        self.cli.command(name=name)(command)
+        self.logger.debug(f"Added command: {name or command.__name__}")
+
     def register_extension(self, name: str, extension: object | dict) -> None:
         """
         Register a extension with this app.
@@ -62,6 +86,44 @@ class App:
         self.extensions[name] = extension
         self.logger.debug(f"Registered extension: {name}: {extension}")
 
+    def register_hook(self, name: str, hook: Callable) -> None:
+        """
+        Register a version hook with this app.
+
+        The hook can then be used as `method` in `bump-hooks` and
+        `update-hooks`. It is called with `new_version` and the remaining
+        entries of the hook configuration as keyword arguments.
+
+        Args:
+        name: The name used as `method` in the configuration.
+        hook: The function implementing the hook.
+        """
+        self.hooks[name] = hook
+        self.logger.debug(f"Registered hook: {name}: {hook}")
+
+    def register_cleanup(self, cleanup: Callable[[], None]) -> None:
+        """
+        Register a function to call when the app is closed.
+
+        Extensions use this to release resources kept for the lifetime of the
+        app, e.g. connections. Cleanups are called in reverse order.
+
+        Args:
+        cleanup: The function to call, without arguments.
+        """
+        self.cleanups.append(cleanup)
+
+    def close(self) -> None:
+        """
+        Call the registered cleanups, errors are logged.
+        """
+        while self.cleanups:
+            cleanup = self.cleanups.pop()
+            try:
+                cleanup()
+            except Exception as error:
+                self.logger.warning(f"Cleanup {cleanup} failed: {error}")
+
     def get_extension(self, name: str) -> object:
         """
         Get an extension by name.
@@ -85,5 +147,7 @@ class App:
         Args:
         extension: The name of the extension to load.
         """
+        start = time.perf_counter()
         ext = importlib.import_module(extension)
         ext.setup(self)
+        self.setup_times[extension] = time.perf_counter() - start
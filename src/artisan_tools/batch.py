@@ -0,0 +1,153 @@
+"""
+Run a sequence of commands in one process.
+
+All steps share the application: configuration and extensions are loaded
+once, caches (e.g. remote tags) are reused and a container registry login
+made by one step is kept until the last step has run.
+"""
+
+import contextlib
+import shlex
+import sys
+import time
+import typing
+
+import click
+import typer
+from rich import print as rprint
+
+from artisan_tools.app import App
+
+
+def read_steps(lines: typing.Iterable[str]) -> list[list[str]]:
+    """
+    Parse steps, one command per line.
+
+    Empty lines and lines starting with '#' are ignored. Lines are split like
+    a shell command line.
+
+    Args:
+    lines: The lines, e.g. of a batch file.
+
+    Returns:
+    list: The arguments of each step.
+    """
+    steps = []
+    for line in lines:
+        line = line.strip()
+        if line and not line.startswith("#"):
+            steps.append(shlex.split(line))
+    return steps
+
+
+def run_step(command: click.Command, argv: list[str]) -> int:
+    """
+    Run a single step.
+
+    Args:
+    command: The top level command of the application.
+    argv: The arguments of the step.
+
+    Returns:
+    int: The exit code of the step.
+    """
+    if argv[:1] == ["run"]:
+        rprint("[bold red]Steps can't use the run command.", file=sys.stderr)
+        return 2
+    try:
+        command.main(args=argv, prog_name="at", standalone_mode=True)
+    except SystemExit as error:
+        if error.code is None or isinstance(error.code, int):
+            return error.code or 0
+        print(error.code, file=sys.stderr)
+        return 1
+    except Exception as error:
+        rprint(f"[bold red]{type(error).__name__}: {error}", file=sys.stderr)
+        return 1
+    return 0
+
+
+def run_steps(
+    app: App, steps: list[list[str]], keep_going: bool = False
+) -> list[tuple[list[str], int | None, float]]:
+    """
+    Run steps against one application.
+
+    Args:
+    app: The application object.
+    steps: The arguments of each step.
+    keep_going: Run the remaining steps after a step failed.
+
+    Returns:
+    list: (arguments, exit code, duration in seconds) for each step. The exit
+        code is None for steps skipped after a failure.
+    """
+    # Newer versions of typer bundle their own copy of click:
+    command = typing.cast(click.Command, typer.main.get_command(app.cli))
+    results: list[tuple[list[str], int | None, float]] = []
+    with contextlib.ExitStack() as stack:
+        if "container" in app.extensions:
+            container = app.get_extension("container")
+            stack.enter_context(container.keep_login(app))  # type: ignore[attr-defined]
+        failed = False
+        for argv in steps:
+            if failed and not keep_going:
+                results.append((argv, None, 0.0))
+                continue
+            start = time.perf_counter()
+            code = run_step(command, argv)
+            results.append((argv, code, time.perf_counter() - start))
+            failed = failed or code != 0
+    return results
+
+
+def setup(app: App):
+    """
+    Set up the run command.
+    """
+
+    def run(
+        steps: typing.List[str] = typer.Argument(  # noqa: B008
+            None, help="Commands to run, e.g. 'version verify --check-tag'."
+        ),
+        batch: str = typer.Option(  # noqa: B008
+            None,
+            "--batch",
+            help="File with one command per line, '-' to read from stdin.",
+        ),
+        keep_going: bool = typer.Option(  # noqa: B008
+            False, help="Run the remaining steps after a step failed."
+        ),
+    ):
+        """
+        Run several commands in one process.
+
+        Example: ``at run "version update" "version verify --check-tag"
+          "vcs add-tag"``
+        """
+        parsed = read_steps(steps or [])
+        if batch == "-":
+            parsed += read_steps(sys.stdin)
+        elif batch is not None:
+            with open(batch, "r") as file:
+                parsed += read_steps(file)
+
+        results = run_steps(app, parsed, keep_going)
+
+        rprint("Steps:", file=sys.stderr)
+        for argv, code, duration in results:
+            step = shlex.join(argv)
+            if code is None:
+                rprint(f"[yellow]  skipped  {step}", file=sys.stderr)
+            elif code == 0:
+                rprint(f"[green]  ok       {step} ({duration:.2f}s)", file=sys.stderr)
+            else:
+                rprint(
+                    f"[bold red]  failed   {step} ({duration:.2f}s, exit code {code})",
+                    file=sys.stderr,
+                )
+        codes = [code for _, code, _ in results if code]
+        if codes:
+            raise typer.Exit(code=codes[0])
+
+    app.add_command(run, name="run")
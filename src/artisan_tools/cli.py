@@ -1,13 +1,48 @@
-from artisan_tools.app import App
+import os
+import sys
+
+from artisan_tools import client
+
+PROFILE_VAR = "ARTISAN_PROFILE_IMPORTS"
 
 
 def run():
     """
     Run the CLI.
+
+    Commands are forwarded to the daemon for the current directory if one is
+    running, otherwise they are run in-process. With ARTISAN_PROFILE_IMPORTS
+    set, the command is run in-process and a start-up profile is reported.
     """
+    argv = sys.argv[1:]
+    profile = os.environ.get(PROFILE_VAR)
+    if profile and "importtime" not in sys._xoptions:
+        # Run again in an interpreter measuring import times:
+        from artisan_tools.debug.main import profile_startup, format_profile
+
+        result = profile_startup(argv)
+        sys.stdout.write(result["stdout"])
+        sys.stderr.write(result["stderr"])
+        print(format_profile(result), file=sys.stderr)
+        sys.exit(result["returncode"])
+
+    if argv[:1] != ["daemon"] and not profile:
+        code = client.forward(argv, os.getcwd())
+        if code is not None:
+            sys.exit(code)
+
+    from artisan_tools.app import App
+
     app = App()
     app.load_extensions()
-    return app.cli()
+    if profile:
+        from artisan_tools.debug.main import report_setup_times
+
+        report_setup_times(app.setup_times)
+    try:
+        return app.cli()
+    finally:
+        app.close()
 
 
 if __name__ == "__main__":
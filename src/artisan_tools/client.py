@@ -0,0 +1,148 @@
+"""
+Client for the artisan daemon.
+
+Only the standard library is imported here, so forwarding a command to a
+running daemon doesn't pay for importing and setting up the application.
+
+Protocol: the client sends a 4 byte length followed by a JSON request. With a
+command request the standard streams (fds 0, 1 and 2) are passed along with
+the length, the daemon runs the command writing directly to them and replies
+with the exit code as a 4 byte signed integer.
+"""
+
+import hashlib
+import json
+import os
+import socket
+import struct
+import sys
+
+DISABLE_VAR = "ARTISAN_NO_DAEMON"
+
+LENGTH = struct.Struct("!I")
+EXIT_CODE = struct.Struct("!i")
+
+
+def socket_path(directory: str | None = None) -> str:
+    """
+    Get the path of the daemon socket for a project directory.
+
+    The socket is placed in the user's runtime directory or the temporary
+    directory and the name includes the user id and a hash of the directory.
+
+    Args:
+    directory: The project directory, defaults to the current directory.
+
+    Returns:
+    str: The socket path.
+    """
+    directory = os.path.realpath(directory or os.getcwd())
+    digest = hashlib.sha1(directory.encode()).hexdigest()[:16]
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR") or os.environ.get("TMPDIR", "/tmp")
+    return os.path.join(runtime_dir, f"artisan-{os.getuid()}-{digest}.sock")
+
+
+def recv_exact(sock: socket.socket, size: int) -> bytes | None:
+    """
+    Receive exactly size bytes, None if the connection is closed before.
+    """
+    data = b""
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            return None
+        data += chunk
+    return data
+
+
+def connect(directory: str | None = None) -> socket.socket | None:
+    """
+    Connect to the daemon for a project directory.
+
+    Returns:
+    socket: The connected socket or None if no daemon is running (or the
+        socket is not owned by the current user).
+    """
+    if not hasattr(socket, "send_fds"):
+        return None
+    path = socket_path(directory)
+    try:
+        if os.stat(path).st_uid != os.getuid():
+            return None
+    except OSError:
+        return None
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(path)
+    except OSError:
+        sock.close()
+        return None
+    return sock
+
+
+def send_request(sock: socket.socket, request: dict, fds: tuple[int, ...] = ()) -> None:
+    """
+    Send a request, passing file descriptors along with it.
+    """
+    body = json.dumps(request).encode()
+    socket.send_fds(sock, [LENGTH.pack(len(body))], list(fds))
+    sock.sendall(body)
+
+
+def forward(argv: list[str], directory: str | None = None) -> int | None:
+    """
+    Run a command in the daemon.
+
+    Args:
+    argv: The command line arguments (without program name).
+    directory: The project directory, defaults to the current directory.
+
+    Returns:
+    int: The exit code of the command or None if no daemon is running, in
+        which case the command must be run in-process.
+    """
+    if os.environ.get(DISABLE_VAR):
+        return None
+    fds = (0, 1, 2)
+    try:
+        for fd in fds:
+            os.fstat(fd)
+    except OSError:
+        return None
+
+    sock = connect(directory)
+    if sock is None:
+        return None
+
+    with sock:
+        sys.stdout.flush()
+        sys.stderr.flush()
+        request = {"command": "run", "argv": argv, "env": dict(os.environ)}
+        try:
+            send_request(sock, request, fds)
+        except OSError:
+            # Nothing has run yet:
+            return None
+        response = recv_exact(sock, EXIT_CODE.size)
+
+    if response is None:
+        print("artisan daemon closed the connection", file=sys.stderr)
+        return 1
+    return EXIT_CODE.unpack(response)[0]
+
+
+def stop(directory: str | None = None) -> bool:
+    """
+    Stop the daemon for a project directory.
+
+    Returns:
+    bool: True if a daemon was running.
+    """
+    sock = connect(directory)
+    if sock is None:
+        return False
+    with sock:
+        send_request(sock, {"command": "stop"})
+        recv_exact(sock, EXIT_CODE.size)
+    return True
@@ -1,8 +1,15 @@
-from . import cli
+from . import api, cli
 
 
 def setup(app):
     """
     Setup the version module.
     """
+    # Also used by the run command, to keep one login for all steps:
+    app.register_extension("container", api)
+
+    if app.config["container"]["isolated-credentials"]:
+        api.enable_isolated_credentials()
+        app.register_cleanup(api.disable_isolated_credentials)
+
     app.add_cli(cli.factory(app))
@@ -0,0 +1,184 @@
+"""
+Asynchronous variants of the container engine commands in `main`.
+
+Commands are run with `asyncio.create_subprocess_exec`, so many images can be
+tagged, pushed or built concurrently from one event loop.
+"""
+
+import asyncio
+import subprocess
+import uuid
+
+from typing import List
+
+from artisan_tools import error, trace
+
+from .main import check_login as _check_login_file
+from .main import engine_env, logger
+
+
+async def check_login(registry: str, engine: str = "docker") -> bool:
+    """
+    Check if the user is logged in to a container registry using CLI.
+
+    See `main.check_login`.
+    """
+    if engine != "podman":
+        # Docker stores logins in its configuration file, no command is run:
+        return _check_login_file(registry, engine)
+
+    out = await trace.arun(
+        ["podman", "login", "--get-login", registry],
+        text=True,
+        capture_output=True,
+        env=engine_env(),
+    )
+    if out.returncode == 0:
+        return True
+    elif out.returncode == 125 and "not logged in" in out.stderr:
+        return False
+    else:
+        raise RuntimeError(f"Failed to check login status: {out.stderr}")
+
+
+async def login(
+    username: str,
+    token: str,
+    registry: str = "https://index.docker.io/v1",
+    engine: str = "docker",
+    options: tuple = (),
+) -> bool:
+    """
+    Log in to a container registry using CLI.
+
+    See `main.login`.
+
+    Returns:
+    bool: True if logged in, False if already logged in.
+    """
+    logger.debug(f"Logging in to {registry} using {engine} and username {username}")
+
+    if await check_login(registry, engine):
+        return False
+
+    try:
+        await trace.arun(
+            [engine, "login", registry, "-u", username, "--password-stdin"]
+            + list(options),
+            input=token,
+            text=True,
+            capture_output=True,
+            check=True,
+            env=engine_env(),
+        )
+    except subprocess.CalledProcessError as e:
+        print(f"Failed to log in to {registry}: {e.stderr}")
+        raise
+
+    return True
+
+
+async def logout(
+    registry: str = "https://index.docker.io/v1",
+    engine: str = "docker",
+    options: tuple = (),
+) -> None:
+    """
+    Log out of container registry using CLI.
+    """
+    try:
+        await trace.arun(
+            [engine, "logout", registry] + list(options),
+            text=True,
+            capture_output=True,
+            check=True,
+            env=engine_env(),
+        )
+    except subprocess.CalledProcessError as e:
+        print(f"Failed to log out of {registry}: {e.stderr}")
+        raise
+
+
+async def push(
+    source: str, target: str, engine: str = "docker", options: tuple = ()
+) -> None:
+    """
+    Tag and push a container image to registry.
+
+    Args:
+        source: The source image to push, can contain tags.
+        target: The target image to push to, must not include tags.
+        engine: The container engine to use. Default is 'docker'.
+        options: Additional options to pass to the push command.
+    """
+    try:
+        await trace.arun([engine, "tag", source, target], check=True, env=engine_env())
+    except subprocess.CalledProcessError as e:
+        print(f"Failed to tag image: {e.output}")
+        raise
+
+    try:
+        await trace.arun(
+            [engine, "push", target] + list(options), check=True, env=engine_env()
+        )
+    except subprocess.CalledProcessError as e:
+        print(f"Failed to push image: {e.output}")
+        raise
+
+
+async def build_push(
+    repository: str,
+    tags: List[str],
+    platforms: tuple[str, ...] = ("linux/amd64",),
+    context: str = ".",
+    options: tuple[str, ...] = (),
+):
+    """
+    Build and push a multi-arch container image to a registry using docker buildx.
+
+    See `main.build_push`, every build uses its own builder instance, so
+    builds can run concurrently.
+
+    Raises:
+        error.ExternalError: If the build and push process fails.
+    """
+    builder_name = "at-" + str(uuid.uuid4())
+    args = ["--push"] if tags else []
+    try:
+        await trace.arun(
+            [
+                "docker",
+                "buildx",
+                "create",
+                "--name",
+                builder_name,
+                "--driver=docker-container",
+                "--driver-opt=network=host",
+            ],
+            check=True,
+            env=engine_env(),
+        )
+        await trace.arun(
+            [
+                "docker",
+                "buildx",
+                "build",
+                f"--builder={builder_name}",
+                f"--platform={','.join(platforms)}",
+                *[f"-t={repository}:{tag}" for tag in tags],
+                *options,
+                *args,
+                context,
+            ],
+            check=True,
+            env=engine_env(),
+        )
+    except subprocess.CalledProcessError as e:
+        raise error.ExternalError("Failed to build and push image", e.returncode) from e
+    finally:
+        # Remove builder, also when the task is cancelled:
+        await asyncio.shield(
+            trace.arun(
+                ["docker", "buildx", "rm", builder_name], check=True, env=engine_env()
+            )
+        )
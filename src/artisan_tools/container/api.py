@@ -3,35 +3,51 @@ from .main import logout as logout_main
 from .main import push as push_main
 from .main import build_push as build_push_main
 from .main import check_login as check_login_main
+from .main import disable_isolated_credentials  # noqa: F401
+from .main import enable_isolated_credentials  # noqa: F401
+from .main import engine_env, logger
 
 from artisan_tools.utils import get_item, get_env_var
 from artisan_tools.app import App
+from artisan_tools import error, metrics, trace
 
-import subprocess
-from contextlib import contextmanager
-from typing import List
+import os
+import weakref
+from contextlib import asynccontextmanager, contextmanager
+from typing import Iterable, List
 
+_login_seconds = metrics.histogram(
+    "artisan_container_login_seconds", "Time to log in to registries", ["registry"]
+)
+_push_seconds = metrics.histogram(
+    "artisan_container_push_seconds", "Time to push images", ["registry"]
+)
+_build_seconds = metrics.histogram(
+    "artisan_container_build_seconds",
+    "Time to build (and push) images",
+    ["platforms"],
+)
 
-def login(app):
-    """
-    Login to container registry as specified in the configuration file.
+# Login state by app, shared by nested `authorized_registry` blocks:
+_sessions: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+# Engine API client by app, None when the CLI is used:
+_clients: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+# Registry API clients by app and registry:
+_registries: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+# Content hashes by app and build context, see `content_hash`:
+_content_hashes: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
 
-    When `auth == direct`, use the `user` and `token` directly.
-    When `auth == env`, use the environment variables specified in `user` and `token`
+# Number of hex digits of the content hash used in tags:
+CONTENT_HASH_LENGTH = 16
 
-    Returns
-    -------
-    bool
-        True if login was successful, False otherwise.
-    """
-    config = app.config["container"]
-    registry = get_item(config, "registry", "registry")
-    engine = get_item(config, "engine", "container engine")
+# Above this number of tags, `check_no_tag` fetches the tag list once:
+TAG_LIST_THRESHOLD = 20
 
-    # Check if already logged in:
-    if check_login_main(registry, engine):
-        return False
 
+def _credentials(config: dict) -> tuple[str, str]:
+    """
+    Get the username and token for the registry login from the configuration.
+    """
     auth = config["auth"]
     match auth["method"]:
         case "direct":
@@ -55,15 +71,103 @@ def login(app):
                 "Error, invalid value for auth method, should be 'direct' or 'env'"
             )
 
+    return user, token
+
+
+def engine_client(app: App):
+    """
+    Get the engine API client of the app, per the `backend` configuration.
+
+    The client is created on first use and closed when the app is closed.
+    Without an auth method, the CLI is used with the credentials of its own
+    login.
+
+    Returns:
+    engine.EngineClient: The client or None if the CLI is to be used.
+
+    Raises:
+    error.ExternalError: If backend is 'api' and the engine isn't reachable.
+    """
+    if app in _clients:
+        return _clients[app]
+
+    from . import engine as engine_api
+
+    config = app.config["container"]
+    backend = config.get("backend") or "cli"
+    if backend not in engine_api.BACKENDS:
+        raise ValueError(
+            f"Error, invalid container backend {backend}, should be one of "
+            f"{', '.join(engine_api.BACKENDS)}"
+        )
+
+    client = None
+    if backend != "cli" and config["auth"]["method"] is None:
+        # Credentials of a previous CLI login are stored by the CLI (config
+        # file or credential helper), the engine can't read them:
+        logger.debug("No container auth method configured, using the CLI")
+    elif backend != "cli":
+        path = config.get("socket") or engine_api.default_socket(
+            get_item(config, "engine", "container engine")
+        )
+        client = engine_api.EngineClient(path) if path else None
+        if client is None or not client.ping():
+            if backend == "api":
+                raise error.ExternalError(
+                    f"Container engine API not reachable at {path}", 1
+                )
+            # Fall back to the CLI:
+            client = None
+        else:
+            app.register_cleanup(client.close)
+    _clients[app] = client
+    return client
+
+
+def _registry_auth(config: dict, client) -> dict:
+    """
+    Log in to the registry of the configuration with the engine API.
+
+    Returns:
+    dict: The registry auth for `engine.EngineClient.push`.
+    """
+    user, token = _credentials(config)
+    registry = get_item(config, "registry", "registry")
+    return client.login(user, token, registry)
+
+
+def login(app):
+    """
+    Login to container registry as specified in the configuration file.
+
+    When `auth == direct`, use the `user` and `token` directly.
+    When `auth == env`, use the environment variables specified in `user` and `token`
+
+    Returns
+    -------
+    bool
+        True if login was successful, False otherwise.
+    """
+    config = app.config["container"]
+    registry = get_item(config, "registry", "registry")
+    engine = get_item(config, "engine", "container engine")
+
+    # Check if already logged in:
+    if check_login_main(registry, engine):
+        return False
+
+    user, token = _credentials(config)
+
     options = get_item(config, "options", "options")
 
-    logged_in = login_main(
-        username=user,
-        token=token,
-        registry=registry,
-        engine=engine,
-        options=options,
-    )
+    with _login_seconds.time(registry=registry):
+        logged_in = login_main(
+            username=user,
+            token=token,
+            registry=registry,
+            engine=engine,
+            options=options,
+        )
 
     return logged_in
 
@@ -83,16 +187,165 @@ def logout(app):
 
 
 @contextmanager
-def authorized_registry(app):
+def _session(app, authorize: bool):
     """
-    Context manager for running commands with access to container registry.
+    Count users of the registry login, logging out when the last one exits.
     """
-    logged_in = login(app)
+    session = _sessions.setdefault(app, {"users": 0, "logged_in": None})
+    session["users"] += 1
     try:
+        if authorize and session["logged_in"] is None:
+            session["logged_in"] = login(app)
         yield
     finally:
-        if logged_in:
-            logout(app)
+        session["users"] -= 1
+        if session["users"] == 0:
+            if session["logged_in"]:
+                logout(app)
+            session["logged_in"] = None
+
+
+@contextmanager
+def authorized_registry(app):
+    """
+    Context manager for running commands with access to container registry.
+
+    Nested blocks (also within `keep_login`) share one login, which is made
+    by the first block and logged out when the outermost block exits.
+    """
+    with _session(app, authorize=True):
+        yield
+
+
+@contextmanager
+def keep_login(app):
+    """
+    Keep a registry login made within the block until the block exits.
+
+    No login is made if no command within the block needs the registry.
+    """
+    with _session(app, authorize=False):
+        yield
+
+
+def content_hash(app: App, context: str = ".", dockerfile: str | None = None) -> str:
+    """
+    Get the content hash of a build context, for the `@contenthash` tag.
+
+    The hash is computed once per app, context and Dockerfile, see
+    `contenthash.context_hash`.
+
+    Args:
+    app: The application instance.
+    context: The build context directory.
+    dockerfile: The Dockerfile, defaults to 'Dockerfile' in the context.
+
+    Returns:
+    str: The first `CONTENT_HASH_LENGTH` digits of the hash.
+    """
+    from .contenthash import context_hash
+
+    hashes = _content_hashes.setdefault(app, {})
+    key = (os.path.abspath(context), dockerfile and os.path.abspath(dockerfile))
+    if key not in hashes:
+        hashes[key] = context_hash(context, dockerfile)[:CONTENT_HASH_LENGTH]
+    return hashes[key]
+
+
+def _dockerfile_option(options: Iterable[str]) -> str | None:
+    """
+    Get the Dockerfile given by build options, `--file` or `-f`.
+
+    Returns:
+    str: The path of the last Dockerfile option, None if there is none.
+    """
+    dockerfile = None
+    arguments = iter(options)
+    for argument in arguments:
+        if argument in ("--file", "-f"):
+            dockerfile = next(arguments, None)
+        elif argument.startswith("--file="):
+            dockerfile = argument.removeprefix("--file=")
+        elif argument.startswith("-f"):
+            dockerfile = argument[2:].removeprefix("=")
+    return dockerfile
+
+
+def registry_client(app: App, registry: str):
+    """
+    Get the registry API client of the app for a registry.
+
+    The credentials of the configuration are used for the configured
+    registry, other registries are accessed anonymously. The client is
+    closed when the app is closed.
+
+    Returns:
+    registry.Registry: The client.
+    """
+    from .registry import Registry
+
+    clients = _registries.setdefault(app, {})
+    if registry not in clients:
+        config = app.config["container"]
+        username = password = None
+        if registry == config["registry"] and config["auth"]["method"] is not None:
+            username, password = _credentials(config)
+        clients[registry] = Registry(registry, username, password)
+        app.register_cleanup(clients[registry].close)
+    return clients[registry]
+
+
+def check_no_tag(
+    app: App,
+    repository: str,
+    tags: List[str],
+    list_threshold: int = TAG_LIST_THRESHOLD,
+) -> List[str]:
+    """
+    Check that tags don't exist in a repository of a container registry.
+
+    Up to `list_threshold` tags are checked with concurrent manifest
+    requests, for more tags the tag list of the repository is fetched once.
+
+    Args:
+        app: The application instance.
+        repository: The repository, e.g. 'ghcr.io/user/image', without tag.
+        tags: The tags to check. Tags will be parsed by the parser extension.
+        list_threshold: Maximum number of tags checked one by one.
+
+    Returns:
+        List of the (parsed) tags that already exist.
+
+    Raises:
+        ValueError: If the repository contains a tag.
+        error.ExternalError: If the registry can't be queried.
+    """
+    from .registry import split_repository
+
+    targets = _push_targets(app, repository, tags)
+    parsed_tags = [target.rsplit(":", 1)[1] for target in targets]
+    registry, path = split_repository(repository)
+    client = registry_client(app, registry)
+
+    if len(set(parsed_tags)) > list_threshold:
+        existing = set(client.list_tags(path))
+        return [tag for tag in parsed_tags if tag in existing]
+    exists = client.tags_exist(path, parsed_tags)
+    return [tag for tag in parsed_tags if exists[tag]]
+
+
+def _push_targets(app: App, target: str, tags: List[str]) -> List[str]:
+    """
+    Get the images to push to, the target with each parsed tag.
+    """
+    # Check that target doesn't contain tags, that is no colons after
+    # the last slash:
+    if target.split("/")[-1].count(":") > 0:
+        raise ValueError("Error, target image must not contain tags")
+
+    # Parse tags:
+    parser = app.get_extension("parser")
+    return [target + ":" + parser.parse(app, tag) for tag in tags]  # type: ignore[attr-defined]
 
 
 def push(app: App, source: str, target: str, tags: List[str]) -> None:
@@ -100,7 +353,8 @@ def push(app: App, source: str, target: str, tags: List[str]) -> None:
     Push a Docker image to a container registry.
 
     Logging in/out is handled automatically using with details from the
-    configuration file.
+    configuration file. With the engine API backend (see `engine_client`),
+    the images are tagged and pushed over the API socket instead.
 
     Args:
         app: The application instance.
@@ -112,27 +366,38 @@ def push(app: App, source: str, target: str, tags: List[str]) -> None:
     Raises:
         ValueError: If the target image contains tags.
     """
-    # Check that target doesn't contain tags, that is no colons after
-    # the last slash:
-    if target.split("/")[-1].count(":") > 0:
-        raise ValueError("Error, target image must not contain tags")
+    from .registry import split_repository
 
-    # Parse tags:
-    parser = app.get_extension("parser")
-    targets = [target + ":" + parser.parse(app, tag) for tag in tags]  # type: ignore[attr-defined]
+    targets = _push_targets(app, target, tags)
 
     config = app.config["container"]
     engine = get_item(config, "engine", "container engine")
     options = get_item(config, "options", "options")
 
+    client = engine_client(app)
+    if client is not None:
+        from .engine import print_progress
+
+        if client.inspect_image(source) is None:
+            raise error.ExternalError(f"Image {source} does not exist locally", 1)
+        # Credentials are passed with each push, the engine keeps no login:
+        auth = _registry_auth(config, client)
+        for target in targets:
+            with _push_seconds.time(registry=split_repository(target)[0]):
+                client.tag(source, target)
+                client.push(target, auth, progress=print_progress)
+            print(f"Successfully pushed {source} to {target}")
+        return
+
     with authorized_registry(app):
         for target in targets:
-            push_main(
-                source=source,
-                target=target,
-                engine=engine,
-                options=options,
-            )
+            with _push_seconds.time(registry=split_repository(target)[0]):
+                push_main(
+                    source=source,
+                    target=target,
+                    engine=engine,
+                    options=options,
+                )
             print(f"Successfully pushed {source} to {target}")
 
 
@@ -143,10 +408,16 @@ def build_push(
     platforms: tuple[str, ...] = ("linux/amd64",),
     context: str = ".",
     options: tuple[str, ...] = (),
-) -> None:
+    avoid_rebuild: bool | None = None,
+) -> bool:
     """
     Build and push a container image.
 
+    With build avoidance, the build is skipped if the image tagged with the
+    (first) tag containing `@contenthash` exists in the registry. The other
+    tags are added to that image instead. The hash covers the build context
+    only, include build arguments or platforms in the tags if they vary.
+
     Args:
         app: The application instance.
         repository: The repository to push to.
@@ -155,19 +426,52 @@ def build_push(
         platforms: List of platforms to build for. Default is linux/amd64.
         context : The build context. Default is current directory.
         options : Additional options to pass to the build command.
+        avoid_rebuild: Use build avoidance, defaults to the `build-avoidance`
+            configuration.
+
+    Returns:
+        True if the image was built, False if the build was avoided.
     """
     # Parse tags:
     parser = app.get_extension("parser")
-    parsed_tags = [parser.parse(app, tag) for tag in tags]  # type: ignore[attr-defined]
+    dockerfile = _dockerfile_option(options)
+    parsed_tags = [
+        parser.parse(  # type: ignore[attr-defined]
+            app, tag, context=context, dockerfile=dockerfile
+        )
+        for tag in tags
+    ]
+
+    if avoid_rebuild is None:
+        avoid_rebuild = app.config["container"]["build-avoidance"]
+    hash_tags = [p for t, p in zip(tags, parsed_tags) if "@contenthash" in t]
+    if avoid_rebuild and hash_tags:
+        from .registry import split_repository
+
+        registry, path = split_repository(repository)
+        client = registry_client(app, registry)
+        if client.tag_exists(path, hash_tags[0]):
+            for tag in dict.fromkeys(parsed_tags):
+                if tag != hash_tags[0]:
+                    client.tag(path, hash_tags[0], tag)
+            print(
+                f"Image {repository}:{hash_tags[0]} exists, skipped build and "
+                f"tagged it with {', '.join(parsed_tags)}"
+            )
+            return False
+    elif avoid_rebuild and tags:
+        logger.warning("Build avoidance needs a tag with @contenthash, building")
 
     with authorized_registry(app):
-        build_push_main(
-            repository=repository,
-            tags=parsed_tags,
-            platforms=platforms,
-            context=context,
-            options=options,
-        )
+        with _build_seconds.time(platforms=",".join(platforms)):
+            build_push_main(
+                repository=repository,
+                tags=parsed_tags,
+                platforms=platforms,
+                context=context,
+                options=options,
+            )
+    return True
 
 
 def run_command_with_auth(app, command: str):
@@ -178,4 +482,143 @@ def run_command_with_auth(app, command: str):
     the shell command (and log out again).
     """
     with authorized_registry(app):
-        subprocess.run(command, shell=True, check=True)
+        trace.run(command, shell=True, check=True, env=engine_env())
+
+
+async def alogin(app) -> bool:
+    """
+    Asynchronous variant of `login`.
+    """
+    # Imported on use, asyncio adds noticeably to the start-up time:
+    from . import aio
+
+    config = app.config["container"]
+    registry = get_item(config, "registry", "registry")
+    engine = get_item(config, "engine", "container engine")
+
+    if await aio.check_login(registry, engine):
+        return False
+
+    user, token = _credentials(config)
+
+    options = get_item(config, "options", "options")
+
+    with _login_seconds.time(registry=registry):
+        return await aio.login(
+            username=user,
+            token=token,
+            registry=registry,
+            engine=engine,
+            options=options,
+        )
+
+
+async def alogout(app) -> None:
+    """
+    Asynchronous variant of `logout`.
+    """
+    from . import aio
+
+    config = app.config["container"]
+    registry = get_item(config, "registry", "registry")
+    engine = get_item(config, "engine", "container engine")
+
+    await aio.logout(registry=registry, engine=engine)
+
+
+def _async_lock(session: dict):
+    import asyncio
+
+    # One lock per event loop, a lock can't be shared between loops:
+    locks = session.setdefault("locks", weakref.WeakKeyDictionary())
+    return locks.setdefault(asyncio.get_running_loop(), asyncio.Lock())
+
+
+@asynccontextmanager
+async def aauthorized_registry(app):
+    """
+    Asynchronous variant of `authorized_registry`.
+
+    Concurrent tasks share one login: the first task logs in while the others
+    wait for it, and the last task to exit logs out. Blocks nested within
+    `authorized_registry` or `keep_login` use the login of the outer block.
+    """
+    session = _sessions.setdefault(app, {"users": 0, "logged_in": None})
+    session["users"] += 1
+    lock = _async_lock(session)
+    try:
+        async with lock:
+            if session["logged_in"] is None:
+                session["logged_in"] = await alogin(app)
+        yield
+    finally:
+        session["users"] -= 1
+        if session["users"] == 0:
+            # Hold the lock, so a task entering now logs in after the logout:
+            async with lock:
+                if session["users"] == 0 and session["logged_in"] is not None:
+                    logged_in, session["logged_in"] = session["logged_in"], None
+                    if logged_in:
+                        await alogout(app)
+
+
+async def apush(app: App, source: str, target: str, tags: List[str]) -> None:
+    """
+    Asynchronous variant of `push`, the tags are pushed concurrently.
+    """
+    import asyncio
+
+    from . import aio
+    from .registry import split_repository
+
+    targets = _push_targets(app, target, tags)
+
+    config = app.config["container"]
+    engine = get_item(config, "engine", "container engine")
+    options = get_item(config, "options", "options")
+
+    async def push_one(target):
+        with _push_seconds.time(registry=split_repository(target)[0]):
+            await aio.push(source=source, target=target, engine=engine, options=options)
+        print(f"Successfully pushed {source} to {target}")
+
+    async with aauthorized_registry(app):
+        await asyncio.gather(*(push_one(target) for target in targets))
+
+
+async def abuild_push(
+    app: App,
+    repository: str,
+    tags: List[str],
+    platforms: tuple[str, ...] = ("linux/amd64",),
+    context: str = ".",
+    options: tuple[str, ...] = (),
+) -> None:
+    """
+    Asynchronous variant of `build_push`.
+    """
+    from . import aio
+
+    parser = app.get_extension("parser")
+    parsed_tags = [
+        parser.parse(app, tag, context=context)  # type: ignore[attr-defined]
+        for tag in tags
+    ]
+
+    async with aauthorized_registry(app):
+        with _build_seconds.time(platforms=",".join(platforms)):
+            await aio.build_push(
+                repository=repository,
+                tags=parsed_tags,
+                platforms=platforms,
+                context=context,
+                options=options,
+            )
+
+
+async def arun_command_with_auth(app, command: str) -> None:
+    """
+    Asynchronous variant of `run_command_with_auth`.
+    """
+    async with aauthorized_registry(app):
+        await trace.arun(command, shell=True, check=True, env=engine_env())
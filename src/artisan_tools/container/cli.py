@@ -59,6 +59,34 @@ def factory(app):
             fg=typer.colors.GREEN,
         )
 
+    @cli.command()
+    def check_no_tag(
+        repository: str = typer.Argument(
+            ..., help="The repository, e.g. ghcr.io/user/image, without tag."
+        ),
+        tags: typing.List[str] = typer.Argument(
+            ..., help="Tags to check. Tags will be parsed by the parser extension."
+        ),
+    ):
+        """
+        Check that tags don't exist in a container registry, e.g. before a build.
+
+        Example: ``check-no-tag ghcr.io/user/test @version @version-short``
+        """
+        try:
+            existing = api.check_no_tag(app, repository, tags)
+        except error.ExternalError as e:
+            typer.secho(f"Error checking tags: {e.args[0]}", fg=typer.colors.RED)
+            raise typer.Exit(code=1)
+        if existing:
+            typer.secho(
+                f"Tags already exist in {repository}: {', '.join(existing)}",
+                fg=typer.colors.RED,
+                bold=True,
+            )
+            raise typer.Exit(code=1)
+        typer.echo(f"No tags exist in {repository}.")
+
     @cli.command()
     def command(command: str):
         """
@@ -99,12 +127,24 @@ def factory(app):
                 "used multiple times"
             ),
         ),
+        avoid_rebuild: typing.Optional[bool] = typer.Option(
+            None,
+            "--avoid-rebuild/--no-avoid-rebuild",
+            help=(
+                "Skip the build if the @contenthash tag exists in the registry."
+                " Default from the build-avoidance configuration."
+            ),
+        ),
     ):
         """
         Build (and push) a container image to a container registry.
 
         Example: ``build-push ghcr.io/user/test tag1 tag2 --platform linux/amd64
           --platform linux/arm64 --option "--file=/path/to/Dockerfile"``
+
+        With ``--avoid-rebuild``, e.g. ``build-push ghcr.io/user/test @contenthash
+        @version --avoid-rebuild`` only tags the existing image if the build
+        context didn't change.
         """
         typer.echo(
             f"Preparing to build an push to {repository} with tags {tags} "
@@ -113,12 +153,24 @@ def factory(app):
         tags = [] if tags is None else tags  # typer does not support [] as default
         try:
             typer.secho("Start build and push")
-            api.build_push(
-                app, repository, tags, tuple(platform), context, tuple(option)
+            built = api.build_push(
+                app,
+                repository,
+                tags,
+                tuple(platform),
+                context,
+                tuple(option),
+                avoid_rebuild,
             )
         except error.ExternalError as e:
             typer.secho("Error building/pushing image", fg=typer.colors.RED)
             raise typer.Exit(code=e.args[1])
+        if not built:
+            typer.secho(
+                f"Image unchanged, tagged {repository} with tags {tags}",
+                fg=typer.colors.GREEN,
+            )
+            return
         typer.secho(
             f"Successfully built and pushed {repository} with tags {tags}",
             fg=typer.colors.GREEN,
@@ -0,0 +1,257 @@
+"""
+Deterministic content hash of a container build context.
+
+The hash covers the files sent to the engine for a build: the context
+directory without the files excluded by .dockerignore, and the Dockerfile.
+Two contexts with the same hash build the same image (for the same build
+arguments), so an image tagged with the hash can be reused instead of
+rebuilt.
+
+File digests are cached by path, modification time, size and inode, so only
+changed files are read again. Files are hashed in parallel.
+"""
+
+import hashlib
+import json
+import os
+import re
+import stat
+import time
+
+from artisan_tools import trace
+from artisan_tools.log import get_logger
+
+logger = get_logger("container")
+
+IGNORE_FILE = ".dockerignore"
+CACHE_VERSION = 1
+
+# Cached digests of files modified this recently are not trusted, a change
+# within the timestamp resolution wouldn't be noticed:
+_RACY_SECONDS = 2
+
+
+def _compile(pattern: str) -> re.Pattern:
+    """
+    Convert a .dockerignore pattern to a regular expression.
+
+    Like Docker, '*' and '?' don't match '/', and '**' matches any number of
+    directories.
+    """
+    regex = ""
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if pattern.startswith("**/", i):
+            regex += "(?:.*/)?"
+            i += 3
+            continue
+        if pattern.startswith("**", i):
+            regex += ".*"
+            i += 2
+            continue
+        if char == "*":
+            regex += "[^/]*"
+        elif char == "?":
+            regex += "[^/]"
+        elif char == "[":
+            end = pattern.find("]", i + 1)
+            if end == -1:
+                regex += re.escape(char)
+            else:
+                regex += f"[{pattern[i + 1 : end]}]"
+                i = end
+        elif char == "\\" and i + 1 < len(pattern):
+            regex += re.escape(pattern[i + 1])
+            i += 1
+        else:
+            regex += re.escape(char)
+        i += 1
+    return re.compile(regex)
+
+
+def read_ignore(context: str = ".") -> list[tuple[bool, re.Pattern]]:
+    """
+    Read the .dockerignore file of a build context.
+
+    Returns:
+    list: Tuples of (exception, pattern) in order, `exception` is True for
+        patterns starting with '!'.
+    """
+    try:
+        with open(os.path.join(context, IGNORE_FILE), "r") as file:
+            lines = [line.strip() for line in file]
+    except FileNotFoundError:
+        return []
+
+    rules = []
+    for line in lines:
+        if not line or line.startswith("#"):
+            continue
+        exception = line.startswith("!")
+        pattern = os.path.normpath(line.removeprefix("!").strip()).lstrip("/")
+        if pattern and pattern != ".":
+            rules.append((exception, _compile(pattern.replace(os.sep, "/"))))
+    return rules
+
+
+def is_ignored(path: str, rules: list[tuple[bool, re.Pattern]]) -> bool:
+    """
+    Check if a path of the context is excluded by .dockerignore rules.
+
+    A pattern matching a directory also matches everything in it. The last
+    matching pattern decides.
+
+    Args:
+    path: The path relative to the context, with '/' as separator.
+    rules: See `read_ignore`.
+    """
+    parts = path.split("/")
+    candidates = ["/".join(parts[:i]) for i in range(1, len(parts) + 1)]
+    ignored = False
+    for exception, pattern in rules:
+        if any(pattern.fullmatch(candidate) for candidate in candidates):
+            ignored = not exception
+    return ignored
+
+
+def list_files(context: str = ".") -> list[str]:
+    """
+    List the entries of a build context, without excluded files.
+
+    Returns:
+    list of str: Paths relative to the context, sorted. Directories end
+        with '/'.
+    """
+    rules = read_ignore(context)
+    # Without exceptions, nothing in an excluded directory can be included:
+    prune = not any(exception for exception, _ in rules)
+    entries = []
+    for root, dirs, files in os.walk(context):
+        base = os.path.relpath(root, context).replace(os.sep, "/")
+        prefix = "" if base == "." else base + "/"
+        kept = []
+        for name in sorted(dirs):
+            path = prefix + name
+            ignored = is_ignored(path, rules)
+            if os.path.islink(os.path.join(root, name)):
+                # Links to directories are copied as links:
+                if not ignored:
+                    entries.append(path)
+            elif not (ignored and prune):
+                kept.append(name)
+                if not ignored:
+                    entries.append(path + "/")
+        dirs[:] = kept
+        entries.extend(
+            prefix + name for name in files if not is_ignored(prefix + name, rules)
+        )
+    return sorted(entries)
+
+
+def _cache_path(context: str) -> str:
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    key = hashlib.sha256(os.path.abspath(context).encode()).hexdigest()[:16]
+    return os.path.join(cache_home, "artisan", f"contenthash-{key}.json")
+
+
+def _load_cache(path: str) -> dict:
+    try:
+        with open(path, "r") as file:
+            cache = json.load(file)
+    except (OSError, ValueError):
+        return {}
+    return cache["files"] if cache.get("version") == CACHE_VERSION else {}
+
+
+def _save_cache(path: str, files: dict) -> None:
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temporary = f"{path}.{os.getpid()}.tmp"
+        with open(temporary, "w") as file:
+            json.dump({"version": CACHE_VERSION, "files": files}, file)
+        os.replace(temporary, path)
+    except OSError as e:
+        logger.warning(f"Failed to write content hash cache {path}: {e}")
+
+
+def _file_digest(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        while chunk := file.read(1 << 20):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def context_hash(
+    context: str = ".",
+    dockerfile: str | None = None,
+    jobs: int | None = None,
+    cache: bool = True,
+) -> str:
+    """
+    Compute the content hash of a build context.
+
+    The hash covers the path, type, executable bit and content of every
+    entry of the context (see `list_files`), and the Dockerfile, also if it
+    is excluded by .dockerignore.
+
+    Args:
+    context: The build context directory.
+    dockerfile: The Dockerfile, defaults to 'Dockerfile' in the context.
+    jobs: Number of files hashed in parallel, defaults to the number of CPUs.
+    cache: Reuse the digests of unchanged files from previous calls.
+
+    Returns:
+    str: The hash, a SHA-256 hex digest.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    dockerfile = dockerfile or os.path.join(context, "Dockerfile")
+    with trace.span("contenthash", context=context):
+        cache_path = _cache_path(context)
+        cached = _load_cache(cache_path) if cache else {}
+        racy = time.time() - _RACY_SECONDS
+
+        entries: dict[str, str] = {}
+        files: dict[str, list] = {}
+        pending = []
+        for path in list_files(context):
+            full_path = os.path.join(context, path)
+            info = os.lstat(full_path)
+            if path.endswith("/"):
+                entries[path] = "dir"
+            elif stat.S_ISLNK(info.st_mode):
+                entries[path] = "link:" + os.readlink(full_path)
+            elif stat.S_ISREG(info.st_mode):
+                mode = "x" if info.st_mode & 0o111 else "f"
+                key = [info.st_mtime_ns, info.st_size, info.st_ino]
+                if cached.get(path, [])[:3] == key:
+                    entries[path] = f"{mode}:{cached[path][3]}"
+                    files[path] = cached[path]
+                else:
+                    pending.append((path, mode, key, info.st_mtime))
+            # Other file types (sockets, devices) aren't sent to the engine.
+
+        with ThreadPoolExecutor(max_workers=jobs or os.cpu_count() or 1) as executor:
+            digests = executor.map(
+                lambda item: _file_digest(os.path.join(context, item[0])), pending
+            )
+            for (path, mode, key, mtime), digest in zip(pending, digests):
+                entries[path] = f"{mode}:{digest}"
+                if mtime < racy:
+                    files[path] = [*key, digest]
+
+        if cache and files != cached:
+            _save_cache(cache_path, files)
+        logger.debug(
+            f"Content hash of {context}: {len(entries)} entries, "
+            f"{len(pending)} files read"
+        )
+
+        total = hashlib.sha256()
+        for path in sorted(entries):
+            total.update(f"{path}\0{entries[path]}\n".encode())
+        if os.path.isfile(dockerfile):
+            total.update(f"\0dockerfile\0{_file_digest(dockerfile)}\n".encode())
+        return total.hexdigest()
@@ -0,0 +1,304 @@
+"""
+Client for the Docker Engine API over a Unix socket.
+
+Podman serves the same (Docker compatible) API. Requests are made over one
+persistent HTTP connection, so tagging and pushing many images doesn't start
+a CLI process per operation.
+"""
+
+import base64
+import codecs
+import http.client
+import json
+import os
+import socket
+import urllib.parse
+from typing import Callable, Iterator
+
+from artisan_tools import error, trace
+from artisan_tools.log import get_logger
+
+logger = get_logger("container")
+
+BACKENDS = ("cli", "api", "auto")
+
+
+def default_socket(engine: str = "docker") -> str | None:
+    """
+    Get the path of the engine API socket.
+
+    DOCKER_HOST (docker) or CONTAINER_HOST (podman) is used if it is a
+    unix:// URL, otherwise the default socket of the engine.
+
+    Returns:
+    str: The path or None if no socket exists.
+    """
+    variable = "CONTAINER_HOST" if engine == "podman" else "DOCKER_HOST"
+    host = os.environ.get(variable, "")
+    if host:
+        return host.removeprefix("unix://") if host.startswith("unix://") else None
+
+    if engine == "podman":
+        runtime_dir = os.environ.get("XDG_RUNTIME_DIR", f"/run/user/{os.getuid()}")
+        candidates = [
+            os.path.join(runtime_dir, "podman", "podman.sock"),
+            "/run/podman/podman.sock",
+        ]
+    else:
+        candidates = ["/var/run/docker.sock"]
+    return next((path for path in candidates if os.path.exists(path)), None)
+
+
+def encode_auth(auth: dict) -> str:
+    """
+    Encode registry credentials for the X-Registry-Auth header.
+    """
+    return base64.urlsafe_b64encode(json.dumps(auth).encode()).decode()
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    """
+    HTTP connection over a Unix socket.
+    """
+
+    def __init__(self, path: str, timeout: float | None = None):
+        """
+        Create a connection to the socket at `path`, connected on first use.
+        """
+        super().__init__("localhost", timeout=timeout)
+        self.path = path
+
+    def connect(self):
+        """
+        Connect to the Unix socket.
+        """
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        if self.timeout is not None:
+            self.sock.settimeout(self.timeout)
+        self.sock.connect(self.path)
+
+
+class EngineClient:
+    """
+    Docker Engine API client.
+
+    Example:
+        >>> client = EngineClient("/var/run/docker.sock")
+        >>> client.tag("app:latest", "ghcr.io/org/app:1.0.0")
+        >>> client.push("ghcr.io/org/app:1.0.0", auth)
+    """
+
+    def __init__(self, path: str, timeout: float | None = None):
+        """
+        Create a client, the connection is opened on the first request.
+
+        Args:
+        path: The path of the engine socket.
+        timeout: Timeout of socket operations in seconds, None to wait.
+        """
+        self.path = path
+        self.timeout = timeout
+        self._connection: UnixHTTPConnection | None = None
+
+    def close(self) -> None:
+        """
+        Close the connection.
+        """
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def _send(self, method, url, body, headers) -> http.client.HTTPResponse:
+        for attempt in range(2):
+            if self._connection is None:
+                self._connection = UnixHTTPConnection(self.path, self.timeout)
+            try:
+                self._connection.request(method, url, body=body, headers=headers)
+                return self._connection.getresponse()
+            except ConnectionError:
+                # The engine closed the idle connection (RemoteDisconnected is a
+                # ConnectionError), retry once:
+                logger.debug(f"Engine connection closed, reconnecting to {self.path}")
+                self.close()
+                if attempt:
+                    raise
+        raise AssertionError("unreachable")
+
+    def _open(
+        self,
+        method: str,
+        path: str,
+        params: dict | None = None,
+        body: dict | None = None,
+        headers: dict | None = None,
+    ) -> http.client.HTTPResponse:
+        url = path + ("?" + urllib.parse.urlencode(params) if params else "")
+        headers = dict(headers or {})
+        data = None
+        if body is not None:
+            data = json.dumps(body).encode()
+            headers["Content-Type"] = "application/json"
+        response = self._send(method, url, data, headers)
+        if response.status >= 400:
+            content = response.read()
+            try:
+                message = json.loads(content)["message"]
+            except (ValueError, KeyError, TypeError):
+                message = content.decode(errors="replace")
+            raise error.ExternalError(
+                f"Engine API {method} {path} failed ({response.status}): {message}",
+                response.status,
+            )
+        return response
+
+    def request(self, method: str, path: str, **kwargs) -> dict | list | None:
+        """
+        Make a request and return the decoded JSON response.
+
+        Args:
+        method: The HTTP method.
+        path: The API path, e.g. '/images/app/json'.
+        kwargs: `params` (query), `body` (JSON) and `headers`.
+
+        Raises:
+        error.ExternalError: If the engine responds with an error.
+        """
+        with trace.span(f"engine {method} {path}", method=method, path=path):
+            content = self._open(method, path, **kwargs).read()
+        return json.loads(content) if content.strip() else None
+
+    def stream(self, method: str, path: str, **kwargs) -> Iterator[dict]:
+        """
+        Make a request and yield the JSON messages of a streamed response.
+
+        Raises:
+        error.ExternalError: If the engine responds with an error, also for
+            errors reported in the stream.
+        """
+        decoder = json.JSONDecoder()
+        with trace.span(f"engine {method} {path}", method=method, path=path):
+            response = self._open(method, path, **kwargs)
+            try:
+                # Multi-byte characters can be split between chunks:
+                text = codecs.getincrementaldecoder("utf-8")()
+                buffer = ""
+                while chunk := response.read1(65536):
+                    buffer += text.decode(chunk)
+                    while buffer := buffer.lstrip():
+                        try:
+                            message, end = decoder.raw_decode(buffer)
+                        except ValueError:
+                            break
+                        buffer = buffer[end:]
+                        if "error" in message:
+                            raise error.ExternalError(message["error"], 1)
+                        yield message
+            finally:
+                if not response.isclosed():
+                    # The rest of the response would be read by the next request,
+                    # e.g. after an error or if the caller stopped iterating:
+                    self.close()
+
+    def ping(self) -> bool:
+        """
+        Check if the engine is reachable.
+        """
+        try:
+            response = self._open("GET", "/_ping")
+            response.read()
+        except (OSError, error.ExternalError):
+            self.close()
+            return False
+        return True
+
+    def inspect_image(self, name: str) -> dict | None:
+        """
+        Get details of an image.
+
+        Returns:
+        dict: The image details or None if the image doesn't exist.
+        """
+        try:
+            return self.request("GET", f"/images/{name}/json")  # type: ignore
+        except error.ExternalError as e:
+            if e.args[1] == 404:
+                return None
+            raise
+
+    def tag(self, source: str, target: str) -> None:
+        """
+        Tag an image.
+
+        Args:
+        source: The image to tag.
+        target: The new name, with tag.
+        """
+        repository, tag = _split_tag(target)
+        self.request(
+            "POST", f"/images/{source}/tag", params={"repo": repository, "tag": tag}
+        )
+
+    def login(self, username: str, password: str, registry: str) -> dict:
+        """
+        Check credentials with the registry.
+
+        The engine doesn't store the credentials, pass the returned auth to
+        `push`.
+
+        Returns:
+        dict: The registry auth to use for `push`.
+
+        Raises:
+        error.ExternalError: If the registry rejects the credentials.
+        """
+        auth = {"username": username, "password": password, "serveraddress": registry}
+        response = self.request("POST", "/auth", body=auth)
+        if isinstance(response, dict) and response.get("IdentityToken"):
+            return {"identitytoken": response["IdentityToken"]}
+        return auth
+
+    def push(
+        self,
+        target: str,
+        auth: dict | None = None,
+        progress: Callable[[dict], None] | None = None,
+    ) -> None:
+        """
+        Push an image to a registry.
+
+        Args:
+        target: The image, with tag.
+        auth: Registry auth, see `login`.
+        progress: Called with each progress message of the engine.
+
+        Raises:
+        error.ExternalError: If the push failed.
+        """
+        repository, tag = _split_tag(target)
+        headers = {"X-Registry-Auth": encode_auth(auth or {})}
+        for message in self.stream(
+            "POST", f"/images/{repository}/push", params={"tag": tag}, headers=headers
+        ):
+            if progress is not None:
+                progress(message)
+
+
+def _split_tag(image: str) -> tuple[str, str]:
+    # A colon after the last slash separates the tag:
+    repository, _, tag = image.rpartition(":")
+    if not repository or "/" in tag:
+        return image, "latest"
+    return repository, tag
+
+
+def print_progress(message: dict) -> None:
+    """
+    Print a progress message of a push, skipping layer progress updates.
+    """
+    if "progressDetail" in message and message.get("progress"):
+        return
+    text = " ".join(
+        str(message[key]) for key in ("id", "status") if message.get(key) is not None
+    )
+    if text:
+        print(text)
@@ -5,14 +5,94 @@ import uuid
 from typing import List
 
 from artisan_tools.log import get_logger
-from artisan_tools import error
-
+from artisan_tools import error, trace
 
 logger = get_logger("container")
 
+# Temporary credential store, see `enable_isolated_credentials`:
+_isolated: dict = {}
+
 # import typer
 
 
+def docker_config_dir() -> str:
+    """
+    Get the Docker configuration directory used for engine commands.
+    """
+    return (
+        _isolated.get("directory")
+        or os.environ.get("DOCKER_CONFIG")
+        or os.path.expanduser("~/.docker")
+    )
+
+
+def engine_env() -> dict | None:
+    """
+    Get the environment for container engine commands.
+
+    Returns:
+    dict: The environment, or None to inherit the environment of the process.
+    """
+    if not _isolated:
+        return None
+    return {
+        **os.environ,
+        "DOCKER_CONFIG": _isolated["directory"],
+        "REGISTRY_AUTH_FILE": os.path.join(_isolated["directory"], "auth.json"),
+    }
+
+
+def enable_isolated_credentials() -> None:
+    """
+    Log in to a temporary credential store instead of the user's.
+
+    Engine commands get DOCKER_CONFIG (docker) and REGISTRY_AUTH_FILE
+    (podman) pointing to a private directory, so concurrent processes don't
+    log each other out. The Docker configuration is copied without its
+    credentials (`auths`, `credHelpers` and `credsStore`), so logins are stored
+    in the directory, while other settings (e.g. `proxies`) and CLI plugins
+    (e.g. buildx) stay available.
+
+    A forked process (e.g. a daemon command) gets its own store, the inherited
+    one belongs to the parent.
+    """
+    import json
+    import tempfile
+
+    if _isolated.get("pid") == os.getpid():
+        return
+    _isolated.clear()
+    source = docker_config_dir()
+    directory = tempfile.mkdtemp(prefix="artisan-auth-")
+    try:
+        with open(os.path.join(source, "config.json"), "r") as file:
+            config = json.load(file)
+    except (OSError, ValueError):
+        config = {}
+    for key in ("auths", "credHelpers", "credsStore"):
+        config.pop(key, None)
+    with open(os.path.join(directory, "config.json"), "w") as file:
+        json.dump(config, file)
+    plugins = os.path.join(source, "cli-plugins")
+    if os.path.isdir(plugins):
+        os.symlink(plugins, os.path.join(directory, "cli-plugins"))
+    logger.debug(f"Using isolated registry credentials in {directory}")
+    _isolated.update(directory=directory, pid=os.getpid())
+
+
+def disable_isolated_credentials() -> None:
+    """
+    Remove the credential store created by `enable_isolated_credentials`.
+    """
+    import shutil
+
+    if not _isolated:
+        return
+    if _isolated["pid"] == os.getpid():
+        shutil.rmtree(_isolated["directory"], ignore_errors=True)
+    _isolated.clear()
+
+
 def check_login(registry: str, engine: str = "docker"):
     """
     Check if the user is logged in to a container registry using CLI.
@@ -29,7 +109,7 @@ def check_login(registry: str, engine: str = "docker"):
     """
     # Check if already logged in by checking the Docker config file
     if engine == "docker":
-        docker_config_path = os.path.expanduser("~/.docker/config.json")
+        docker_config_path = os.path.join(docker_config_dir(), "config.json")
         if os.path.isfile(docker_config_path):
             try:
                 with open(docker_config_path, "r") as file:
@@ -45,10 +125,11 @@ def check_login(registry: str, engine: str = "docker"):
     elif engine == "podman":
         # Check if logged in using podman login --get-login
 
-        out = subprocess.run(
+        out = trace.run(
             ["podman", "login", "--get-login", registry],
             text=True,
             capture_output=True,
+            env=engine_env(),
         )
         if out.returncode == 0:
             return True
@@ -95,13 +176,14 @@ def login(
 
     # Log in to the registry
     try:
-        subprocess.run(
+        trace.run(
             [engine, "login", registry, "-u", username, "--password-stdin"]
             + list(options),
             input=token,
             text=True,
             capture_output=True,
             check=True,
+            env=engine_env(),
         )
     except subprocess.CalledProcessError as e:
         print(f"Failed to log in to {registry}: {e.output}")
@@ -131,11 +213,12 @@ def logout(
     """
     # Log out of the registry
     try:
-        subprocess.run(
+        trace.run(
             [engine, "logout", registry] + list(options),
             text=True,
             capture_output=True,
             check=True,
+            env=engine_env(),
         )
     except subprocess.CalledProcessError as e:
         print(f"Failed to log out of {registry}: {e.output}")
@@ -154,14 +237,16 @@ def push(source: str, target: str, engine: str = "docker", options: tuple = ())
     """
     # Tag the image
     try:
-        subprocess.run([engine, "tag", source, target], check=True)
+        trace.run([engine, "tag", source, target], check=True, env=engine_env())
     except subprocess.CalledProcessError as e:
         print(f"Failed to tag image: {e.output}")
         raise
 
     # Push the image
     try:
-        subprocess.run([engine, "push", target] + list(options), check=True)
+        trace.run(
+            [engine, "push", target] + list(options), check=True, env=engine_env()
+        )
     except subprocess.CalledProcessError as e:
         print(f"Failed to push image: {e.output}")
         raise
@@ -197,7 +282,7 @@ def build_push(
     # Build the image
     try:
         # Create a builder instance
-        subprocess.run(
+        trace.run(
             [
                 "docker",
                 "buildx",
@@ -208,9 +293,10 @@ def build_push(
                 "--driver-opt=network=host",  # Support localhost registry for testing
             ],
             check=True,
+            env=engine_env(),
         )
         # Build and push
-        subprocess.run(
+        trace.run(
             [
                 "docker",
                 "buildx",
@@ -223,12 +309,14 @@ def build_push(
                 context,
             ],
             check=True,
+            env=engine_env(),
         )
     except subprocess.CalledProcessError as e:
         raise error.ExternalError("Failed to build and push image", e.returncode) from e
     finally:
         # Remove builder:
-        subprocess.run(
+        trace.run(
             ["docker", "buildx", "rm", builder_name],
             check=True,
+            env=engine_env(),
         )
@@ -0,0 +1,451 @@
+"""
+Client for the OCI distribution (registry) API.
+
+Queries such as "does this tag exist" are answered with plain HTTP requests
+instead of starting `docker manifest inspect` per query. Connections are kept
+alive and pooled per registry, and bearer tokens are cached per repository
+scope, so bulk queries are cheap:
+
+    >>> with Registry("ghcr.io", "user", "token") as registry:
+    ...     registry.tags_exist("org/app", ["1.0.0", "1.0.1"])
+    {'1.0.0': True, '1.0.1': False}
+"""
+
+import base64
+import http.client
+import json
+import re
+import threading
+import time
+import urllib.parse
+from typing import Iterable
+
+from artisan_tools import error, metrics, trace
+from artisan_tools.log import get_logger
+
+logger = get_logger("container")
+
+MANIFEST_TYPES = (
+    "application/vnd.oci.image.index.v1+json",
+    "application/vnd.oci.image.manifest.v1+json",
+    "application/vnd.docker.distribution.manifest.list.v2+json",
+    "application/vnd.docker.distribution.manifest.v2+json",
+)
+
+_request_seconds = metrics.histogram(
+    "artisan_registry_request_seconds", "Time of registry API requests", ["method"]
+)
+
+
+def registry_url(registry: str, insecure: bool | None = None) -> tuple[str, str]:
+    """
+    Get the scheme and host of a registry.
+
+    Args:
+    registry: The registry, e.g. 'ghcr.io', 'localhost:5000' or a URL.
+    insecure: Use plain HTTP. Defaults to True for local registries only.
+
+    Returns:
+    tuple: The scheme and the host (with port).
+    """
+    if "://" in registry:
+        url = urllib.parse.urlsplit(registry)
+        return url.scheme, url.netloc
+    host = registry.rstrip("/")
+    if host in ("docker.io", "index.docker.io"):
+        host = "registry-1.docker.io"
+    if insecure is None:
+        insecure = host.split(":")[0] in ("localhost", "127.0.0.1", "::1")
+    return ("http" if insecure else "https"), host
+
+
+def split_repository(repository: str) -> tuple[str, str]:
+    """
+    Split an image repository into the registry and the repository path.
+
+    Like the engines, the first component is the registry if it contains a
+    '.' or ':' or is 'localhost', otherwise the registry is Docker Hub.
+
+    Example:
+        >>> split_repository("ghcr.io/org/app")
+        ('ghcr.io', 'org/app')
+        >>> split_repository("alpine")
+        ('docker.io', 'library/alpine')
+    """
+    first, _, rest = repository.partition("/")
+    if rest and ("." in first or ":" in first or first == "localhost"):
+        return first, rest
+    if not rest:
+        return "docker.io", f"library/{repository}"
+    return "docker.io", repository
+
+
+def _parse_challenge(header: str) -> tuple[str, dict]:
+    """
+    Parse a WWW-Authenticate header, e.g. 'Bearer realm="...",service="..."'.
+    """
+    scheme, _, params = header.partition(" ")
+    return scheme.lower(), dict(re.findall(r'(\w+)="([^"]*)"', params))
+
+
+def _next_link(header: str | None) -> str | None:
+    """
+    Get the URL of the next page from a Link header.
+    """
+    match = re.search(r'<([^>]+)>;\s*rel="?next"?', header or "")
+    return match.group(1) if match else None
+
+
+class _Pool:
+    """
+    Idle keep-alive connections to one host.
+    """
+
+    def __init__(self, scheme: str, host: str, timeout: float):
+        self.connection_class = (
+            http.client.HTTPSConnection
+            if scheme == "https"
+            else http.client.HTTPConnection
+        )
+        self.host = host
+        self.timeout = timeout
+        self.idle: list[http.client.HTTPConnection] = []
+        self.lock = threading.Lock()
+
+    def get(self) -> http.client.HTTPConnection:
+        with self.lock:
+            if self.idle:
+                return self.idle.pop()
+        return self.connection_class(self.host, timeout=self.timeout)
+
+    def put(self, connection: http.client.HTTPConnection) -> None:
+        with self.lock:
+            self.idle.append(connection)
+
+    def close(self) -> None:
+        with self.lock:
+            idle, self.idle = self.idle, []
+        for connection in idle:
+            connection.close()
+
+
+class Registry:
+    """
+    OCI distribution API client for one registry.
+
+    The client is thread safe, see `tags_exist` for concurrent requests.
+    """
+
+    def __init__(
+        self,
+        registry: str,
+        username: str | None = None,
+        password: str | None = None,
+        insecure: bool | None = None,
+        timeout: float = 30,
+    ):
+        """
+        Create a client, connections are opened on the first request.
+
+        Args:
+        registry: The registry, e.g. 'ghcr.io' or 'localhost:5000'.
+        username: Username for authentication. Optional.
+        password: Password or token for authentication. Optional.
+        insecure: Use plain HTTP, see `registry_url`.
+        timeout: Timeout of socket operations in seconds.
+        """
+        self.registry = registry
+        self.scheme, self.host = registry_url(registry, insecure)
+        self.username = username
+        self.password = password
+        self.timeout = timeout
+        self._pools: dict[tuple[str, str], _Pool] = {}
+        self._tokens: dict[str, tuple[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        """
+        Use the client as context manager, closing it on exit.
+        """
+        return self
+
+    def __exit__(self, *exc_info):
+        """
+        Close the pooled connections.
+        """
+        self.close()
+
+    def close(self) -> None:
+        """
+        Close the pooled connections.
+        """
+        with self._lock:
+            pools, self._pools = list(self._pools.values()), {}
+        for pool in pools:
+            pool.close()
+
+    def _pool(self, scheme: str, host: str) -> _Pool:
+        with self._lock:
+            key = (scheme, host)
+            if key not in self._pools:
+                self._pools[key] = _Pool(scheme, host, self.timeout)
+            return self._pools[key]
+
+    def _send(
+        self, method: str, url: str, headers: dict, body: bytes | None = None
+    ) -> tuple[int, http.client.HTTPMessage, bytes]:
+        """
+        Make a request on a pooled connection and read the response.
+        """
+        parts = urllib.parse.urlsplit(url)
+        scheme, host = parts.scheme or self.scheme, parts.netloc or self.host
+        target = urllib.parse.urlunsplit(("", "", parts.path, parts.query, ""))
+        pool = self._pool(scheme, host)
+        for attempt in range(2):
+            connection = pool.get()
+            try:
+                connection.request(method, target, body=body, headers=headers)
+                response = connection.getresponse()
+                body = response.read()
+            except ConnectionError:
+                # The registry closed the idle connection, retry once:
+                logger.debug(f"Registry connection closed, reconnecting to {host}")
+                connection.close()
+                if attempt:
+                    raise
+                continue
+            except BaseException:
+                connection.close()
+                raise
+            if response.will_close:
+                connection.close()
+            else:
+                pool.put(connection)
+            return response.status, response.headers, body
+        raise AssertionError("unreachable")
+
+    def _basic_auth(self) -> dict:
+        if self.username is None:
+            return {}
+        credentials = f"{self.username}:{self.password or ''}".encode()
+        return {"Authorization": "Basic " + base64.b64encode(credentials).decode()}
+
+    def _token(self, challenge: dict) -> str:
+        """
+        Get a bearer token for a challenge, cached by scope.
+        """
+        scope = challenge.get("scope", "")
+        with self._lock:
+            cached = self._tokens.get(scope)
+        if cached and cached[1] > time.monotonic():
+            return cached[0]
+
+        params = {k: v for k, v in challenge.items() if k in ("service", "scope")}
+        url = challenge["realm"] + "?" + urllib.parse.urlencode(params)
+        status, _, body = self._send("GET", url, self._basic_auth())
+        if status != 200:
+            raise error.ExternalError(
+                f"Failed to get registry token for {scope or self.registry} "
+                f"({status}): {body.decode(errors='replace')}",
+                status,
+            )
+        content = json.loads(body)
+        token = content.get("token") or content["access_token"]
+        # Renew a bit early, tokens are valid for 60 seconds by default:
+        expires = time.monotonic() + max(content.get("expires_in", 60) - 10, 0)
+        with self._lock:
+            self._tokens[scope] = (token, expires)
+        return token
+
+    def request(
+        self,
+        method: str,
+        path: str,
+        scope: str | None = None,
+        headers=None,
+        body: bytes | None = None,
+    ) -> tuple[int, http.client.HTTPMessage, bytes]:
+        """
+        Make an authenticated request to the registry API.
+
+        A bearer token is requested when the registry asks for one, basic
+        authentication is used if the registry asks for that.
+
+        Args:
+        method: The HTTP method.
+        path: The API path (or an absolute URL), e.g. '/v2/org/app/tags/list'.
+        scope: The token scope, e.g. 'repository:org/app:pull'.
+        headers: Additional request headers. Optional.
+        body: The request body. Optional.
+
+        Returns:
+        tuple: The status, headers and body of the response.
+        """
+        headers = dict(headers or {})
+        with self._lock:
+            cached = self._tokens.get(scope or "")
+        if cached and cached[1] > time.monotonic():
+            headers["Authorization"] = f"Bearer {cached[0]}"
+
+        with _request_seconds.time(method=method), trace.span(
+            f"registry {method} {path}", method=method, path=path
+        ):
+            status, response_headers, content = self._send(method, path, headers, body)
+            challenge = response_headers.get("WWW-Authenticate")
+            if status == 401 and challenge:
+                scheme, params = _parse_challenge(challenge)
+                if scheme == "bearer":
+                    if scope:
+                        # Cache the token by the scope requested:
+                        params["scope"] = scope
+                    token = self._token(params)
+                    headers["Authorization"] = f"Bearer {token}"
+                else:
+                    headers.update(self._basic_auth())
+                status, response_headers, content = self._send(
+                    method, path, headers, body
+                )
+
+        if status == 401 or status == 403 or status >= 500:
+            raise error.ExternalError(
+                f"Registry request {method} {path} failed ({status}): "
+                f"{content.decode(errors='replace')}",
+                status,
+            )
+        return status, response_headers, content
+
+    def _manifest(self, method: str, repository: str, reference: str):
+        return self.request(
+            method,
+            f"/v2/{repository}/manifests/{urllib.parse.quote(reference)}",
+            scope=f"repository:{repository}:pull",
+            headers={"Accept": ", ".join(MANIFEST_TYPES)},
+        )
+
+    def digest(self, repository: str, tag: str) -> str | None:
+        """
+        Get the digest of the manifest of a tag.
+
+        Args:
+        repository: The repository, e.g. 'org/app'.
+        tag: The tag (or digest).
+
+        Returns:
+        str: The digest, e.g. 'sha256:...', or None if the tag doesn't exist.
+        """
+        status, headers, _ = self._manifest("HEAD", repository, tag)
+        if status == 404:
+            return None
+        if status != 200:
+            raise error.ExternalError(
+                f"Failed to get manifest of {repository}:{tag} ({status})", status
+            )
+        return headers.get("Docker-Content-Digest")
+
+    def tag_exists(self, repository: str, tag: str) -> bool:
+        """
+        Check if a tag exists in a repository.
+        """
+        status, _, _ = self._manifest("HEAD", repository, tag)
+        if status not in (200, 404):
+            raise error.ExternalError(
+                f"Failed to get manifest of {repository}:{tag} ({status})", status
+            )
+        return status == 200
+
+    def tag(self, repository: str, source: str, target: str) -> None:
+        """
+        Add a tag to an image in the registry, without pulling or pushing it.
+
+        The manifest of `source` is uploaded again as `target`, the layers
+        are already in the repository.
+
+        Args:
+        repository: The repository, e.g. 'org/app'.
+        source: The existing tag (or digest).
+        target: The new tag.
+
+        Raises:
+        error.ExternalError: If the source doesn't exist or the upload fails.
+        """
+        scope = f"repository:{repository}:pull,push"
+        status, headers, manifest = self.request(
+            "GET",
+            f"/v2/{repository}/manifests/{urllib.parse.quote(source)}",
+            scope=scope,
+            headers={"Accept": ", ".join(MANIFEST_TYPES)},
+        )
+        if status != 200:
+            raise error.ExternalError(
+                f"Failed to get manifest of {repository}:{source} ({status})", status
+            )
+        status, _, content = self.request(
+            "PUT",
+            f"/v2/{repository}/manifests/{urllib.parse.quote(target)}",
+            scope=scope,
+            headers={"Content-Type": headers["Content-Type"]},
+            body=manifest,
+        )
+        if status != 201:
+            raise error.ExternalError(
+                f"Failed to tag {repository}:{source} as {target} ({status}): "
+                f"{content.decode(errors='replace')}",
+                status,
+            )
+
+    def tags_exist(
+        self, repository: str, tags: Iterable[str], workers: int = 8
+    ) -> dict[str, bool]:
+        """
+        Check if tags exist in a repository, with concurrent HEAD requests.
+
+        Args:
+        repository: The repository, e.g. 'org/app'.
+        tags: The tags to check.
+        workers: Maximum number of concurrent requests.
+
+        Returns:
+        dict: If each tag exists, by tag.
+        """
+        from concurrent.futures import ThreadPoolExecutor
+
+        tags = list(dict.fromkeys(tags))
+        if len(tags) <= 1:
+            return {tag: self.tag_exists(repository, tag) for tag in tags}
+        # Check one tag first, so the workers share its token:
+        first = self.tag_exists(repository, tags[0])
+        with ThreadPoolExecutor(max_workers=min(workers, len(tags) - 1)) as executor:
+            results = executor.map(
+                lambda tag: self.tag_exists(repository, tag), tags[1:]
+            )
+            return dict(zip(tags, [first, *results]))
+
+    def list_tags(self, repository: str, page_size: int | None = None) -> list[str]:
+        """
+        List the tags of a repository, following pagination.
+
+        Args:
+        repository: The repository, e.g. 'org/app'.
+        page_size: Number of tags requested per page. Optional.
+
+        Returns:
+        list of str: The tags, an empty list if the repository doesn't exist.
+        """
+        first = f"/v2/{repository}/tags/list"
+        if page_size:
+            first += f"?n={page_size}"
+        path: str | None = first
+        tags: list[str] = []
+        while path:
+            status, headers, body = self.request(
+                "GET", path, scope=f"repository:{repository}:pull"
+            )
+            if status == 404:
+                return []
+            if status != 200:
+                raise error.ExternalError(
+                    f"Failed to list tags of {repository} ({status})", status
+                )
+            tags.extend(json.loads(body).get("tags") or [])
+            path = _next_link(headers.get("Link"))
+        return tags
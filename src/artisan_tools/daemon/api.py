@@ -0,0 +1,66 @@
+import os
+import subprocess
+import sys
+import time
+
+from artisan_tools.app import App
+from artisan_tools import client
+
+
+def is_running(directory: str | None = None) -> bool:
+    """
+    Check if a daemon is running for a project directory.
+    """
+    sock = client.connect(directory)
+    if sock is None:
+        return False
+    sock.close()
+    return True
+
+
+def start(app: App, directory: str | None = None, timeout: float = 10) -> None:
+    """
+    Start a daemon in the background.
+
+    Args:
+    app (App): The application object.
+    directory (str): The project directory, defaults to the current directory.
+    timeout (float): Seconds to wait for the daemon to accept connections.
+
+    Raises:
+    RuntimeError: If the daemon doesn't start within the timeout.
+    """
+    directory = os.path.realpath(directory or os.getcwd())
+    if is_running(directory):
+        return
+    command = [
+        sys.executable,
+        "-m",
+        "artisan_tools.daemon.server",
+        "--directory",
+        directory,
+        "--idle-timeout",
+        str(app.config["daemon"]["idle-timeout"]),
+    ]
+    subprocess.Popen(
+        command,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+    deadline = time.monotonic() + timeout
+    while not is_running(directory):
+        if time.monotonic() > deadline:
+            raise RuntimeError(f"Daemon did not start within {timeout} seconds")
+        time.sleep(0.05)
+
+
+def stop(directory: str | None = None) -> bool:
+    """
+    Stop the daemon for a project directory.
+
+    Returns:
+    bool: True if a daemon was running.
+    """
+    return client.stop(directory)
@@ -0,0 +1,60 @@
+import typer
+from rich import print as rprint
+
+from artisan_tools.daemon import api
+
+
+def factory(app):
+    """
+    Create CLI for daemon extension.
+    """
+    cli = typer.Typer(
+        name="daemon",
+        help=(
+            "Keep artisan tools running in the background to avoid start-up time "
+            "of each command."
+        ),
+    )
+
+    @cli.command()
+    def start(
+        foreground: bool = typer.Option(  # noqa: B008
+            False, help="Run in the foreground until stopped."
+        ),
+    ):
+        """
+        Start the daemon for the current directory.
+
+        While the daemon is running, `at` commands in this directory are run by
+        the daemon. Set ARTISAN_NO_DAEMON=1 to run commands in-process.
+        """
+        if foreground:
+            from artisan_tools.daemon.server import Daemon
+
+            Daemon(idle_timeout=app.config["daemon"]["idle-timeout"]).serve()
+            return
+        api.start(app)
+        rprint("[green]Daemon started.")
+
+    @cli.command()
+    def stop():
+        """
+        Stop the daemon for the current directory.
+        """
+        if api.stop():
+            rprint("[green]Daemon stopped.")
+        else:
+            rprint("[yellow]Daemon is not running.")
+
+    @cli.command()
+    def status():
+        """
+        Check if the daemon for the current directory is running.
+        """
+        if api.is_running():
+            rprint("[green]Daemon is running.")
+        else:
+            rprint("[yellow]Daemon is not running.")
+            raise typer.Exit(code=1)
+
+    return cli
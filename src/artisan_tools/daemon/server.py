@@ -0,0 +1,291 @@
+"""
+Daemon keeping an application warm between commands.
+
+The daemon loads configuration and extensions once. Each command is run in a
+forked child process, so commands start with the warm application but can't
+change the state of the daemon, and the child writes directly to the
+standard streams passed by the client (see `artisan_tools.client`). The child
+also replies with the exit code, so the daemon accepts the next connection
+right away and commands run concurrently.
+
+The configuration, `VERSION` and `RELEASE` files are checked before each
+command and the application is reloaded if they changed.
+"""
+
+import argparse
+import json
+import os
+import socket
+import sys
+import time
+import traceback
+import typing
+
+import click
+import typer
+
+from artisan_tools.app import App
+from artisan_tools.client import socket_path, recv_exact, LENGTH, EXIT_CODE
+from artisan_tools.log import get_logger
+
+log = get_logger("daemon")
+
+# Seconds between checks for finished commands while commands are running:
+_REAP_INTERVAL = 1.0
+
+
+def _snapshot(paths: list[str]) -> dict:
+    """
+    Get modification time and size of files, None for missing files.
+    """
+    state: dict[str, tuple[int, int] | None] = {}
+    for path in paths:
+        try:
+            stat = os.stat(path)
+            state[path] = (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            state[path] = None
+    return state
+
+
+def _get_command(app: App) -> click.Command:
+    """
+    Get the top level command of an application.
+    """
+    # Newer versions of typer bundle their own copy of click:
+    return typing.cast(click.Command, typer.main.get_command(app.cli))
+
+
+class Daemon:
+    """
+    Serve commands for a project directory over a Unix socket.
+    """
+
+    def __init__(self, directory: str | None = None, idle_timeout: float = 3600):
+        """
+        Serve commands for a project directory over a Unix socket.
+
+        Args:
+        directory: The project directory, defaults to the current directory.
+        idle_timeout: Seconds without commands before the daemon exits.
+        """
+        self.directory = os.path.realpath(directory or os.getcwd())
+        self.idle_timeout = idle_timeout
+        self.path = socket_path(self.directory)
+        self.app: App | None = None
+        self.command: click.Command | None = None
+        self.state: dict[str, tuple[int, int] | None] = {}
+        self.children: set[int] = set()
+        self.running = False
+
+    def watched_files(self) -> list[str]:
+        """
+        Files which invalidate the application when changed.
+        """
+        files = ["artisan.yaml"]
+        if self.app is not None:
+            files += [
+                self.app.config["version"]["current"],
+                self.app.config["version"]["release"],
+            ]
+        return [os.path.join(self.directory, file) for file in files]
+
+    def load(self) -> None:
+        """
+        (Re)load configuration and extensions.
+
+        If loading fails, commands are run with a new application in the child
+        process, reporting the error to the client. The same applies with
+        `container.isolated-credentials`, so that every command gets its own
+        credential store.
+        """
+        if self.app is not None:
+            self.app.close()
+        self.app = self.command = None
+        try:
+            app = App()
+            app.load_extensions()
+            self.app = app
+            # Commands sharing the application would share its temporary
+            # credential store and log each other out, each command sets up
+            # a new application instead:
+            if not app.config["container"]["isolated-credentials"]:
+                self.command = _get_command(app)
+        except Exception as error:
+            log.warning(f"Failed to load application: {error}")
+        self.state = _snapshot(self.watched_files())
+        log.info(f"Loaded application for {self.directory}")
+
+    def is_stale(self) -> bool:
+        """
+        Check if watched files changed since the application was loaded.
+        """
+        return _snapshot(list(self.state)) != self.state
+
+    def serve(self) -> None:
+        """
+        Serve commands until stopped or idle for `idle_timeout` seconds.
+        """
+        os.chdir(self.directory)
+        self.load()
+
+        if os.path.exists(self.path):
+            # Socket of a daemon which didn't exit cleanly:
+            os.unlink(self.path)
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        umask = os.umask(0o177)
+        try:
+            listener.bind(self.path)
+        finally:
+            os.umask(umask)
+        listener.listen()
+        log.info(f"Listening on {self.path}")
+
+        self.running = True
+        deadline = time.monotonic() + self.idle_timeout
+        try:
+            while self.running:
+                self.reap()
+                if self.children:
+                    # Running commands count as activity:
+                    deadline = time.monotonic() + self.idle_timeout
+                    listener.settimeout(_REAP_INTERVAL)
+                elif time.monotonic() >= deadline:
+                    log.info("Idle timeout reached")
+                    break
+                else:
+                    listener.settimeout(deadline - time.monotonic())
+                try:
+                    connection, _ = listener.accept()
+                except socket.timeout:
+                    continue
+                deadline = time.monotonic() + self.idle_timeout
+                with connection:
+                    connection.settimeout(None)
+                    try:
+                        self.handle(connection, listener)
+                    except Exception as error:
+                        log.error(f"Failed to handle request: {error}")
+        finally:
+            listener.close()
+            os.unlink(self.path)
+            self.reap(block=True)
+            if self.app is not None:
+                self.app.close()
+
+    def reap(self, block: bool = False) -> None:
+        """
+        Collect the child processes of finished commands.
+
+        Args:
+        block: Wait for all commands to finish.
+        """
+        for pid in list(self.children):
+            try:
+                done, _ = os.waitpid(pid, 0 if block else os.WNOHANG)
+            except ChildProcessError:
+                done = pid
+            if done:
+                self.children.discard(pid)
+
+    def handle(self, connection: socket.socket, listener: socket.socket) -> None:
+        """
+        Handle a request from a client.
+        """
+        header, fds, _, _ = socket.recv_fds(connection, LENGTH.size, 3)
+        try:
+            body = recv_exact(connection, LENGTH.unpack(header)[0])
+            if body is None:
+                return
+            request = json.loads(body)
+            if request["command"] == "stop":
+                self.running = False
+                connection.sendall(EXIT_CODE.pack(0))
+            else:
+                self.run(request["argv"], request["env"], fds, connection, listener)
+        finally:
+            for fd in fds:
+                os.close(fd)
+
+    def run(
+        self,
+        argv: list[str],
+        env: dict,
+        fds: list[int],
+        connection: socket.socket,
+        listener: socket.socket,
+    ) -> int:
+        """
+        Start a command in a child process using the client's streams.
+
+        The child replies to the client with the exit code, the daemon doesn't
+        wait for the command to finish.
+
+        Returns:
+        int: The process id of the child.
+        """
+        if self.is_stale():
+            self.load()
+
+        pid = os.fork()
+        if pid == 0:
+            code = 1
+            try:
+                listener.close()
+                sys.stdout.flush()
+                sys.stderr.flush()
+                for target, fd in enumerate(fds):
+                    os.dup2(fd, target)
+                os.environ.clear()
+                os.environ.update(env)
+                code = self._run_command(argv)
+            except Exception:
+                traceback.print_exc()
+            finally:
+                sys.stdout.flush()
+                sys.stderr.flush()
+                try:
+                    connection.sendall(EXIT_CODE.pack(code))
+                except OSError:
+                    pass
+                os._exit(code)
+
+        self.children.add(pid)
+        return pid
+
+    def _run_command(self, argv: list[str]) -> int:
+        """
+        Run the CLI in the current process.
+        """
+        command, app = self.command, None
+        if command is None:
+            app = App()
+            app.load_extensions()
+            command = _get_command(app)
+        try:
+            command.main(args=argv, prog_name="at", standalone_mode=True)
+        except SystemExit as error:
+            if error.code is None or isinstance(error.code, int):
+                return error.code or 0
+            print(error.code, file=sys.stderr)
+            return 1
+        finally:
+            # Resources of the loaded application are shared between commands:
+            if app is not None:
+                app.close()
+        return 0
+
+
+def main(argv: list[str] | None = None) -> None:
+    """
+    Run the daemon in the foreground.
+    """
+    parser = argparse.ArgumentParser(description="Artisan tools daemon.")
+    parser.add_argument("--directory", default=None)
+    parser.add_argument("--idle-timeout", type=float, default=3600)
+    args = parser.parse_args(argv)
+    Daemon(args.directory, args.idle_timeout).serve()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,11 @@
+from . import api
+from . import cli
+
+
+def setup(app):
+    """
+    Set up the debug module.
+    """
+    app.register_extension("debug", api)
+
+    app.add_cli(cli.factory(app))
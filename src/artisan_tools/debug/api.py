@@ -0,0 +1,6 @@
+from artisan_tools.debug.main import (  # noqa: F401
+    parse_importtime,
+    profile_startup,
+    format_profile,
+    report_setup_times,
+)
@@ -0,0 +1,40 @@
+import typing
+
+import typer
+
+from artisan_tools.debug import api
+
+
+def factory(app):
+    """
+    Create CLI for debug extension.
+    """
+    cli = typer.Typer(name="debug", help="Tools for debugging artisan tools.")
+
+    @cli.command(
+        context_settings={"allow_extra_args": True, "ignore_unknown_options": True}
+    )
+    def startup(
+        command: typing.List[str] = typer.Argument(  # noqa: B008
+            None, help="Command to profile, default is '--version'."
+        ),
+        top: int = typer.Option(  # noqa: B008
+            15, help="Number of slowest imports to show."
+        ),
+    ):
+        """
+        Report import and extension setup times of a command.
+
+        The command is run in a new interpreter with `python -X importtime`,
+        e.g. ``at debug startup -- version get``. The same report is written to
+        stderr for any command when ARTISAN_PROFILE_IMPORTS=1 is set.
+        """
+        profile = api.profile_startup(command or ["--version"])
+        typer.echo(api.format_profile(profile, top))
+        if profile["returncode"] != 0:
+            typer.secho(
+                f"Command exited with code {profile['returncode']}",
+                fg=typer.colors.RED,
+            )
+
+    return cli
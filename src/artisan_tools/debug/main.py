@@ -0,0 +1,132 @@
+"""
+Profiling of artisan tools start-up.
+
+The command is run in a new interpreter with `-X importtime`. Setting
+`ARTISAN_PROFILE_IMPORTS` makes the App report the time spent loading each
+extension (import and `setup`) on stderr, see `artisan_tools.cli.run`.
+"""
+
+import os
+import re
+import subprocess
+import sys
+import time
+
+from artisan_tools.cli import PROFILE_VAR
+
+SETUP_PREFIX = "artisan-setup:"
+
+_IMPORTTIME = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( +)(\S+)")
+
+
+def parse_importtime(output: str) -> list[dict]:
+    """
+    Parse the output of `python -X importtime`.
+
+    Args:
+    output: The stderr of the interpreter.
+
+    Returns:
+    list: The imported modules as dictionaries with `name`, `self` and
+        `cumulative` time in seconds and `depth` (0 for modules imported at
+        top level), in the order they finished importing.
+    """
+    modules = []
+    for match in _IMPORTTIME.finditer(output):
+        self_us, cumulative_us, indent, name = match.groups()
+        modules.append(
+            {
+                "name": name,
+                "self": int(self_us) / 1e6,
+                "cumulative": int(cumulative_us) / 1e6,
+                "depth": (len(indent) - 1) // 2,
+            }
+        )
+    return modules
+
+
+def report_setup_times(setup_times: dict, file=sys.stderr) -> None:
+    """
+    Write extension load times in the format read by `profile_startup`.
+    """
+    for extension, seconds in setup_times.items():
+        print(f"{SETUP_PREFIX} {extension} {seconds:.6f}", file=file)
+
+
+def profile_startup(argv: list[str] | tuple[str, ...] = ("--version",)) -> dict:
+    """
+    Profile a command in a new interpreter.
+
+    The daemon is not used, so the full start-up cost is measured.
+
+    Args:
+    argv: The command line arguments (without program name).
+
+    Returns:
+    dict: With `wall` (seconds until the process exited), `imports` (total
+        import time in seconds), `modules` (see `parse_importtime`),
+        `extensions` (load time in seconds by extension), `returncode`,
+        `stdout` and `stderr` (without the profiling output) of the command.
+    """
+    env = {**os.environ, PROFILE_VAR: "1", "ARTISAN_NO_DAEMON": "1"}
+    command = [sys.executable, "-X", "importtime", "-m", "artisan_tools.cli"]
+    start = time.perf_counter()
+    result = subprocess.run(
+        command + list(argv), capture_output=True, text=True, env=env
+    )
+    wall = time.perf_counter() - start
+
+    modules = parse_importtime(result.stderr)
+    extensions = {}
+    stderr = []
+    for line in result.stderr.splitlines(keepends=True):
+        if line.startswith(SETUP_PREFIX):
+            _, extension, seconds = line.split()
+            extensions[extension] = float(seconds)
+        elif not line.startswith("import time:"):
+            stderr.append(line)
+
+    return {
+        "wall": wall,
+        "imports": sum(m["cumulative"] for m in modules if m["depth"] == 0),
+        "modules": modules,
+        "extensions": extensions,
+        "returncode": result.returncode,
+        "stdout": result.stdout,
+        "stderr": "".join(stderr),
+    }
+
+
+def format_profile(profile: dict, top: int = 15) -> str:
+    """
+    Format a start-up profile for humans.
+
+    Args:
+    profile: The profile, see `profile_startup`.
+    top: Number of slowest imports to include.
+
+    Returns:
+    str: The report.
+    """
+    lines = [
+        f"Total:   {profile['wall'] * 1000:8.1f} ms",
+        f"Imports: {profile['imports'] * 1000:8.1f} ms",
+        "",
+        "Extensions (import and setup):",
+    ]
+    for extension, seconds in profile["extensions"].items():
+        lines.append(f"  {seconds * 1000:8.1f} ms  {extension}")
+
+    lines += ["", "Top level imports (cumulative):"]
+    top_level = [m for m in profile["modules"] if m["depth"] == 0]
+    for module in sorted(top_level, key=lambda m: m["cumulative"], reverse=True)[:top]:
+        lines.append(f"  {module['cumulative'] * 1000:8.1f} ms  {module['name']}")
+
+    lines += ["", f"Slowest imports (self, cumulative), top {top}:"]
+    slowest = sorted(profile["modules"], key=lambda m: m["self"], reverse=True)
+    for module in slowest[:top]:
+        lines.append(
+            f"  {module['self'] * 1000:8.1f} ms {module['cumulative'] * 1000:8.1f} ms"
+            f"  {module['name']}"
+        )
+    return "\n".join(lines)
@@ -1,34 +1,117 @@
-import structlog
+import datetime
+import json
 import logging
+import sys
 
 get_logger = logging.getLogger
 
+FORMATS = ("console", "plain", "json")
 
-def setup_root_handler(level="info"):
+
+def setup_root_handler(level="info", format="console"):
     """
-    Setup the root logger with a human-readable output.
+    Setup the root logger.
+
+    Only the standard library is used until a record is emitted, the console
+    renderer (structlog) is created when the first record is formatted.
+    Calling this again replaces the handler added by a previous call.
+
+    Args:
+    level: The log level, e.g. 'debug' or 'warning'.
+    format: 'console' for human-readable (colored) output, 'plain' for
+        plain text or 'json' for JSON lines, e.g. for CI log ingestion.
     """
+    if format not in FORMATS:
+        raise ValueError(f"Invalid log format: {format}, must be one of {FORMATS}")
+
     root = logging.getLogger()
     root.setLevel(level.upper())
-    handler = logging.StreamHandler()
-    root.addHandler(handler)
+    for handler in root.handlers[:]:
+        if getattr(handler, "artisan", False):
+            root.removeHandler(handler)
 
-    _setup_human_output(handler)
+    handler = _StderrHandler()
+    if format == "console":
+        handler.setFormatter(_ConsoleFormatter())
+    elif format == "json":
+        handler.setFormatter(JsonFormatter())
+    else:
+        handler.setFormatter(
+            logging.Formatter(
+                "%(asctime)s [%(levelname)s] %(name)s: %(message)s",
+                datefmt="%Y-%m-%d %H:%M:%S",
+            )
+        )
+    root.addHandler(handler)
 
     log = get_logger("root")
     log.debug(f"Setting up root logger with level '{level}'")
 
 
-def _setup_human_output(handler):
+class _StderrHandler(logging.StreamHandler):
+    """
+    Handler writing to the current `sys.stderr`, which may be replaced.
+    """
+
+    artisan = True
+
+    def __init__(self):
+        logging.Handler.__init__(self)
+
+    @property
+    def stream(self):
+        return sys.stderr
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Format records as JSON objects, one per line.
+    """
+
+    def format(self, record):
+        """
+        Format a record as a single line JSON object.
+        """
+        entry = {
+            "timestamp": (
+                datetime.datetime.fromtimestamp(
+                    record.created, tz=datetime.timezone.utc
+                ).isoformat()
+            ),
+            "level": record.levelname.lower(),
+            "logger": record.name,
+            "event": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class _ConsoleFormatter(logging.Formatter):
+    """
+    Human-readable formatter, structlog is imported on first use.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._formatter = None
+
+    def format(self, record):
+        if self._formatter is None:
+            self._formatter = _structlog_formatter()
+        return self._formatter.format(record)
+
+
+def _structlog_formatter():
+    import structlog
+
     shared_processors = [
         structlog.stdlib.add_log_level,
         structlog.stdlib.add_logger_name,
         structlog.processors.TimeStamper(fmt="%Y-%m-%d %H:%M:%S"),
     ]
 
-    formatter = structlog.stdlib.ProcessorFormatter(
+    return structlog.stdlib.ProcessorFormatter(
         foreign_pre_chain=shared_processors,
         processors=[structlog.dev.ConsoleRenderer()],
     )
-
-    handler.setFormatter(formatter)
@@ -3,9 +3,10 @@ CLI exposed directly by artisan-tools.
 """
 
 import typer
-from importlib.metadata import version, PackageNotFoundError
+from typer.core import TyperGroup
 
-cli = typer.Typer(name="artisan tools")
+from artisan_tools import metrics, trace
+from artisan_tools.log import setup_root_handler
 
 
 def version_callback(value: bool):
@@ -13,6 +14,8 @@ def version_callback(value: bool):
     Print the current version of artisan-tools.
     """
     if value:
+        from importlib.metadata import version, PackageNotFoundError
+
         try:
             version_number = version("artisan-tools")
         except PackageNotFoundError:
@@ -21,17 +24,102 @@ def version_callback(value: bool):
         raise typer.Exit()
 
 
-@cli.callback()
 def main(
+    ctx: typer.Context,
     version: bool = typer.Option(
         None,
         "--version",
         callback=version_callback,
         is_eager=True,
         help="Show artisan-tools version",
-    )
+    ),
+    log_level: str = typer.Option(
+        "warning",
+        "--log-level",
+        envvar="ARTISAN_LOG_LEVEL",
+        help="Log level [debug|info|warning|error].",
+    ),
+    log_format: str = typer.Option(
+        "console",
+        "--log-format",
+        envvar="ARTISAN_LOG_FORMAT",
+        help="Log format [console|plain|json], json writes JSON lines.",
+    ),
+    trace_file: str = typer.Option(
+        None,
+        "--trace",
+        envvar="ARTISAN_TRACE",
+        help="Write timing of external commands to this file.",
+    ),
+    trace_format: str = typer.Option(
+        "chrome",
+        "--trace-format",
+        help="Trace format [chrome|otel] (Chrome trace events/OpenTelemetry).",
+    ),
+    metrics_file: str = typer.Option(
+        None,
+        "--metrics-file",
+        envvar="ARTISAN_METRICS_FILE",
+        help="Write metrics to this file, e.g. for the node_exporter textfile "
+        "collector (*.prom).",
+    ),
+    metrics_format: str = typer.Option(
+        "prometheus",
+        "--metrics-format",
+        envvar="ARTISAN_METRICS_FORMAT",
+        help="Metrics format [prometheus|openmetrics].",
+    ),
 ):
     """
     Artisan Tools CLI.
     """
-    pass
+    try:
+        setup_root_handler(log_level, log_format)
+    except ValueError as e:
+        raise typer.BadParameter(str(e))
+
+    if trace_format not in trace.FORMATS:
+        raise typer.BadParameter(f"Invalid trace format: {trace_format}")
+    if trace_file is not None:
+        trace.enable()
+        ctx.call_on_close(lambda: trace.export(trace_file, trace_format))
+
+    if metrics_format not in metrics.FORMATS:
+        raise typer.BadParameter(f"Invalid metrics format: {metrics_format}")
+    if metrics_file is not None:
+        ctx.call_on_close(lambda: metrics.write(metrics_file, metrics_format))
+
+
+class TracedGroup(TyperGroup):
+    """
+    Group recording a trace span for the invoked command, e.g. 'at version get'.
+    """
+
+    def invoke(self, ctx):
+        """
+        Invoke the command within a span named after it.
+        """
+        # Renamed to _protected_args in newer click versions:
+        protected = getattr(ctx, "_protected_args", None)
+        if protected is None:
+            protected = ctx.protected_args
+        args = [*protected, *ctx.args]
+        words = ["at", *args[:1]]
+        command = self.get_command(ctx, args[0]) if args else None
+        # Add the command name for sub-CLIs, e.g. 'at version get':
+        if hasattr(command, "commands") and args[1:2] and not args[1].startswith("-"):
+            words.append(args[1])
+        with trace.span(" ".join(words)):
+            return super().invoke(ctx)
+
+
+def factory() -> typer.Typer:
+    """
+    Create the top level CLI, extensions add their sub-CLIs to it.
+    """
+    cli = typer.Typer(name="artisan tools", cls=TracedGroup)
+    cli.callback()(main)
+    return cli
+
+
+cli = factory()
@@ -0,0 +1,279 @@
+"""
+Counters and histograms written to a file at exit.
+
+Metrics are collected in-process and written in Prometheus text format, e.g.
+for the node_exporter textfile collector, or in OpenMetrics format. No
+service is needed to collect them.
+
+Example:
+    >>> pushes = metrics.counter("artisan_pushes", "Pushed images", ["registry"])
+    >>> pushes.inc(registry="ghcr.io")
+    >>> with metrics.histogram("artisan_push_seconds", "Push time.").time():
+    ...     push()
+"""
+
+import bisect
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+FORMATS = ("prometheus", "openmetrics")
+
+DEFAULT_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1,
+    2.5,
+    5,
+    10,
+    30,
+    60,
+    120,
+    300,
+    600,
+)
+
+_metrics: dict = {}
+_lock = threading.Lock()
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", r"\\").replace("\n", r"\n").replace('"', r"\"")
+
+
+def _format_labels(names: tuple, values: tuple, extra: str = "") -> str:
+    labels = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        labels.append(extra)
+    return "{" + ",".join(labels) + "}" if labels else ""
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    """
+    Base class of metrics with labels.
+    """
+
+    type = ""
+
+    def __init__(self, name: str, help: str, labels: tuple = ()):
+        """
+        Create a metric without values.
+        """
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._values: dict = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict) -> tuple:
+        if set(labels) != set(self.labels):
+            raise ValueError(
+                f"Metric {self.name} has labels {self.labels}, got {tuple(labels)}"
+            )
+        return tuple(labels[name] for name in self.labels)
+
+    def _header(self, name: str) -> list[str]:
+        return [f"# HELP {name} {self.help}", f"# TYPE {name} {self.type}"]
+
+
+class Counter(Metric):
+    """
+    A value that only increases, e.g. a number of pushes.
+
+    Samples are named with a `_total` suffix, which is not part of the name.
+    """
+
+    type = "counter"
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        """
+        Increase the counter for a combination of labels.
+        """
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def get(self, **labels) -> float:
+        """
+        Get the value for a combination of labels.
+        """
+        return self._values.get(self._key(labels), 0)
+
+    def render(self, openmetrics: bool = False) -> list[str]:
+        """
+        Render the header and a `_total` sample per combination of labels.
+        """
+        sample = self.name + "_total"
+        # In OpenMetrics the metric family is named without the suffix:
+        lines = self._header(self.name if openmetrics else sample)
+        for key, value in sorted(self._values.items()):
+            labels = _format_labels(self.labels, key)
+            lines.append(f"{sample}{labels} {_format_value(value)}")
+        return lines
+
+
+class Histogram(Metric):
+    """
+    Distribution of observed values in buckets, e.g. durations.
+    """
+
+    type = "histogram"
+
+    def __init__(
+        self, name: str, help: str, labels: tuple = (), buckets=DEFAULT_BUCKETS
+    ):
+        """
+        Create a histogram with upper bounds `buckets` (+Inf is added).
+        """
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels) -> None:
+        """
+        Add an observation for a combination of labels.
+        """
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # Counts per bucket (the last is +Inf), sum:
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            state[0][index] += 1
+            state[1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        """
+        Observe the duration of the block in seconds.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels) -> int:
+        """
+        Get the number of observations for a combination of labels.
+        """
+        state = self._values.get(self._key(labels))
+        return 0 if state is None else sum(state[0])
+
+    def render(self, openmetrics: bool = False) -> list[str]:
+        """
+        Render the header and the bucket, sum and count samples.
+        """
+        lines = self._header(self.name)
+        for key, (counts, total) in sorted(self._values.items()):
+            cumulative = 0
+            for bound, count in zip((*self.buckets, math.inf), counts):
+                cumulative += count
+                labels = _format_labels(
+                    self.labels, key, f'le="{_format_value(float(bound))}"'
+                )
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labels, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+def _get_or_create(cls, name: str, help: str, labels, **kwargs):
+    with _lock:
+        metric = _metrics.get(name)
+        if metric is None:
+            metric = _metrics[name] = cls(name, help, tuple(labels), **kwargs)
+        elif not isinstance(metric, cls) or metric.labels != tuple(labels):
+            raise ValueError(f"Metric {name} already exists with other type/labels")
+        return metric
+
+
+def counter(name: str, help: str, labels=()) -> Counter:
+    """
+    Get or create a counter.
+
+    Args:
+    name: The metric name, e.g. 'artisan_pushes'.
+    help: Description of the metric.
+    labels: Names of the labels.
+    """
+    return _get_or_create(Counter, name, help, labels)
+
+
+def histogram(name: str, help: str, labels=(), buckets=DEFAULT_BUCKETS) -> Histogram:
+    """
+    Get or create a histogram.
+
+    Args:
+    name: The metric name, e.g. 'artisan_push_seconds'.
+    help: Description of the metric.
+    labels: Names of the labels.
+    buckets: Upper bounds of the buckets, +Inf is added.
+    """
+    return _get_or_create(Histogram, name, help, labels, buckets=buckets)
+
+
+def clear() -> None:
+    """
+    Remove all observations, metrics stay registered.
+    """
+    with _lock:
+        for metric in _metrics.values():
+            with metric._lock:
+                metric._values.clear()
+
+
+def render(format: str = "prometheus") -> str:
+    """
+    Render all metrics with observations.
+
+    Args:
+    format: 'prometheus' for the Prometheus text format or 'openmetrics'.
+
+    Returns:
+    str: The metrics in the text format.
+    """
+    if format not in FORMATS:
+        raise ValueError(f"Invalid metrics format: {format}, must be one of {FORMATS}")
+    openmetrics = format == "openmetrics"
+    lines = []
+    for name in sorted(_metrics):
+        metric = _metrics[name]
+        if metric._values:
+            lines += metric.render(openmetrics)
+    if openmetrics:
+        lines.append("# EOF")
+    return "".join(line + "\n" for line in lines)
+
+
+def write(path: str, format: str = "prometheus") -> None:
+    """
+    Write all metrics to a file.
+
+    The file is replaced atomically, so a collector never reads a partial
+    file. For the node_exporter textfile collector the name must end with
+    `.prom`.
+
+    Args:
+    path: The output file.
+    format: See `render`.
+    """
+    content = render(format)
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, "w") as file:
+        file.write(content)
+    os.replace(temporary, path)
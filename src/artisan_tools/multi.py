@@ -0,0 +1,252 @@
+"""
+Run commands in many repositories in parallel.
+
+Every repository is processed in a new worker process of a bounded pool, with
+an application loaded from the configuration of that repository. Output is
+captured per repository, and a failing repository doesn't affect the others.
+"""
+
+import contextlib
+import glob
+import json
+import os
+import shlex
+import sys
+import time
+import typing
+
+import typer
+from rich import print as rprint
+
+from artisan_tools.app import App
+from artisan_tools.batch import read_steps, run_steps
+
+FORMATS = ("table", "json")
+
+
+def find_repositories(patterns: typing.Iterable[str]) -> list[str]:
+    """
+    Find repository roots.
+
+    Args:
+    patterns: Glob patterns of directories, or files with one path (or
+        pattern) per line. Empty lines and lines starting with '#' are
+        ignored.
+
+    Returns:
+    list: Absolute paths of the directories, without duplicates.
+    """
+    paths: dict[str, None] = {}
+    for pattern in patterns:
+        if os.path.isfile(pattern):
+            with open(pattern, "r") as file:
+                lines = [line.strip() for line in file]
+            base = os.path.dirname(os.path.abspath(pattern))
+            entries = [
+                os.path.join(base, line)
+                for line in lines
+                if line and not line.startswith("#")
+            ]
+        else:
+            entries = [pattern]
+        for entry in entries:
+            for path in sorted(glob.glob(entry, recursive=True)):
+                if os.path.isdir(path):
+                    paths[os.path.abspath(path)] = None
+    return list(paths)
+
+
+def run_repository(path: str, steps: list[list[str]]) -> dict:
+    """
+    Run steps in a repository, capturing their output.
+
+    This is run in a worker process: the working directory, the standard
+    streams and `sys.path` of the process are changed and the local extensions
+    of the repository are imported, so a worker runs one repository only.
+
+    Args:
+    path: The repository root, containing artisan.yaml.
+    steps: The arguments of each step.
+
+    Returns:
+    dict: With `repository`, `exit_code`, `duration` (seconds), `stdout`,
+        `stderr` and `error` (None if the application loaded).
+    """
+    import tempfile
+
+    start = time.perf_counter()
+    code, error = 1, None
+    with tempfile.TemporaryFile() as stdout, tempfile.TemporaryFile() as stderr:
+        # Redirect the file descriptors as well, for external commands:
+        sys.stdout.flush()
+        sys.stderr.flush()
+        saved = os.dup(1), os.dup(2)
+        os.dup2(stdout.fileno(), 1)
+        os.dup2(stderr.fileno(), 2)
+        out = open(stdout.fileno(), "w", buffering=1, closefd=False)
+        err = open(stderr.fileno(), "w", buffering=1, closefd=False)
+        try:
+            with contextlib.redirect_stdout(out), contextlib.redirect_stderr(err):
+                try:
+                    os.chdir(path)
+                    if path not in sys.path:
+                        # Local extensions of the repository:
+                        sys.path.append(path)
+                    app = App(config_dir=path)
+                    app.load_extensions()
+                    try:
+                        results = run_steps(app, steps)
+                    finally:
+                        app.close()
+                    code = next((code for _, code, _ in results if code), 0)
+                except Exception as e:
+                    error = f"{type(e).__name__}: {e}"
+        finally:
+            out.close()
+            err.close()
+            os.dup2(saved[0], 1)
+            os.dup2(saved[1], 2)
+            os.close(saved[0])
+            os.close(saved[1])
+        stdout.seek(0)
+        stderr.seek(0)
+        output = [stream.read().decode(errors="replace") for stream in (stdout, stderr)]
+
+    return {
+        "repository": path,
+        "exit_code": code,
+        "duration": time.perf_counter() - start,
+        "stdout": output[0],
+        "stderr": output[1],
+        "error": error,
+    }
+
+
+def _run_process(path: str, steps: list[list[str]]) -> dict:
+    """
+    Run `run_repository` in a new process, which runs no other repository.
+    """
+    # Imported on use, multiprocessing is slow to import:
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    # Spawned, a forked process would inherit the modules of the parent:
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+        return executor.submit(run_repository, path, steps).result()
+
+
+def run_repositories(
+    paths: list[str], steps: list[list[str]], jobs: int | None = None
+) -> list[dict]:
+    """
+    Run steps in repositories in parallel.
+
+    Args:
+    paths: The repository roots.
+    steps: The arguments of each step.
+    jobs: Number of worker processes, defaults to the number of CPUs.
+
+    Returns:
+    list: The result of each repository, see `run_repository`, in the order
+        of `paths`. If a worker process died, the error is reported for the
+        repository.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    jobs = min(jobs or os.cpu_count() or 1, len(paths)) or 1
+    # The threads only wait for the processes, limiting how many run at once:
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        futures = [executor.submit(_run_process, path, steps) for path in paths]
+        results = []
+        for path, future in zip(paths, futures):
+            try:
+                results.append(future.result())
+            except Exception as e:
+                results.append(
+                    {
+                        "repository": path,
+                        "exit_code": 1,
+                        "duration": 0.0,
+                        "stdout": "",
+                        "stderr": "",
+                        "error": f"{type(e).__name__}: {e}",
+                    }
+                )
+    return results
+
+
+def _summary(result: dict) -> str:
+    if result["error"]:
+        return result["error"]
+    lines = result["stdout"].strip().splitlines()
+    return lines[-1] if lines else ""
+
+
+def setup(app: App):
+    """
+    Set up the multi command.
+    """
+
+    def multi(
+        steps: typing.List[str] = typer.Argument(  # noqa: B008
+            ..., help="Commands to run, e.g. 'version verify --check-tag'."
+        ),
+        repos: typing.List[str] = typer.Option(  # noqa: B008
+            ...,
+            "--repos",
+            help="Glob of repository roots or file listing them, can be repeated.",
+        ),
+        jobs: int = typer.Option(  # noqa: B008
+            None, "--jobs", "-j", help="Number of processes, defaults to CPUs."
+        ),
+        format: str = typer.Option(  # noqa: B008
+            "table", "--format", help="Output format [table|json]."
+        ),
+    ):
+        """
+        Run commands in many repositories in parallel.
+
+        Every repository must contain an artisan.yaml. The commands of a
+        repository are run in order, like with ``at run``.
+
+        Example: ``at multi "version verify --check-tag" --repos 'repos/*'``
+        """
+        if format not in FORMATS:
+            raise typer.BadParameter(f"Invalid format: {format}")
+        paths = find_repositories(repos)
+        if not paths:
+            raise typer.BadParameter(f"No repositories found: {' '.join(repos)}")
+
+        results = run_repositories(paths, read_steps(steps), jobs)
+
+        if format == "json":
+            typer.echo(json.dumps(results, indent=2))
+        else:
+            from rich.table import Table
+
+            table = Table("Repository", "Status", "Time", "Output")
+            for result in results:
+                status = (
+                    "[green]ok"
+                    if result["exit_code"] == 0
+                    else f"[bold red]failed ({result['exit_code']})"
+                )
+                table.add_row(
+                    os.path.relpath(result["repository"]),
+                    status,
+                    f"{result['duration']:.2f}s",
+                    _summary(result),
+                )
+            rprint(table)
+
+        failed = [r for r in results if r["exit_code"] != 0]
+        if failed:
+            rprint(
+                f"[bold red]Failed in {len(failed)} of {len(results)} repositories:"
+                f" {shlex.join(os.path.relpath(r['repository']) for r in failed)}",
+                file=sys.stderr,
+            )
+            raise typer.Exit(code=1)
+
+    app.add_command(multi, name="multi")
@@ -1,12 +1,17 @@
 from artisan_tools.app import App
 
 
-def parse(app: App, string: str) -> str:
+def parse(
+    app: App, string: str, context: str = ".", dockerfile: str | None = None
+) -> str:
     """
     Parse string to perform replacements.
 
     The following replacements are performed:
     - @version: The current version
+    - @latest: The latest release version tagged in the repository (empty if
+      there is none)
+    - @contenthash: The content hash of the container build context
 
     Parameters
     ----------
@@ -14,6 +19,22 @@ def parse(app: App, string: str) -> str:
         The application instance.
     string : str
         The string to parse.
+    context : str, optional
+        The container build context for @contenthash. Default is the current
+        directory.
+    dockerfile : str, optional
+        The Dockerfile for @contenthash. Default is 'Dockerfile' in the
+        context.
     """
-    version = app.get_extension("version").get_version(app)  # type: ignore[attr-defined]
+    version_api = app.get_extension("version")
+    version = version_api.get_version(app)  # type: ignore[attr-defined]
+    if "@latest" in string:
+        latest = version_api.get_index(app).latest()  # type: ignore[attr-defined]
+        string = string.replace("@latest", latest or "")
+    if "@contenthash" in string:
+        container_api = app.get_extension("container")
+        content_hash = container_api.content_hash(  # type: ignore[attr-defined]
+            app, context, dockerfile
+        )
+        string = string.replace("@contenthash", content_hash)
     return string.replace("@version", version)
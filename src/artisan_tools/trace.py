@@ -0,0 +1,373 @@
+"""
+Timing of external commands.
+
+External commands (git, container engines) are run with `run` or
+`check_output`, which record a span with the command, working directory,
+duration, exit code and size of the output. Spans are nested below the span
+of the running CLI command and can be exported in Chrome trace event format
+(chrome://tracing, Perfetto) or OpenTelemetry JSON format.
+
+Spans are only kept after recording is enabled with `enable` (by `--trace`),
+so long-running processes don't accumulate them.
+"""
+
+import contextlib
+import contextvars
+import itertools
+import json
+import os
+import shlex
+import subprocess
+import threading
+import time
+
+FORMATS = ("chrome", "otel")
+
+_spans: list[dict] = []
+_enabled = False
+_ids = itertools.count(1)
+_current: contextvars.ContextVar = contextvars.ContextVar("span", default=None)
+
+# Options of executables taking a value, skipped when naming spans:
+_OPTIONS_WITH_VALUE = {"-c", "-C", "--config", "--log-level"}
+
+
+def enable(enabled: bool = True) -> None:
+    """
+    Start or stop recording finished spans.
+    """
+    global _enabled
+    _enabled = enabled
+
+
+@contextlib.contextmanager
+def span(name: str, **attributes):
+    """
+    Record a span for the duration of the block.
+
+    Spans started within the block have this span as parent.
+
+    Args:
+    name: The name of the span.
+    attributes: Attributes of the span.
+
+    Yields:
+    dict: The attributes, which can be updated within the block.
+    """
+    record = {
+        "id": next(_ids),
+        "parent": _current.get(),
+        "name": name,
+        "start": time.time_ns(),
+        "duration": 0,
+        "thread": threading.get_ident(),
+        "attributes": attributes,
+    }
+    token = _current.set(record["id"])
+    begin = time.perf_counter_ns()
+    try:
+        yield attributes
+    except BaseException as error:
+        attributes.setdefault("error", type(error).__name__)
+        raise
+    finally:
+        record["duration"] = time.perf_counter_ns() - begin
+        _current.reset(token)
+        if _enabled:
+            _spans.append(record)
+
+
+def add_span(name: str, start: int, duration: int, **attributes) -> None:
+    """
+    Record a finished span, e.g. for work that can't be wrapped in `span`.
+
+    Args:
+    name: The name of the span.
+    start: Start time in nanoseconds since the epoch.
+    duration: Duration in nanoseconds.
+    attributes: Attributes of the span.
+    """
+    if not _enabled:
+        return
+    _spans.append(
+        {
+            "id": next(_ids),
+            "parent": _current.get(),
+            "name": name,
+            "start": start,
+            "duration": duration,
+            "thread": threading.get_ident(),
+            "attributes": attributes,
+        }
+    )
+
+
+def command_name(args: str | list[str]) -> str:
+    """
+    Name of a command for spans, the executable and its subcommand.
+
+    Example: 'git -c safe.directory=* ls-remote --tags' gives 'git ls-remote'.
+    """
+    if isinstance(args, str):
+        try:
+            words = shlex.split(args)
+        except ValueError:
+            words = args.split()
+    else:
+        words = [str(arg) for arg in args]
+    if not words:
+        return ""
+    name = [os.path.basename(words[0])]
+    skip = False
+    for arg in words[1:]:
+        if skip:
+            skip = False
+        elif arg in _OPTIONS_WITH_VALUE:
+            skip = True
+        elif not arg.startswith("-"):
+            name.append(arg)
+            break
+    return " ".join(name)
+
+
+def _command_span(args, kwargs: dict):
+    command = args if isinstance(args, str) else shlex.join(str(arg) for arg in args)
+    cwd = str(kwargs.get("cwd") or os.getcwd())
+    return span(command_name(args), command=command, cwd=cwd)
+
+
+def _size(output) -> int:
+    return 0 if output is None else len(output)
+
+
+def _decode(output: bytes | None) -> str | None:
+    return None if output is None else output.decode()
+
+
+def run(args, **kwargs) -> subprocess.CompletedProcess:
+    """
+    Run an external command with `subprocess.run`, recording a span.
+    """
+    with _command_span(args, kwargs) as attributes:
+        try:
+            result = subprocess.run(args, **kwargs)
+        except subprocess.CalledProcessError as error:
+            attributes["exit_code"] = error.returncode
+            attributes["output_bytes"] = _size(error.output) + _size(error.stderr)
+            raise
+        attributes["exit_code"] = result.returncode
+        attributes["output_bytes"] = _size(result.stdout) + _size(result.stderr)
+        return result
+
+
+def check_output(args, **kwargs):
+    """
+    Run an external command with `subprocess.check_output`, recording a span.
+    """
+    with _command_span(args, kwargs) as attributes:
+        try:
+            output = subprocess.check_output(args, **kwargs)
+        except subprocess.CalledProcessError as error:
+            attributes["exit_code"] = error.returncode
+            attributes["output_bytes"] = _size(error.output)
+            raise
+        attributes["exit_code"] = 0
+        attributes["output_bytes"] = _size(output)
+        return output
+
+
+async def arun(
+    args,
+    input: bytes | str | None = None,
+    capture_output: bool = False,
+    text: bool = False,
+    check: bool = False,
+    shell: bool = False,
+    **kwargs,
+) -> subprocess.CompletedProcess:
+    """
+    Run an external command with asyncio, recording a span.
+
+    The arguments are a subset of `subprocess.run`, with `shell=True` the
+    command is a string run by the shell. `stdout` and `stderr` can be set
+    as with `subprocess.run`, e.g. `stderr=subprocess.STDOUT`.
+    """
+    import asyncio
+
+    with _command_span(args, kwargs) as attributes:
+        if capture_output:
+            kwargs.setdefault("stdout", subprocess.PIPE)
+            kwargs.setdefault("stderr", subprocess.PIPE)
+        stdin = None if input is None else subprocess.PIPE
+        if shell:
+            create = asyncio.create_subprocess_shell(args, stdin=stdin, **kwargs)
+        else:
+            create = asyncio.create_subprocess_exec(*args, stdin=stdin, **kwargs)
+        process = await create
+        data = input.encode() if isinstance(input, str) else input
+        try:
+            stdout, stderr = await process.communicate(data)
+        except asyncio.CancelledError:
+            # Don't leave the process running when the task is cancelled:
+            process.kill()
+            await process.wait()
+            raise
+        returncode = await process.wait()
+        result: subprocess.CompletedProcess
+        if text:
+            result = subprocess.CompletedProcess(
+                args, returncode, _decode(stdout), _decode(stderr)
+            )
+        else:
+            result = subprocess.CompletedProcess(args, returncode, stdout, stderr)
+        attributes["exit_code"] = returncode
+        attributes["output_bytes"] = _size(result.stdout) + _size(result.stderr)
+        if check:
+            result.check_returncode()
+        return result
+
+
+def get_spans() -> list[dict]:
+    """
+    Get the finished spans, in the order they finished.
+    """
+    return list(_spans)
+
+
+def clear() -> None:
+    """
+    Remove all finished spans.
+    """
+    _spans.clear()
+
+
+def summary(spans: list[dict] | None = None) -> dict:
+    """
+    Aggregate spans by the top level span (CLI command) they belong to.
+
+    Returns:
+    dict: {top level span name: {span name: {'count': n, 'seconds': s}}}.
+    """
+    spans = get_spans() if spans is None else spans
+    by_id = {record["id"]: record for record in spans}
+
+    def root(record):
+        while record["parent"] in by_id:
+            record = by_id[record["parent"]]
+        return record
+
+    result: dict = {}
+    for record in spans:
+        top = root(record)
+        if top is record:
+            continue
+        entry = result.setdefault(top["name"], {}).setdefault(
+            record["name"], {"count": 0, "seconds": 0.0}
+        )
+        entry["count"] += 1
+        entry["seconds"] += record["duration"] / 1e9
+    return result
+
+
+def to_chrome(spans: list[dict]) -> dict:
+    """
+    Convert spans to Chrome trace event format.
+
+    The `summary` of the spans is included as metadata.
+    """
+    pid = os.getpid()
+    events = [
+        {
+            "name": record["name"],
+            "cat": "artisan",
+            "ph": "X",
+            "ts": record["start"] / 1000,
+            "dur": record["duration"] / 1000,
+            "pid": pid,
+            "tid": record["thread"],
+            "args": record["attributes"],
+        }
+        for record in spans
+    ]
+    return {
+        "traceEvents": events,
+        "displayTimeUnit": "ms",
+        "otherData": {"summary": summary(spans)},
+    }
+
+
+def _otel_value(value) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def to_otel(spans: list[dict]) -> dict:
+    """
+    Convert spans to OpenTelemetry (OTLP) JSON format.
+    """
+    trace_id = os.urandom(16).hex()
+    # Span ids are unique within the process, combine with a random prefix:
+    prefix = os.urandom(4).hex()
+
+    def span_id(number):
+        return f"{prefix}{number:08x}"
+
+    otel_spans = []
+    for record in spans:
+        failed = "error" in record["attributes"] or record["attributes"].get(
+            "exit_code", 0
+        )
+        otel_span = {
+            "traceId": trace_id,
+            "spanId": span_id(record["id"]),
+            "name": record["name"],
+            "kind": 1,
+            "startTimeUnixNano": str(record["start"]),
+            "endTimeUnixNano": str(record["start"] + record["duration"]),
+            "attributes": [
+                {"key": key, "value": _otel_value(value)}
+                for key, value in record["attributes"].items()
+            ],
+            "status": {"code": 2 if failed else 1},
+        }
+        if record["parent"] is not None:
+            otel_span["parentSpanId"] = span_id(record["parent"])
+        otel_spans.append(otel_span)
+
+    resource = {
+        "attributes": [
+            {"key": "service.name", "value": {"stringValue": "artisan-tools"}}
+        ]
+    }
+    return {
+        "resourceSpans": [
+            {
+                "resource": resource,
+                "scopeSpans": [
+                    {"scope": {"name": "artisan_tools.trace"}, "spans": otel_spans}
+                ],
+            }
+        ]
+    }
+
+
+def export(path: str, format: str = "chrome") -> None:
+    """
+    Write the finished spans to a file.
+
+    Args:
+    path: The output file.
+    format: 'chrome' for Chrome trace event format or 'otel' for
+        OpenTelemetry JSON.
+    """
+    if format not in FORMATS:
+        raise ValueError(f"Invalid trace format: {format}, must be one of {FORMATS}")
+    spans = get_spans()
+    data = to_chrome(spans) if format == "chrome" else to_otel(spans)
+    with open(path, "w") as file:
+        json.dump(data, file, default=str)
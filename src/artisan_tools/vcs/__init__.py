@@ -8,4 +8,8 @@ def setup(app):
     """
     app.register_extension("vcs", api)
 
+    if app.config["vcs"]["ssh-multiplex"]:
+        api.enable_ssh_multiplexing()
+        app.register_cleanup(api.disable_ssh_multiplexing)
+
     app.add_cli(cli.factory(app))
@@ -0,0 +1,171 @@
+"""
+Asynchronous variants of the git commands in `main`.
+
+Independent queries can be run concurrently, also across many repositories:
+
+    >>> statuses = await aio.map_repositories(aio.get_status, ["app", "lib"])
+
+Every function takes the path of the repository as `cwd`, the current
+directory is used by default.
+"""
+
+import asyncio
+import os
+import subprocess
+
+from artisan_tools import trace
+
+from .main import (
+    _git_seconds,
+    _remote_tags_cache,
+    _tag_check_seconds,
+    clear_remote_tags_cache,
+    git_env,
+    parse_remote_tags,
+    tag_command,
+)
+
+
+async def run_git_command(command, cwd=None):
+    """
+    Execute a git command and return its output as a string.
+
+    Args:
+    command (str): The git command to run.
+    cwd (str): The path to the directory in which to run the command. Optional.
+
+    Returns:
+    str: The output of the git command
+
+    Raises:
+    subprocess.CalledProcessError: If git fails.
+    """
+    options = "-c safe.directory=*"
+    git_command = f"git {options} {command}"
+    with _git_seconds.time(command=trace.command_name(git_command)):
+        result = await trace.arun(
+            git_command,
+            shell=True,
+            capture_output=True,
+            stderr=subprocess.STDOUT,
+            text=True,
+            cwd=cwd,
+            env=git_env(),
+        )
+    if result.returncode:
+        raise subprocess.CalledProcessError(
+            result.returncode, git_command, output=result.stdout
+        )
+    return result.stdout.strip()
+
+
+async def get_current_branch(cwd=None):
+    """
+    Returns the name of the currently checked-out Git branch.
+    """
+    return await run_git_command("branch --show-current", cwd)
+
+
+async def get_commit_hash(short=True, cwd=None):
+    """
+    Returns the (short) hash of the current commit.
+    """
+    options = "--short" if short else ""
+    return await run_git_command(f"rev-parse {options} HEAD", cwd)
+
+
+async def check_clean(cwd=None):
+    """
+    Check if the working directory is clean.
+    """
+    return not await run_git_command("status --porcelain", cwd)
+
+
+async def get_status(cwd=None):
+    """
+    Get the branch, commit hash and clean status of a repository concurrently.
+
+    Returns:
+    dict: With `branch` (str), `hash` (short hash) and `clean` (bool).
+    """
+    results = await asyncio.gather(
+        get_current_branch(cwd),
+        get_commit_hash(cwd=cwd),
+        check_clean(cwd),
+        return_exceptions=True,
+    )
+    # Raise after all commands finished, so no git process is left running:
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
+    branch, hash, clean = results
+    return {"branch": branch, "hash": hash, "clean": clean}
+
+
+async def get_remote_tags(cached=False, cwd=None):
+    """
+    Retrieve a list of tags from the remote git repository.
+
+    The cache is shared with `main.get_remote_tags`.
+
+    Args:
+    cached (bool): Reuse the tags retrieved by a previous call for the same
+        repository. The cache is cleared when a tag is pushed.
+    cwd (str): The path to the repository. Optional.
+
+    Returns:
+    list of str: A list of tags from the remote repository.
+    """
+    key = os.path.abspath(cwd or os.getcwd())
+    if cached and key in _remote_tags_cache:
+        return list(_remote_tags_cache[key])
+
+    tags = parse_remote_tags(await run_git_command("ls-remote --tags", cwd))
+    _remote_tags_cache[key] = tags
+    return list(tags)
+
+
+async def check_tag(tag, cwd=None):
+    """
+    Check if a given tag exists in the remote git repository.
+    """
+    with _tag_check_seconds.time():
+        remote_tags = await get_remote_tags(cwd=cwd)
+    return tag in remote_tags
+
+
+async def add_and_push_tag(config, tag_name, message, remote="origin", cwd=None):
+    """
+    Add a tag to the current commit and push it to a remote repository.
+
+    See `main.add_and_push_tag`.
+    """
+    await run_git_command(tag_command(config, tag_name, message), cwd)
+    await run_git_command(f"push {remote} {tag_name}", cwd)
+    clear_remote_tags_cache()
+
+
+async def map_repositories(function, paths, limit=8):
+    """
+    Call an asynchronous function for many repositories concurrently.
+
+    Args:
+    function: Coroutine function taking the repository path as `cwd`, e.g.
+        `get_status`.
+    paths (list of str): The paths to the repositories.
+    limit (int): Maximum number of repositories processed at once.
+
+    Returns:
+    dict: The results by path. If the function raised an exception for a
+        repository, the exception is the result.
+    """
+    semaphore = asyncio.Semaphore(limit)
+
+    async def call(path):
+        async with semaphore:
+            return await function(cwd=path)
+
+    results = await asyncio.gather(
+        *(call(path) for path in paths), return_exceptions=True
+    )
+    return dict(zip(paths, results))
@@ -3,4 +3,17 @@ from artisan_tools.vcs.main import (  # noqa: F401
     check_clean,
     get_commit_hash,
     get_current_branch,
+    get_status,
+    get_remote_tags,
+    clear_remote_tags_cache,
+    get_tags,
+    get_changed_files,
+    get_last_tag,
+    get_git_dir,
+    is_ancestor,
+    iter_commit_messages,
+    is_shallow,
+    prepare,
+    enable_ssh_multiplexing,
+    disable_ssh_multiplexing,
 )
@@ -69,4 +69,65 @@ def factory(app):
             f"Tagged current changeset as '{tag}' and pushed to remote repository."
         )
 
+    @cli.command()
+    def prepare(
+        match: str = typer.Option(  # noqa: B008
+            "v*", "--match", help="Glob pattern of the tags to fetch."
+        ),
+        remote: str = typer.Option(  # noqa: B008
+            "origin", "--remote", help="The remote to fetch from."
+        ),
+        step: int = typer.Option(  # noqa: B008
+            50, "--step", help="Commits to deepen the history by first."
+        ),
+    ):
+        """
+        Fetch the tags and history needed for versioning in a shallow clone.
+
+        Only tags matching the pattern are fetched, and the history is deepened
+        until the last release tag is reachable, without file contents. What
+        was fetched is recorded, running it again for the same commit does
+        nothing.
+        """
+        result = artisan_tools.vcs.main.prepare(match=match, remote=remote, step=step)
+        if not result["fetched"]:
+            typer.echo("Already prepared for the current commit.")
+        elif result["tag"] is None:
+            typer.echo(f"No tag matching '{match}' is reachable.")
+        else:
+            typer.echo(
+                f"Tag '{result['tag']}' is reachable, history deepened by "
+                f"{result['deepened']} commits."
+            )
+
+    @cli.command()
+    def released_in(
+        commit: str = typer.Argument(  # noqa: B008
+            ..., help="The commit, e.g. a hash."
+        ),
+        prefix: str = typer.Option(  # noqa: B008
+            "v", "--prefix", help="Prefix of the release tags."
+        ),
+        prerelease: bool = typer.Option(  # noqa: B008
+            False, "--prerelease", help="Include prerelease tags."
+        ),
+    ):
+        """
+        Print the first release tag containing a commit.
+
+        The commits of all releases are indexed in the .git directory, the
+        index is updated when tags are added. Exits with code 1 if the commit
+        is not released yet.
+        """
+        from artisan_tools.vcs.release_index import released_in
+
+        try:
+            tag = released_in(commit, prefix, include_prerelease=prerelease)
+        except ValueError as e:
+            raise typer.BadParameter(str(e))
+        if tag is None:
+            typer.echo(f"Commit '{commit}' is not in a release.", err=True)
+            raise typer.Exit(code=1)
+        typer.echo(tag)
+
     return cli
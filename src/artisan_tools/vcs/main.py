@@ -1,4 +1,33 @@
+import contextvars
+import json
+import os
+import shlex
 import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from artisan_tools import metrics, trace
+
+_git_seconds = metrics.histogram(
+    "artisan_git_command_seconds", "Execution time of git commands", ["command"]
+)
+_tag_check_seconds = metrics.histogram(
+    "artisan_vcs_tag_check_seconds", "Time to check if a tag exists in the remote"
+)
+
+# Strategies of `check_clean`:
+DIRTY_CHECKS = ("status", "tracked")
+
+# Record of `prepare` in the .git directory:
+PREPARE_FILE = os.path.join("artisan", "prepare.json")
+
+# Shared SSH connections, see `enable_ssh_multiplexing`:
+_ssh: dict = {}
+
+# Output of ls-remote by working directory, see `get_remote_tags`:
+_remote_tags_cache: dict[str, list[str]] = {}
 
 
 def run_git_command(command, cwd=None):
@@ -14,21 +43,262 @@ def run_git_command(command, cwd=None):
     """
     options = "-c safe.directory=*"
     git_command = f"git {options} {command}"
-    result = subprocess.check_output(
-        git_command, stderr=subprocess.STDOUT, shell=True, encoding="utf-8", cwd=cwd
-    )
+    with _git_seconds.time(command=trace.command_name(git_command)):
+        result = trace.check_output(
+            git_command,
+            stderr=subprocess.STDOUT,
+            shell=True,
+            encoding="utf-8",
+            cwd=cwd,
+            env=git_env(),
+        )
     return result.strip()
 
 
-def get_remote_tags():
+def git_env():
+    """
+    Get the environment for git commands.
+
+    Returns:
+    dict: The environment, or None to inherit the environment of the process.
+    """
+    if not _ssh:
+        return None
+    return {**os.environ, "GIT_SSH_COMMAND": _ssh["command"]}
+
+
+def _ssh_command():
+    """
+    Get the SSH command git uses, with the same precedence as git.
+    """
+    if os.environ.get("GIT_SSH_COMMAND"):
+        return os.environ["GIT_SSH_COMMAND"]
+    try:
+        command = run_git_command("config core.sshCommand")
+    except subprocess.CalledProcessError:
+        # Not set:
+        command = ""
+    if command:
+        return command
+    if os.environ.get("GIT_SSH"):
+        # A program without arguments, not run by the shell:
+        return shlex.quote(os.environ["GIT_SSH"])
+    return "ssh"
+
+
+def enable_ssh_multiplexing(persist=60):
+    """
+    Share one SSH connection per host between remote git commands.
+
+    The first command connecting to a host starts an SSH control master,
+    which later commands (e.g. `ls-remote` and `push`) reuse, saving the
+    handshake. Remotes not using SSH are not affected. The configured SSH
+    command (GIT_SSH_COMMAND, core.sshCommand or GIT_SSH) is kept.
+
+    Args:
+    persist (int): Seconds the connection is kept open when unused, in case
+        `disable_ssh_multiplexing` isn't called.
+    """
+    import tempfile
+
+    if _ssh:
+        return
+    ssh = _ssh_command()
+    directory = tempfile.mkdtemp(prefix="artisan-ssh-")
+    # %C is a hash of the connection, short enough for socket paths:
+    control_path = shlex.quote(f"ControlPath={os.path.join(directory, '%C')}")
+    _ssh.update(
+        ssh=ssh,
+        directory=directory,
+        command=(
+            f"{ssh} -o ControlMaster=auto -o {control_path} "
+            f"-o ControlPersist={persist}"
+        ),
+    )
+
+
+def disable_ssh_multiplexing():
+    """
+    Close the connections shared since `enable_ssh_multiplexing`.
+    """
+    import shutil
+
+    if not _ssh:
+        return
+    for name in os.listdir(_ssh["directory"]):
+        path = os.path.join(_ssh["directory"], name)
+        # The host is not used, the control path identifies the connection:
+        command = [*shlex.split(_ssh["ssh"]), "-o", f"ControlPath={path}"]
+        trace.run([*command, "-O", "exit", "artisan"], capture_output=True)
+    shutil.rmtree(_ssh["directory"], ignore_errors=True)
+    _ssh.clear()
+
+
+def get_remote_tags(cached=False):
     """
     Retrieve a list of tags from the remote git repository.
 
+    Args:
+    cached (bool): Reuse the tags retrieved by a previous call in the same
+        directory. The cache is cleared when a tag is pushed.
+
     Returns:
     list of str: A list of tags from the remote repository.
     """
-    remote_tags_output = run_git_command("ls-remote --tags")
-    return [line.split("/")[-1] for line in remote_tags_output.split("\n") if line]
+    cwd = os.getcwd()
+    if cached and cwd in _remote_tags_cache:
+        return list(_remote_tags_cache[cwd])
+
+    tags = parse_remote_tags(run_git_command("ls-remote --tags"))
+    _remote_tags_cache[cwd] = tags
+    return list(tags)
+
+
+def parse_remote_tags(output):
+    """
+    Parse the output of `git ls-remote --tags` to a list of tags.
+    """
+    # Lines are '<sha>\trefs/tags/<tag>', other lines are messages from git:
+    return [
+        line.split("\trefs/tags/", 1)[1]
+        for line in output.split("\n")
+        if "\trefs/tags/" in line and not line.endswith("^{}")
+    ]
+
+
+def clear_remote_tags_cache():
+    """
+    Clear the tags cached by `get_remote_tags`.
+    """
+    _remote_tags_cache.clear()
+
+
+def get_tags(cwd=None):
+    """
+    Retrieve a list of tags in the local git repository.
+
+    Args:
+    cwd (str): The path to the repository. Optional.
+
+    Returns:
+    list of str: A list of local tags.
+    """
+    output = run_git_command("for-each-ref --format='%(refname)' refs/tags", cwd=cwd)
+    return [line.removeprefix("refs/tags/") for line in output.split("\n") if line]
+
+
+def get_changed_files(since, cwd=None, relative=False):
+    """
+    Retrieve files changed between a revision and the current commit.
+
+    Renames are reported as a deletion and an addition, so both the old and the
+    new path is included.
+
+    Args:
+    since (str): The revision (e.g. a tag) to compare with.
+    cwd (str): The path to the repository. Optional.
+    relative (bool): Only include files below the working directory, with
+        paths relative to it.
+
+    Returns:
+    list of str: Paths of changed files relative to the repository root, or
+        the working directory with `relative`.
+    """
+    option = " --relative" if relative else ""
+    output = run_git_command(
+        f"diff --name-only --no-renames -z{option} {since}..HEAD --", cwd=cwd
+    )
+    return [path for path in output.split("\0") if path]
+
+
+def get_last_tag(match="v*", cwd=None):
+    """
+    Get the most recent tag reachable from the current commit.
+
+    Args:
+    match (str): Only consider tags matching this glob pattern.
+    cwd (str): The path to the repository. Optional.
+
+    Returns:
+    str: The tag or None if no matching tag is reachable.
+    """
+    try:
+        return run_git_command(f"describe --tags --abbrev=0 --match '{match}'", cwd)
+    except subprocess.CalledProcessError:
+        return None
+
+
+def get_git_dir(cwd=None):
+    """
+    Get the absolute path of the .git directory of the repository.
+    """
+    return run_git_command("rev-parse --absolute-git-dir", cwd=cwd)
+
+
+def is_ancestor(commit, cwd=None):
+    """
+    Check if a commit is an ancestor of (or equal to) the current commit.
+    """
+    try:
+        run_git_command(f"merge-base --is-ancestor {commit} HEAD", cwd=cwd)
+    except subprocess.CalledProcessError:
+        return False
+    return True
+
+
+def iter_commit_messages(revision_range, paths=(), cwd=None):
+    """
+    Iterate over commit messages, newest first.
+
+    The output of `git log` is streamed, so commits are yielded as they are
+    read and git is stopped if the iteration is ended early.
+
+    Args:
+    revision_range (str): The commits to include, e.g. 'v1.0.0..HEAD'.
+    paths (list): Only include commits touching these paths. Optional.
+    cwd (str): The path to the repository. Optional.
+
+    Yields:
+    str: The commit messages.
+    """
+    command = ["git", "-c", "safe.directory=*", "log", "-z", "--format=%B"]
+    command += [revision_range, "--", *paths]
+    start, begin, size = time.time_ns(), time.perf_counter_ns(), 0
+    process = subprocess.Popen(
+        command,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        encoding="utf-8",
+        errors="replace",
+        cwd=cwd,
+    )
+    try:
+        buffer = ""
+        while chunk := process.stdout.read(65536):
+            size += len(chunk)
+            *messages, buffer = (buffer + chunk).split("\0")
+            yield from messages
+        if buffer:
+            yield buffer
+        returncode = process.wait()
+        if returncode:
+            raise subprocess.CalledProcessError(
+                returncode, command, stderr=process.stderr.read()
+            )
+    finally:
+        if process.poll() is None:
+            process.kill()
+        process.stdout.close()
+        process.stderr.close()
+        trace.add_span(
+            "git log",
+            start,
+            time.perf_counter_ns() - begin,
+            command=shlex.join(command),
+            cwd=str(cwd or os.getcwd()),
+            exit_code=process.wait(),
+            output_bytes=size,
+        )
 
 
 def check_tag(tag):
@@ -41,7 +311,8 @@ def check_tag(tag):
     Returns:
     bool: True if the tag exists in the remote repository, False otherwise.
     """
-    remote_tags = get_remote_tags()
+    with _tag_check_seconds.time():
+        remote_tags = get_remote_tags()
     return tag in remote_tags
 
 
@@ -78,13 +349,21 @@ def add_and_push_tag(config, tag_name, message, remote="origin"):
 
     """
     # Add the tag
-    git_options = (
-        f"-c user.name=\"{config['username']}\" -c user.email=\"{config['email']}\""
-    )
-    run_git_command(f"{git_options} tag -a {tag_name} -m '{message}'")
+    run_git_command(tag_command(config, tag_name, message))
 
     # Push the tag to the remote repository
     run_git_command(f"push {remote} {tag_name}")
+    clear_remote_tags_cache()
+
+
+def tag_command(config, tag_name, message):
+    """
+    Get the git command adding an annotated tag, see `add_and_push_tag`.
+    """
+    git_options = (
+        f"-c user.name=\"{config['username']}\" -c user.email=\"{config['email']}\""
+    )
+    return f"{git_options} tag -a {tag_name} -m '{message}'"
 
 
 def get_commit_hash(short=True):
@@ -95,8 +374,200 @@ def get_commit_hash(short=True):
     return run_git_command(f"rev-parse {options} HEAD")
 
 
-def check_clean():
+def _has_output(command, cwd=None):
+    """
+    Run a git command and check if it writes anything to stdout.
+
+    The output is streamed and git is stopped at the first line, so commands
+    listing many files can return early.
+    """
+    command = ["git", "-c", "safe.directory=*", *command]
+    start, begin = time.time_ns(), time.perf_counter_ns()
+    process = subprocess.Popen(
+        command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, cwd=cwd
+    )
+    try:
+        line = process.stdout.readline()
+        if line:
+            return True
+        returncode = process.wait()
+        if returncode:
+            raise subprocess.CalledProcessError(
+                returncode, command, stderr=process.stderr.read()
+            )
+        return False
+    finally:
+        if process.poll() is None:
+            process.kill()
+        process.stdout.close()
+        process.stderr.close()
+        duration = time.perf_counter_ns() - begin
+        name = trace.command_name(command)
+        _git_seconds.observe(duration / 1e9, command=name)
+        trace.add_span(
+            name,
+            start,
+            duration,
+            command=shlex.join(command),
+            cwd=str(cwd or os.getcwd()),
+            exit_code=process.wait(),
+        )
+
+
+def check_clean(strategy="status", untracked=True, caches=False, cwd=None):
     """
     Check if the working directory is clean.
+
+    Git uses the untracked cache and fsmonitor if they are enabled in the git
+    configuration, `caches` enables them for this check only.
+
+    Args:
+    strategy (str): 'status' to stop reading `git status` at the first
+        changed file, or 'tracked' to check tracked files with
+        `git diff-index`, which doesn't walk untracked files unless
+        `untracked` is set.
+    untracked (bool): Untracked (and not ignored) files make the working
+        directory dirty.
+    caches (bool): Enable the untracked cache and, on macOS and Windows, the
+        builtin fsmonitor.
+    cwd (str): The path to the repository. Optional.
+
+    Returns:
+    bool: True if the working directory is clean.
+    """
+    if strategy not in DIRTY_CHECKS:
+        raise ValueError(
+            f"Invalid dirty check strategy: {strategy}, must be one of {DIRTY_CHECKS}"
+        )
+    options = []
+    if caches:
+        options += ["-c", "core.untrackedCache=true"]
+        if sys.platform in ("darwin", "win32"):
+            options += ["-c", "core.fsmonitor=true"]
+
+    if strategy == "status":
+        # Untracked files are listed per directory ('normal'), which is the
+        # mode supported by the untracked cache:
+        mode = "--untracked-files=normal" if untracked else "--untracked-files=no"
+        return not _has_output([*options, "status", "--porcelain", mode], cwd)
+
+    # Refresh file stats first, so touched files are not reported as changed:
+    run_git_command("update-index -q --refresh", cwd=cwd)
+    try:
+        run_git_command("diff-index --quiet HEAD --", cwd=cwd)
+    except subprocess.CalledProcessError as e:
+        if e.returncode == 1:
+            return False
+        raise
+    if untracked:
+        command = [*options, "ls-files", "--others", "--exclude-standard"]
+        return not _has_output(command, cwd)
+    return True
+
+
+def get_status(cwd=None, dirty_check=None):
+    """
+    Get the branch, commit hash and clean status of a repository.
+
+    The git commands are run concurrently.
+
+    Args:
+    cwd (str): The path to the repository. Optional.
+    dirty_check (dict): Arguments of `check_clean`, e.g. the `vcs.dirty-check`
+        configuration. Optional.
+
+    Returns:
+    dict: With `branch` (str), `hash` (short hash) and `clean` (bool).
+    """
+    calls = {
+        "branch": (run_git_command, "branch --show-current", cwd),
+        "hash": (run_git_command, "rev-parse --short HEAD", cwd),
+        "clean": (partial(check_clean, cwd=cwd, **(dirty_check or {})),),
+    }
+    with ThreadPoolExecutor(max_workers=len(calls)) as executor:
+        # Run in a copy of the context, so commands are traced as children:
+        futures = {
+            key: executor.submit(contextvars.copy_context().run, *call)
+            for key, call in calls.items()
+        }
+        return {key: future.result() for key, future in futures.items()}
+
+
+def is_shallow(cwd=None):
     """
-    return not run_git_command("status --porcelain")
+    Check if the repository is a shallow clone.
+    """
+    return run_git_command("rev-parse --is-shallow-repository", cwd=cwd) == "true"
+
+
+def _deepen(remote, commit, depth, filter, cwd=None):
+    options = f"--no-tags --deepen={depth}" + (f" --filter={filter}" if filter else "")
+    try:
+        # Only the history of the current commit:
+        run_git_command(f"fetch {options} {remote} {commit}", cwd=cwd)
+    except subprocess.CalledProcessError:
+        # The server doesn't allow fetching commits by hash, deepen branches:
+        run_git_command(f"fetch {options} {remote}", cwd=cwd)
+
+
+def prepare(match="v*", remote="origin", step=50, filter="blob:none", cwd=None):
+    """
+    Fetch the tags and history needed for versioning in a shallow clone.
+
+    Tags matching `match` are fetched without their history, then the history
+    of the current commit is deepened (doubling the depth every time) until
+    a matching tag is reachable. With `filter` only commits and trees are
+    fetched, files are fetched by git when needed.
+
+    What was fetched is recorded in the .git directory, so calling this again
+    for the same commit doesn't fetch anything.
+
+    Args:
+    match (str): Glob pattern of the tags to fetch, at most one '*'.
+    remote (str): The remote to fetch from.
+    step (int): Number of commits to deepen the history by first.
+    filter (str): Partial clone filter, empty to fetch complete history.
+    cwd (str): The path to the repository. Optional.
+
+    Returns:
+    dict: With `tag` (last reachable tag or None), `deepened` (number of
+        commits the history was deepened by) and `fetched` (False if the
+        record of a previous call was used).
+    """
+    if match.count("*") > 1:
+        raise ValueError(f"Invalid tag pattern: {match}, at most one '*' is allowed")
+
+    head = run_git_command("rev-parse HEAD", cwd=cwd)
+    path = os.path.join(get_git_dir(cwd), PREPARE_FILE)
+    try:
+        with open(path, "r") as file:
+            record = json.load(file)
+    except (FileNotFoundError, json.JSONDecodeError):
+        record = {}
+    if record.get("request") == [head, match, remote]:
+        return {"tag": record["tag"], "deepened": record["deepened"], "fetched": False}
+
+    # Tags only, the history is fetched below if the repository is shallow:
+    options = "--no-tags" + (f" --filter={filter}" if filter else "")
+    if is_shallow(cwd):
+        options += " --depth=1"
+    refspec = shlex.quote(f"+refs/tags/{match}:refs/tags/{match}")
+    run_git_command(f"fetch {options} {remote} {refspec}", cwd=cwd)
+
+    deepened, depth = 0, step
+    commits = run_git_command("rev-list --count HEAD", cwd=cwd)
+    while (tag := get_last_tag(match, cwd)) is None and is_shallow(cwd):
+        _deepen(remote, head, depth, filter, cwd)
+        deepened += depth
+        depth *= 2
+        previous, commits = commits, run_git_command("rev-list --count HEAD", cwd)
+        if commits == previous:
+            break
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path + ".tmp", "w") as file:
+        json.dump(
+            {"request": [head, match, remote], "tag": tag, "deepened": deepened}, file
+        )
+    os.replace(path + ".tmp", path)
+    return {"tag": tag, "deepened": deepened, "fetched": True}
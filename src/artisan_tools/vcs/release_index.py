@@ -0,0 +1,198 @@
+"""
+Index of the first release containing each commit.
+
+`git tag --contains` walks the history for every tag. The index stores the
+lowest (semver) release tag containing each commit in an SQLite database in
+the .git directory, so a lookup is a single query. It is built with
+`git rev-list` between consecutive release tags and extended when tags are
+added.
+"""
+
+import os
+import shlex
+import sqlite3
+import subprocess
+
+from artisan_tools import trace
+from artisan_tools.vcs.main import get_git_dir, get_tags, git_env, run_git_command
+
+INDEX_FILE = os.path.join("artisan", "releases.sqlite")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS settings (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS tags (
+    position INTEGER PRIMARY KEY, tag TEXT UNIQUE, commit_sha TEXT
+);
+CREATE TABLE IF NOT EXISTS commits (sha TEXT PRIMARY KEY, tag TEXT) WITHOUT ROWID;
+"""
+
+
+class ReleaseIndex:
+    """
+    Persistent index mapping commits to the first release tag containing them.
+
+    Example:
+        >>> with ReleaseIndex() as index:
+        ...     index.released_in("1a2b3c4")
+        'v1.2.0'
+    """
+
+    def __init__(
+        self,
+        prefix: str = "v",
+        include_prerelease: bool = False,
+        path: str | None = None,
+        cwd: str | None = None,
+    ):
+        """
+        Open (or create) the index.
+
+        Args:
+        prefix: Prefix of the release tags, e.g. 'v' for 'v1.2.0'.
+        include_prerelease: Include prerelease tags, e.g. 'v1.2.0-rc.1'.
+        path: The database file, defaults to a file in the .git directory.
+        cwd: The path to the repository. Optional.
+        """
+        self.prefix = prefix
+        self.include_prerelease = include_prerelease
+        self.cwd = cwd
+        self.path = path or os.path.join(get_git_dir(cwd), INDEX_FILE)
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self.db = sqlite3.connect(self.path)
+        self.db.executescript(_SCHEMA)
+
+    def __enter__(self):
+        """
+        Use the index as context manager, closing it on exit.
+        """
+        return self
+
+    def __exit__(self, *exc_info):
+        """
+        Close the database.
+        """
+        self.close()
+
+    def close(self) -> None:
+        """
+        Close the database.
+        """
+        self.db.close()
+
+    def release_tags(self) -> dict[str, str]:
+        """
+        Get the release tags of the repository and their commits.
+
+        Returns:
+        dict: Commit hash by tag, sorted by version.
+        """
+        from artisan_tools.version.index import VersionIndex
+
+        index = VersionIndex(get_tags(self.cwd), self.prefix)
+        tags = [index.tag(v) for v in index.versions(self.include_prerelease)]
+        if not tags:
+            return {}
+        revisions = " ".join(shlex.quote(f"refs/tags/{tag}^{{commit}}") for tag in tags)
+        commits = run_git_command(f"rev-parse {revisions}", cwd=self.cwd).split()
+        return dict(zip(tags, commits))
+
+    def _rev_list(self, tag: str, exclude: list[str]) -> list[str]:
+        # Revisions are passed on stdin, there may be many previous tags:
+        revisions = [f"refs/tags/{tag}", *(f"^refs/tags/{e}" for e in exclude)]
+        result = trace.run(
+            ["git", "-c", "safe.directory=*", "rev-list", "--stdin"],
+            input="\n".join(revisions) + "\n",
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=self.cwd,
+            env=git_env(),
+        )
+        return result.stdout.split()
+
+    def update(self) -> int:
+        """
+        Add the commits of new release tags to the index.
+
+        Tags with a higher version than the indexed tags are added in place.
+        If a tag was inserted between indexed tags (e.g. a release from a
+        maintenance branch), moved or deleted, the index is rebuilt.
+
+        Returns:
+        int: The number of tags added.
+        """
+        tags = self.release_tags()
+        settings = {
+            "prefix": self.prefix,
+            "prerelease": str(int(self.include_prerelease)),
+        }
+        indexed = dict(
+            self.db.execute("SELECT tag, commit_sha FROM tags ORDER BY position")
+        )
+        if dict(self.db.execute("SELECT key, value FROM settings")) != settings or (
+            list(tags.items())[: len(indexed)] != list(indexed.items())
+        ):
+            with self.db:
+                self.db.execute("DELETE FROM commits")
+                self.db.execute("DELETE FROM tags")
+                self.db.execute("DELETE FROM settings")
+                self.db.executemany(
+                    "INSERT INTO settings VALUES (?, ?)", settings.items()
+                )
+            indexed = {}
+
+        previous = list(indexed)
+        new_tags = list(tags)[len(indexed) :]
+        for tag in new_tags:
+            # Commits in lower releases are excluded, they are already indexed:
+            commits = self._rev_list(tag, previous)
+            with self.db:
+                self.db.executemany(
+                    "INSERT OR IGNORE INTO commits VALUES (?, ?)",
+                    ((sha, tag) for sha in commits),
+                )
+                self.db.execute(
+                    "INSERT INTO tags VALUES (?, ?, ?)",
+                    (len(previous), tag, tags[tag]),
+                )
+            previous.append(tag)
+        return len(new_tags)
+
+    def released_in(self, commit: str) -> str | None:
+        """
+        Get the first release tag containing a commit.
+
+        The index must be up to date, see `update`.
+
+        Args:
+        commit: The commit, e.g. a (short) hash or a branch.
+
+        Returns:
+        str: The tag or None if the commit is not in a release.
+
+        Raises:
+        ValueError: If the commit doesn't exist.
+        """
+        try:
+            sha = run_git_command(
+                f"rev-parse --verify {shlex.quote(commit + '^{commit}')}", cwd=self.cwd
+            )
+        except subprocess.CalledProcessError:
+            raise ValueError(f"Unknown commit: {commit}")
+        row = self.db.execute(
+            "SELECT tag FROM commits WHERE sha = ?", (sha,)
+        ).fetchone()
+        return row[0] if row else None
+
+
+def released_in(
+    commit: str, prefix: str = "v", include_prerelease: bool = False, cwd=None
+) -> str | None:
+    """
+    Get the first release tag containing a commit, updating the index first.
+
+    See `ReleaseIndex.released_in`.
+    """
+    with ReleaseIndex(prefix, include_prerelease, cwd=cwd) as index:
+        index.update()
+        return index.released_in(commit)
@@ -1,3 +1,4 @@
+import os
 import re
 
 from artisan_tools.app import App
@@ -9,10 +10,15 @@ from artisan_tools.version.main import (
     run_hook,
 )
 
+from artisan_tools.version import commits
+from artisan_tools import metrics
+from artisan_tools.version.index import VersionIndex
 from artisan_tools.log import get_logger
 
 log = get_logger("version.api")
 
+_bumps = metrics.counter("artisan_version_bumps", "Version bumps", ["part"])
+
 
 def get_version(app: App):
     """
@@ -31,14 +37,36 @@ def get_version(app: App):
     return read_version_file(file_path)
 
 
+def get_index(
+    app: App, remote: bool = False, prefix: str = "v", suffix: str = ""
+) -> VersionIndex:
+    """
+    Get an index of the versions tagged in the repository.
+
+    Args:
+        app (App): The application object.
+        remote (bool): Use the tags of the remote repository instead of the
+            local tags. The remote tags are cached for the process.
+        prefix (str): Prefix of version tags.
+        suffix (str): Suffix of version tags.
+
+    Returns:
+        VersionIndex: The index, see `artisan_tools.version.index`.
+    """
+    vcs = app.get_extension("vcs")
+    tags = vcs.get_remote_tags(cached=True) if remote else vcs.get_tags()  # type: ignore[attr-defined]
+    return VersionIndex(tags, prefix, suffix)
+
+
 def bump(app: App, target: str):
     """
     Replace version in file using string substitution.
 
     Args:
         app (App): The application object.
-        target (str): Either part to bump [major|minor|patch] or a full version
-            string. In the latter case it must be a valid semver string.
+        target (str): Either part to bump [major|minor|patch], 'auto' to infer
+            the part from conventional commits since the last release or a full
+            version string. In the latter case it must be a valid semver string.
 
     Returns:
         str: The updated version string.
@@ -51,7 +79,28 @@ def bump(app: App, target: str):
         >>> replace_version(app, "minor")
         '1.2.0'
     """
-    current_version = read_version_file(app.config["version"]["release"])
+    if target == "auto":
+        last_tag = app.get_extension("vcs").get_last_tag()  # type: ignore[attr-defined]
+        target = commits.infer_bump(app, since=last_tag)
+    return bump_files(app, app.config["version"], target)
+
+
+def bump_files(app: App, version_config: dict, target: str, root: str = "") -> str:
+    """
+    Bump the version in the files given by a version configuration.
+
+    Args:
+        app (App): The application object.
+        version_config (dict): Configuration with `release` and `bump-hooks`
+            entries, e.g. the `version` section of the configuration.
+        target (str): Either part to bump [major|minor|patch] or a full version
+            string.
+        root (str): Directory that relative paths in hooks are relative to.
+
+    Returns:
+        str: The updated version string.
+    """
+    current_version = read_version_file(version_config["release"])
 
     if target in ["major", "minor", "patch"]:
         new_version = bump_version(current_version, target)
@@ -64,14 +113,14 @@ def bump(app: App, target: str):
             )
 
     # Update version file
-    main_file = app.config["version"]["release"]
+    main_file = version_config["release"]
     write_version_file(main_file, new_version)
 
     # Run hooks
-    hooks = app.config["version"]["bump-hooks"]
-    for hook in hooks:
-        run_hook(hook, new_version)
+    run_hooks(app, version_config["bump-hooks"], new_version, root)
 
+    part = target if target in ["major", "minor", "patch"] else "version"
+    _bumps.inc(part=part)
     return new_version
 
 
@@ -87,43 +136,94 @@ def update(app, release: bool = False):
         release (bool): Flag to indicate if the version is a release
             in which case build info is not added.
     """
-    # Read RELEASE file:
-    version = read_version_file(app.config["version"]["release"])
+    build_info = None if release else get_build_info(app)
+    return update_files(app, app.config["version"], build_info)
 
-    if not release:
-        # Get current branch:
-        branch = app.get_extension("vcs").get_current_branch()
 
-        # Replace underscores with dashes in branch name
-        branch = branch.replace("_", "-")
+def get_build_info(app: App) -> str:
+    """
+    Get build info to add to non-release versions.
 
-        # Check if branch contains invalid characters
-        if re.search(r"[^A-Za-z0-9-]", branch):
-            raise ValueError(
-                "Invalid characters found in branch name, "
-                "only A-Z;0-9 and - are allowed."
-            )
+    The build info consists of the branch name, commit hash and a `dirty`
+    marker if the working directory is not clean.
+
+    Args:
+        app (App): The application object.
+
+    Returns:
+        str: The build info, e.g. 'master-1a2b3c4-dirty'.
+    """
+    # Get current branch, commit hash and clean status:
+    status = app.get_extension("vcs").get_status(  # type: ignore[attr-defined]
+        dirty_check=app.config["vcs"]["dirty-check"]
+    )
+    branch = status["branch"]
+
+    # Replace underscores with dashes in branch name
+    branch = branch.replace("_", "-")
+
+    # Check if branch contains invalid characters
+    if re.search(r"[^A-Za-z0-9-]", branch):
+        raise ValueError(
+            "Invalid characters found in branch name, only A-Z;0-9 and - are allowed."
+        )
+
+    dirty = "-dirty" if not status["clean"] else ""
+
+    return f"{branch}-{status['hash']}{dirty}"
+
+
+def update_files(
+    app: App, version_config: dict, build_info: str | None = None, root: str = ""
+) -> str:
+    """
+    Update the version files given by a version configuration.
+
+    Args:
+        app (App): The application object.
+        version_config (dict): Configuration with `current`, `release` and
+            `update-hooks` entries, e.g. the `version` section of the
+            configuration.
+        build_info (str, optional): Build info to add to the version, None for
+            releases.
+        root (str): Directory that relative paths in hooks are relative to.
 
-        # Get commit hash:
-        hash = app.get_extension("vcs").get_commit_hash()
-        # Get clean status:
-        is_clean = app.get_extension("vcs").check_clean()
-        dirty = "-dirty" if not is_clean else ""
+    Returns:
+        str: The updated version string.
+    """
+    # Read RELEASE file:
+    version = read_version_file(version_config["release"])
 
-        version = f"{version}+{branch}-{hash}{dirty}"
+    if build_info is not None:
+        version = f"{version}+{build_info}"
 
     # Check version is valid semver:
     if not check_version(version, release=False):
         raise ValueError(f"Invalid version: {version}")
 
     # Write to VERSION file:
-    version_file = app.config["version"]["current"]
+    version_file = version_config["current"]
     write_version_file(version_file, version)
     log.info(f"File: {version_file} updated to {version}")
 
     # Run hooks
-    hooks = app.config["version"]["update-hooks"]
-    for hook in hooks:
-        run_hook(hook, version)
+    run_hooks(app, version_config["update-hooks"], version, root)
 
     return version
+
+
+def run_hooks(app: App, hooks: list, version: str, root: str = "") -> None:
+    """
+    Run a list of hooks.
+
+    Args:
+        app (App): The application object.
+        hooks (list): The hooks to run.
+        version (str): The new version.
+        root (str): Directory that a relative `file_path` of the hooks is
+            relative to.
+    """
+    for hook in hooks:
+        if root and isinstance(hook, dict) and "file_path" in hook:
+            hook = {**hook, "file_path": os.path.join(root, hook["file_path"])}
+        run_hook(hook, version, app.hooks)
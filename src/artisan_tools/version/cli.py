@@ -1,11 +1,14 @@
 import typer
+import typing
 from rich import print as rprint
 from artisan_tools.version.main import check_version
 from artisan_tools.version.api import (
     get_version,
+    get_index,
     bump as api_bump,
     update as api_update,
 )
+from artisan_tools.version import workspace
 
 
 def factory(app):
@@ -17,29 +20,91 @@ def factory(app):
         help="Tools for managing version information.",
     )
 
+    package_option = typer.Option(  # noqa: B008
+        [],
+        "--package",
+        "-p",
+        help=(
+            "Workspace package(s) to operate on, supports wildcards. Can be used "
+            "multiple times."
+        ),
+    )
+    all_option = typer.Option(  # noqa: B008
+        False, "--all", help="Operate on all workspace packages."
+    )
+
+    def workspace_patterns(package: typing.List[str], all_packages: bool):
+        """
+        Get package patterns, None if not operating on the workspace.
+        """
+        if package:
+            return package
+        if all_packages:
+            return ["*"]
+        return None
+
     @cli.command()
     def bump(
         part: str = typer.Argument(  # noqa: B008
-            ..., help="Part to bump [major|minor|patch] or a full version string."
+            ...,
+            help=(
+                "Part to bump [major|minor|patch], 'auto' to infer the part from "
+                "conventional commits since the last release or a full version "
+                "string."
+            ),
+        ),
+        package: typing.List[str] = package_option,
+        all_packages: bool = all_option,
+        changed_only: bool = typer.Option(  # noqa: B008
+            False,
+            "--changed-only",
+            help=(
+                "Only bump workspace packages with changes since their latest "
+                "release tag. Implies --all if no packages are given."
+            ),
         ),
     ):
         """
         Bump the version in the specified file.
         """
-        new_version = api_bump(app, part)
-        rprint(f"[green]Version bumped to {new_version}")
+        patterns = workspace_patterns(package, all_packages or changed_only)
+        if patterns is None:
+            new_version = api_bump(app, part)
+            rprint(f"[green]Version bumped to {new_version}")
+            return
+
+        versions = workspace.bump(app, part, patterns, changed_only=changed_only)
+        for name, new_version in versions.items():
+            rprint(f"[green]{name}: Version bumped to {new_version}")
+        if not versions:
+            rprint("[green]No changed packages to bump.")
 
     @cli.command()
     def verify(
         check_tag: bool = typer.Option(  # noqa: B008
             False, help="Check that current versions isn't already a tag"
         ),
+        package: typing.List[str] = package_option,
+        all_packages: bool = all_option,
     ):
         """
         Verify if the current version is valid.
 
         :param check_tag: Check that current versions isn't already a tag
         """
+        patterns = workspace_patterns(package, all_packages)
+        if patterns is not None:
+            errors = workspace.verify(app, check_tag, patterns)
+            for name, error in errors.items():
+                if error is None:
+                    rprint(f"[green]{name}: Verification passed.")
+                else:
+                    rprint(f"[bold red]{name}: {error}")
+            if any(errors.values()):
+                raise typer.Exit(code=1)
+            rprint("[bold green]Verification passed.")
+            return
+
         version = get_version(app)
         result = check_version(version)
 
@@ -60,18 +125,32 @@ def factory(app):
         rprint("[bold green]Verification passed.")
 
     @cli.command()
-    def get():
+    def get(
+        package: typing.List[str] = package_option,
+        all_packages: bool = all_option,
+    ):
         """
         Print the current version to stdout.
+
+        For workspace packages a line with name and version is printed for each
+        package.
         """
-        version = get_version(app)
-        print(f"{version}", end="")
+        patterns = workspace_patterns(package, all_packages)
+        if patterns is None:
+            version = get_version(app)
+            print(f"{version}", end="")
+            return
+
+        for name, version in workspace.get_versions(app, patterns).items():
+            print(f"{name} {version}")
 
     @cli.command()
     def update(
         release: bool = typer.Option(  # noqa: B008
             False, help="Flag to indicate if the version is a release"
         ),
+        package: typing.List[str] = package_option,
+        all_packages: bool = all_option,
     ):
         """
         Update version in `VERSION` file.
@@ -79,7 +158,61 @@ def factory(app):
         If the version is not a release additional build info is added to the
         version read from the 'RELEASE' file.
         """
-        version = api_update(app, release=release)
-        rprint(f"[green]Version updated to {version}")
+        patterns = workspace_patterns(package, all_packages)
+        if patterns is None:
+            version = api_update(app, release=release)
+            rprint(f"[green]Version updated to {version}")
+            return
+
+        for name, version in workspace.update(app, release, patterns).items():
+            rprint(f"[green]{name}: Version updated to {version}")
+
+    remote_option = typer.Option(  # noqa: B008
+        False, "--remote", help="Use tags of the remote instead of local tags."
+    )
+    prefix_option = typer.Option(  # noqa: B008
+        "v", "--prefix", help="Prefix of version tags."
+    )
+
+    @cli.command()
+    def latest(
+        spec: str | None = typer.Option(  # noqa: B008
+            None,
+            "--range",
+            help="Only consider versions in a range, e.g. '1.x' or '>=1.2,<2'.",
+        ),
+        prerelease: bool = typer.Option(  # noqa: B008
+            False, help="Include prerelease versions."
+        ),
+        remote: bool = remote_option,
+        prefix: str = prefix_option,
+    ):
+        """
+        Print the latest tagged version to stdout.
+        """
+        index = get_index(app, remote=remote, prefix=prefix)
+        if spec is None:
+            version = index.latest(include_prerelease=prerelease)
+        else:
+            version = index.latest_in_range(spec, include_prerelease=prerelease)
+        if version is None:
+            rprint("[bold red]No matching version found.")
+            raise typer.Exit(code=1)
+        print(f"{version}", end="")
+
+    @cli.command(name="list")
+    def list_versions(
+        prerelease: bool = typer.Option(  # noqa: B008
+            True, help="Include prerelease versions."
+        ),
+        remote: bool = remote_option,
+        prefix: str = prefix_option,
+    ):
+        """
+        Print all tagged versions, sorted by semver precedence.
+        """
+        index = get_index(app, remote=remote, prefix=prefix)
+        for version in index.versions(include_prerelease=prerelease):
+            print(version)
 
     return cli
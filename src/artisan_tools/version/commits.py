@@ -0,0 +1,149 @@
+"""
+Infer the part of the version to bump from conventional commit messages.
+
+See https://www.conventionalcommits.org. Breaking changes bump major, `feat`
+bumps minor and `fix`/`perf` bumps patch.
+
+Scan results are cached in the .git directory by release tag, so repeated
+invocations only scan commits added since the last scan.
+"""
+
+import json
+import os
+import re
+
+from artisan_tools.app import App
+from artisan_tools.log import get_logger
+
+log = get_logger("version.commits")
+
+_HEADER = re.compile(r"(?P<type>[A-Za-z]+)(?:\([^)\n]*\))?(?P<breaking>!)?:")
+_BREAKING_FOOTER = re.compile(r"^BREAKING[ -]CHANGE:", flags=re.MULTILINE)
+
+_LEVELS = {"patch": 1, "minor": 2, "major": 3}
+_TYPE_LEVELS = {"feat": "minor", "fix": "patch", "perf": "patch"}
+
+CACHE_FILE = os.path.join("artisan", "bump-scan.json")
+
+
+def bump_level(message: str) -> str | None:
+    """
+    Get the bump level for a single commit message.
+
+    Args:
+    message: The full commit message.
+
+    Returns:
+    str: 'major', 'minor', 'patch' or None if the commit doesn't require a
+        release.
+    """
+    header = _HEADER.match(message)
+    if header is None:
+        return None
+    if header.group("breaking") or _BREAKING_FOOTER.search(message):
+        return "major"
+    return _TYPE_LEVELS.get(header.group("type").lower())
+
+
+def max_level(*levels: str | None) -> str | None:
+    """
+    Get the highest of bump levels, ignoring None.
+    """
+    return max(levels, key=lambda level: _LEVELS.get(level or "", 0), default=None)
+
+
+def scan(messages) -> str | None:
+    """
+    Get the highest bump level for commit messages.
+
+    The scan stops at the first breaking change since no higher level exists.
+
+    Args:
+    messages: Iterable of commit messages.
+
+    Returns:
+    str: The bump level or None if no commit requires a release.
+    """
+    level = None
+    for message in messages:
+        level = max_level(level, bump_level(message))
+        if level == "major":
+            break
+    return level
+
+
+def load_cache(app: App) -> dict:
+    """
+    Load cached scan results from the .git directory.
+    """
+    path = os.path.join(app.get_extension("vcs").get_git_dir(), CACHE_FILE)  # type: ignore[attr-defined]
+    try:
+        with open(path, "r") as file:
+            return json.load(file)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def save_cache(app: App, cache: dict) -> None:
+    """
+    Save scan results to the .git directory.
+    """
+    path = os.path.join(app.get_extension("vcs").get_git_dir(), CACHE_FILE)  # type: ignore[attr-defined]
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path + ".tmp", "w") as file:
+        json.dump(cache, file)
+    os.replace(path + ".tmp", path)
+
+
+def infer_bump(
+    app: App,
+    since: str | None = None,
+    paths: list[str] | tuple[str, ...] = (),
+    cache: dict | None = None,
+    head: str | None = None,
+) -> str:
+    """
+    Infer the part to bump from commit messages since the last release.
+
+    Args:
+    app: The application object.
+    since: The tag (or other revision) of the last release. If None (no
+        release) all commits are scanned.
+    paths: Only consider commits touching these paths.
+    cache: Scan results to use and update, it is loaded from and saved to the
+        .git directory when not given.
+    head: Full hash of the current commit, retrieved when not given.
+
+    Returns:
+    str: 'major', 'minor' or 'patch'. Patch is returned if no commit requires
+        a release.
+    """
+    vcs = app.get_extension("vcs")
+    save = cache is None
+    if cache is None:
+        cache = load_cache(app)
+
+    if head is None:
+        head = vcs.get_commit_hash(short=False)  # type: ignore[attr-defined]
+    key = f"{since or ''}:{','.join(paths)}"
+
+    cached = cache.get(key)
+    if cached is not None and cached["head"] == head:
+        level = cached["level"]
+    elif cached is not None and vcs.is_ancestor(cached["head"]):  # type: ignore[attr-defined]
+        # Only scan commits added since the cached scan:
+        level = cached["level"]
+        if level != "major":
+            revision_range = f"{cached['head']}..HEAD"
+            messages = vcs.iter_commit_messages(revision_range, paths)  # type: ignore[attr-defined]
+            level = max_level(level, scan(messages))
+    else:
+        revision_range = "HEAD" if since is None else f"{since}..HEAD"
+        level = scan(vcs.iter_commit_messages(revision_range, paths))  # type: ignore[attr-defined]
+
+    cache[key] = {"head": head, "level": level}
+    if save:
+        save_cache(app, cache)
+
+    log.info(f"Inferred bump level since {since}: {level}")
+    return level or "patch"
@@ -0,0 +1,224 @@
+"""
+Version hooks for common manifest formats.
+
+The hooks locate the version of the manifest itself and replace only that
+value, leaving the rest of the file (formatting, comments, versions of
+dependencies) untouched.
+"""
+
+import re
+
+from artisan_tools.version import toml_edit
+from artisan_tools.log import get_logger
+
+logger = get_logger("version.hooks")
+
+# Tokens needed to track the structure of a JSON document:
+_JSON_TOKEN = re.compile(r'"(?:[^"\\]|\\.)*"|[{}\[\]:,]')
+
+# Tokens needed to track the element structure of an XML document:
+_XML_TOKEN = re.compile(
+    r"<!--.*?-->|<!\[CDATA\[.*?\]\]>|<\?.*?\?>|<![^>]*>" r"|<(/?)([^\s/>]+)[^>]*?(/?)>",
+    flags=re.DOTALL,
+)
+
+
+def _read(file_path: str) -> str:
+    with open(file_path, "r", encoding="utf-8", newline="") as file:
+        return file.read()
+
+
+def _write(file_path: str, content: str) -> None:
+    with open(file_path, "w", encoding="utf-8", newline="") as file:
+        file.write(content)
+
+
+def _replace_span(
+    file_path: str, content: str, span: tuple[int, int], new_version: str
+) -> None:
+    """
+    Replace span in content with the new version and write it to file_path.
+    """
+    _write(file_path, content[: span[0]] + new_version + content[span[1] :])
+    logger.info(f"Version updated to {new_version} in {file_path}")
+
+
+def find_json_version(content: str, key: str = "version") -> tuple[int, int] | None:
+    """
+    Find the span of a top-level string value in a JSON document.
+
+    Nested objects and arrays are skipped, so e.g. versions of dependencies are
+    never matched. The scan stops as soon as the key is found.
+
+    Args:
+    content: The JSON document.
+    key: The top-level key to find.
+
+    Returns:
+    tuple: Start and end of the string contents (without quotes) or None.
+    """
+    depth = 0
+    is_key = False  # Next string is a top-level key
+    matched = False  # Last top-level key is the requested key
+    expect_value = False
+    target = f'"{key}"'
+    for match in _JSON_TOKEN.finditer(content):
+        token = match.group()
+        if expect_value:
+            if not token.startswith('"'):
+                raise ValueError(f"Value of '{key}' is not a string")
+            return match.start() + 1, match.end() - 1
+        if token in "{[":
+            depth += 1
+            is_key = depth == 1 and token == "{"
+        elif token in "}]":
+            depth -= 1
+        elif token == ",":
+            is_key = depth == 1
+        elif token == ":":
+            expect_value = depth == 1 and matched
+        elif is_key:
+            matched = token == target
+            is_key = False
+    return None
+
+
+def replace_in_package_json(
+    file_path: str, new_version: str, key: str = "version", **kwargs
+) -> None:
+    """
+    Updates the version in a package.json (or other JSON) file.
+
+    Only the top-level `version` key is updated.
+
+    Args:
+    file_path (str): The path to the JSON file.
+    new_version (str): The new version number to write.
+    key (str, optional): The top-level key holding the version.
+
+    Raises:
+    ValueError: If the version key is not found.
+    """
+    content = _read(file_path)
+    span = find_json_version(content, key)
+    if span is None:
+        raise ValueError(f"Key '{key}' not found in file: {file_path}")
+    _replace_span(file_path, content, span, new_version)
+
+
+def replace_in_cargo_toml(
+    file_path: str,
+    new_version: str,
+    tables: tuple[str, ...] | list[str] = ("package", "workspace.package"),
+    **kwargs,
+) -> None:
+    """
+    Updates the version in a Cargo.toml file.
+
+    The version is updated in each of the given tables where it is set as a
+    string, e.g. not when inherited with `version.workspace = true`. Cargo.lock
+    is not updated.
+
+    Args:
+    file_path (str): The path to the Cargo.toml file.
+    new_version (str): The new version number to write.
+    tables (list, optional): Tables to update the version key in. Defaults to
+        `package` and `workspace.package`.
+
+    Raises:
+    ValueError: If the version is not found in any of the tables.
+    """
+    content = _read(file_path)
+    updated = False
+    for table in tables:
+        path = (*table.split("."), "version")
+        span = toml_edit.find_value(content, path)
+        if span is None or content[span[0]] not in "\"'":
+            continue
+        content = toml_edit.replace_string(content, path, new_version)
+        updated = True
+    if not updated:
+        raise ValueError(
+            f"Version not found in tables {list(tables)} in file: {file_path}"
+        )
+    _write(file_path, content)
+    logger.info(f"Version updated to {new_version} in {file_path}")
+
+
+def replace_in_chart_yaml(
+    file_path: str,
+    new_version: str,
+    keys: tuple[str, ...] | list[str] = ("version",),
+    **kwargs,
+) -> None:
+    """
+    Updates the version in a Helm Chart.yaml file.
+
+    Only top-level keys are updated, quoting and comments are kept.
+
+    Args:
+    file_path (str): The path to the Chart.yaml file.
+    new_version (str): The new version number to write.
+    keys (list, optional): Top-level keys to update. Defaults to `version`, add
+        `appVersion` to update the application version as well.
+
+    Raises:
+    ValueError: If a key is not found.
+    """
+    content = _read(file_path)
+    for key in keys:
+        pattern = rf"^{re.escape(key)}:[ \t]*([\"']?)([^\"'\s#]+)\1[ \t]*(?:#.*)?\r?$"
+        match = re.search(pattern, content, flags=re.MULTILINE)
+        if match is None:
+            raise ValueError(f"Key '{key}' not found in file: {file_path}")
+        content = content[: match.start(2)] + new_version + content[match.end(2) :]
+    _write(file_path, content)
+    logger.info(f"Version updated to {new_version} in {file_path}")
+
+
+def find_pom_version(content: str) -> tuple[int, int] | None:
+    """
+    Find the span of the project version in a Maven pom.xml document.
+
+    Only `<version>` as a direct child of `<project>` is matched, so versions of
+    the parent, dependencies and plugins are skipped.
+
+    Args:
+    content: The XML document.
+
+    Returns:
+    tuple: Start and end of the version text or None.
+    """
+    stack: list[str] = []
+    for match in _XML_TOKEN.finditer(content):
+        closing, name, self_closing = match.groups()
+        if name is None or self_closing:
+            continue
+        name = name.split(":")[-1]
+        if closing:
+            if stack:
+                stack.pop()
+            continue
+        if name == "version" and stack == ["project"]:
+            end = content.find("</", match.end())
+            return match.end(), end
+        stack.append(name)
+    return None
+
+
+def replace_in_pom_xml(file_path: str, new_version: str, **kwargs) -> None:
+    """
+    Updates the project version in a Maven pom.xml file.
+
+    Args:
+    file_path (str): The path to the pom.xml file.
+    new_version (str): The new version number to write.
+
+    Raises:
+    ValueError: If the project version is not found.
+    """
+    content = _read(file_path)
+    span = find_pom_version(content)
+    if span is None:
+        raise ValueError(f"Project version not found in file: {file_path}")
+    _replace_span(file_path, content, span, new_version)
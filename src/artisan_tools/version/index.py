@@ -0,0 +1,217 @@
+"""
+Sorted index of versions from tags.
+
+Tags are parsed into semver keys once and stored sorted, so queries for the
+latest version (in a range) and membership are answered with bisection.
+"""
+
+import bisect
+from typing import Iterable, Iterator
+
+from artisan_tools.version import semantic
+
+# Key lower than the key of any version with the same major.minor.patch:
+_LOWEST = ()
+
+
+def _bound(version: str) -> tuple:
+    """
+    Key for a (possibly partial) version used as bound in ranges.
+    """
+    parts = version.split(".")
+    if len(parts) == 3:
+        return semantic.sort_key(version)
+    if not 0 < len(parts) < 3 or not all(part.isdigit() for part in parts):
+        raise ValueError(f"Invalid version in range: {version}")
+    numbers = [int(part) for part in parts] + [0] * (3 - len(parts))
+    return (*numbers, _LOWEST)
+
+
+def _next_bound(version: str) -> tuple:
+    """
+    Lowest key above all versions matching a partial version, e.g. 1.x.
+    """
+    numbers = [int(part) for part in version.split(".")]
+    numbers[-1] += 1
+    numbers += [0] * (3 - len(numbers))
+    return (*numbers, _LOWEST)
+
+
+def parse_range(spec: str) -> tuple[tuple | None, bool, tuple | None, bool]:
+    """
+    Parse a version range.
+
+    Supported forms are partial versions (`1`, `1.x`, `1.2.*`) and comma
+    separated comparisons (`>=1.2.0,<2`).
+
+    Args:
+    spec: The range specification.
+
+    Returns:
+    tuple: (lower, lower_inclusive, upper, upper_inclusive) where lower/upper
+        are version keys or None if unbounded.
+    """
+    spec = spec.replace(" ", "")
+    if spec and spec[0].isdigit():
+        partial = spec.removesuffix(".x").removesuffix(".*")
+        if partial.count(".") == 2:
+            key = _bound(partial)
+            return key, True, key, True
+        return _bound(partial), True, _next_bound(partial), False
+
+    lower, lower_inclusive, upper, upper_inclusive = None, True, None, False
+    for comparison in spec.split(","):
+        for operator in (">=", "<=", ">", "<", "=="):
+            if comparison.startswith(operator):
+                key = _bound(comparison[len(operator) :])
+                break
+        else:
+            raise ValueError(f"Invalid version range: {spec}")
+        if operator in (">=", ">"):
+            lower, lower_inclusive = key, operator == ">="
+        elif operator in ("<=", "<"):
+            upper, upper_inclusive = key, operator == "<="
+        else:
+            lower, lower_inclusive, upper, upper_inclusive = key, True, key, True
+    return lower, lower_inclusive, upper, upper_inclusive
+
+
+class VersionIndex:
+    """
+    Index of versions parsed from tags of the form <prefix><version><suffix>.
+
+    Tags that are not valid semantic versions are ignored.
+    """
+
+    def __init__(self, tags: Iterable[str], prefix: str = "v", suffix: str = ""):
+        """
+        Parse and sort the version tags.
+        """
+        self.prefix = prefix
+        self.suffix = suffix
+        entries = []
+        for tag in tags:
+            if not (tag.startswith(prefix) and tag.endswith(suffix)):
+                continue
+            version = tag[len(prefix) : len(tag) - len(suffix)]
+            try:
+                entries.append((semantic.sort_key(version), version, tag))
+            except ValueError:
+                continue
+        entries.sort()
+
+        self._keys = [entry[0] for entry in entries]
+        self._versions = [entry[1] for entry in entries]
+        self._tags = [entry[2] for entry in entries]
+        # Release versions only:
+        releases = [entry for entry in entries if semantic.is_valid(entry[1], True)]
+        self._release_keys = [entry[0] for entry in releases]
+        self._release_versions = [entry[1] for entry in releases]
+
+    def __len__(self) -> int:
+        """
+        Get the number of versions.
+        """
+        return len(self._versions)
+
+    def __iter__(self) -> Iterator[str]:
+        """
+        Iterate over the versions, sorted by semver precedence.
+        """
+        return iter(self._versions)
+
+    def __contains__(self, version: str) -> bool:
+        """
+        Check if a version with the same precedence is in the index.
+        """
+        try:
+            key = semantic.sort_key(version)
+        except ValueError:
+            return False
+        index = bisect.bisect_left(self._keys, key)
+        return index < len(self._keys) and self._keys[index] == key
+
+    def tag(self, version: str) -> str:
+        """
+        Get the tag for a version in the index.
+        """
+        key = semantic.sort_key(version)
+        # Versions differing in build metadata only share a key:
+        start = bisect.bisect_left(self._keys, key)
+        end = bisect.bisect_right(self._keys, key, lo=start)
+        for index in range(start, end):
+            if self._versions[index] == version:
+                return self._tags[index]
+        raise KeyError(version)
+
+    def versions(self, include_prerelease: bool = True) -> list[str]:
+        """
+        Get all versions, sorted by semver precedence.
+        """
+        return list(self._versions if include_prerelease else self._release_versions)
+
+    def latest(self, include_prerelease: bool = False) -> str | None:
+        """
+        Get the highest version.
+
+        Args:
+        include_prerelease: Include prerelease and build versions.
+
+        Returns:
+        str: The version or None if the index is empty.
+        """
+        versions = self._versions if include_prerelease else self._release_versions
+        return versions[-1] if versions else None
+
+    def latest_in_range(
+        self, spec: str, include_prerelease: bool = False
+    ) -> str | None:
+        """
+        Get the highest version in a range.
+
+        Args:
+        spec: The range, see `parse_range`, e.g. '1.x' or '>=1.2,<2'.
+        include_prerelease: Include prerelease and build versions.
+
+        Returns:
+        str: The version or None if no version is in the range.
+        """
+        lower, lower_inclusive, upper, upper_inclusive = parse_range(spec)
+        if include_prerelease:
+            keys, versions = self._keys, self._versions
+        else:
+            keys, versions = self._release_keys, self._release_versions
+
+        if upper is None:
+            end = len(keys)
+        elif upper_inclusive:
+            end = bisect.bisect_right(keys, upper)
+        else:
+            end = bisect.bisect_left(keys, upper)
+        if end == 0:
+            return None
+
+        key = keys[end - 1]
+        if lower is not None and (
+            key < lower or (key == lower and not lower_inclusive)
+        ):
+            return None
+        return versions[end - 1]
+
+    def next_available(self, part: str = "patch", base: str | None = None) -> str:
+        """
+        Get the next version that is not in the index.
+
+        Args:
+        part: The part to bump ('major', 'minor' or 'patch').
+        base: Version to bump from, defaults to the latest release or 0.0.0 if
+            there is none.
+
+        Returns:
+        str: The first bumped version which is not already in the index.
+        """
+        version = semantic.parse(base or self.latest() or "0.0.0")
+        while True:
+            version = version.bump(part)
+            if str(version) not in self:
+                return str(version)
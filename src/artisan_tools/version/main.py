@@ -2,14 +2,21 @@
 Tools to support release of a package.
 """
 
+import functools
 import os
 import re
-import semver
+
+from artisan_tools.version import toml_edit, hooks, semantic
+from artisan_tools import metrics
 
 from artisan_tools.log import get_logger
 
 logger = get_logger("version.main")
 
+_hook_seconds = metrics.histogram(
+    "artisan_version_hook_seconds", "Execution time of version hooks", ["method"]
+)
+
 
 def check_version(version: str, release=True) -> bool:
     """
@@ -23,14 +30,7 @@ def check_version(version: str, release=True) -> bool:
     Returns:
     bool: True if the version is a proper semver version, False otherwise.
     """
-    try:
-        parsed_version = semver.Version.parse(version)
-        if release:
-            return parsed_version.prerelease is None and parsed_version.build is None
-        else:
-            return True
-    except ValueError:
-        return False
+    return semantic.is_valid(version, release=release)
 
 
 def bump_version(version: str, part: str):
@@ -47,18 +47,7 @@ def bump_version(version: str, part: str):
     Raises:
     ValueError: If the part is not 'major', 'minor', or 'patch'.
     """
-    parsed_version = semver.Version.parse(version)
-
-    if part == "major":
-        new_version = parsed_version.bump_major()
-    elif part == "minor":
-        new_version = parsed_version.bump_minor()
-    elif part == "patch":
-        new_version = parsed_version.bump_patch()
-    else:
-        raise ValueError("Invalid part to bump: must be 'major', 'minor', or 'patch'")
-
-    return str(new_version)
+    return str(semantic.parse(version).bump(part))
 
 
 def read_version_file(file_path: str = "VERSION"):
@@ -141,44 +130,172 @@ def replace_regex_in_file(
     )
 
 
-def replace_in_pyproject(file_path: str, new_version: str, **kwargs) -> None:
+def replace_in_pyproject(
+    file_path: str,
+    new_version: str,
+    tables: tuple[str, ...] | list[str] = ("project", "tool.poetry"),
+    **kwargs,
+) -> None:
     """
     Updates the version number in a pyproject.toml file.
 
+    The version is located with a span preserving TOML scan, so only the version
+    value is changed and `version` keys in other tables are never touched. The
+    version is updated in each of the given tables where it is present.
+
+    If the version is declared dynamic (`project.dynamic`), the version file
+    configured for setuptools (`tool.setuptools.dynamic.version.file`) or
+    hatch (`tool.hatch.version.path`) is updated instead.
+
     Args:
     file_path (str): The path to the pyproject.toml file.
     new_version (str): The new version number to write.
+    tables (list, optional): Tables to update the version key in. Defaults to
+        `project` and `tool.poetry`.
 
     Returns:
     None
+
+    Raises:
+    ValueError: If no version could be located.
     """
-    # Regex pattern to match the entire line containing the version
-    pattern = r'^(version\s*=\s*")([^"]+)(")$'
-    # Replacement pattern includes the new version number
-    replacement = r"\g<1>" + new_version + r"\g<3>"
-    replace_regex_in_file(file_path, pattern, replacement)
+    with open(file_path, "r", encoding="utf-8", newline="") as file:
+        content = file.read()
+
+    updated = False
+    for table in tables:
+        span = toml_edit.find_string(content, (*table.split("."), "version"))
+        if span is not None:
+            content = content[: span[0]] + new_version + content[span[1] :]
+            updated = True
+
+    if updated:
+        with open(file_path, "w", encoding="utf-8", newline="") as file:
+            file.write(content)
+    else:
+        version_file = _dynamic_version_file(file_path, content)
+        if version_file is None:
+            raise ValueError(
+                f"Version not found in tables {list(tables)} in file: {file_path}"
+            )
+        file_type, path = version_file
+        if file_type == "file":
+            write_version_file(path, new_version)
+        else:
+            replace_regex_in_file(
+                path,
+                r"""^(__version__\s*=\s*["'])([^"']+)(["'])""",
+                new_version,
+                repl=r"\g<1>@version\g<3>",
+            )
 
     logger.info(f"Version updated to {new_version} in {file_path}")
 
 
+def _dynamic_version_file(file_path: str, content: str) -> tuple[str, str] | None:
+    """
+    Locate the file holding a dynamic version for a pyproject.toml file.
+
+    Returns:
+    tuple: Type of file ('file' for a plain version file, 'python' for a module
+        with `__version__`) and the path, or None if not found.
+    """
+    dynamic = toml_edit.find_value(content, "project.dynamic")
+    if dynamic is None or not re.search(
+        r"[\"']version[\"']", content[dynamic[0] : dynamic[1]]
+    ):
+        return None
+
+    root = os.path.dirname(file_path)
+
+    # Setuptools, e.g. version = {file = "VERSION"}:
+    setuptools = toml_edit.find_value(content, "tool.setuptools.dynamic.version")
+    if setuptools is not None:
+        match = re.search(
+            r"""file\s*=\s*\[?\s*["']([^"']+)["']""",
+            content[setuptools[0] : setuptools[1]],
+        )
+        if match is not None:
+            return "file", os.path.join(root, match.group(1))
+
+    # Hatch, e.g. path = "src/package/__about__.py":
+    hatch = toml_edit.get_string(content, "tool.hatch.version.path")
+    if hatch is not None:
+        return "python", os.path.join(root, hatch)
+
+    return None
+
+
 available_hooks = {
     "regex_replace": replace_regex_in_file,
     "pyproject_replace": replace_in_pyproject,
+    "package_json_replace": hooks.replace_in_package_json,
+    "cargo_replace": hooks.replace_in_cargo_toml,
+    "chart_replace": hooks.replace_in_chart_yaml,
+    "pom_replace": hooks.replace_in_pom_xml,
 }
 
+# Entry point group for hooks provided by installed packages:
+HOOK_ENTRY_POINT_GROUP = "artisan_tools.hooks"
+
+
+@functools.cache
+def _entry_point_hooks() -> dict:
+    """
+    Discover hooks provided through entry points.
+
+    Discovery is done on first use only, so it doesn't add to startup time when
+    only the builtin hooks are used.
+
+    Returns:
+    dict: Entry points by name, loaded when the hook is run.
+    """
+    from importlib.metadata import entry_points
+
+    return {ep.name: ep for ep in entry_points(group=HOOK_ENTRY_POINT_GROUP)}
 
-def run_hook(hook, new_version):
+
+def get_hook(method: str, registered: dict | None = None):
+    """
+    Get the function implementing a hook method.
+
+    Hooks registered on the app take precedence over the builtin hooks, which
+    take precedence over hooks from entry points.
+
+    Args:
+    method (str): Name of the hook method.
+    registered (dict, optional): Hooks registered on the app.
+
+    Returns:
+    callable: The hook function.
+
+    Raises:
+    ValueError: If no hook with that name exists.
+    """
+    if registered and method in registered:
+        return registered[method]
+    if method in available_hooks:
+        return available_hooks[method]
+    entry_point_hooks = _entry_point_hooks()
+    if method in entry_point_hooks:
+        return entry_point_hooks[method].load()
+    available = [*(registered or {}), *available_hooks, *entry_point_hooks]
+    raise ValueError(f"Invalid hook method: '{method}', it must be one of {available}")
+
+
+def run_hook(hook, new_version, registered: dict | None = None):
     """
     Execute a hook.
 
     Parameters
     ----------
-    hook : str
-        The hook to execute.
-    current_version : str
-        The current version.
+    hook : dict
+        The hook to execute, the 'method' key selects the hook function and
+        remaining keys are passed as arguments.
     new_version : str
         The new version.
+    registered : dict, optional
+        Hooks registered on the app.
     """
     if not isinstance(hook, dict):
         raise ValueError(
@@ -188,9 +305,7 @@ def run_hook(hook, new_version):
         raise ValueError(
             f"Invalid hook: {hook}, it must be a dictionary with a 'method' key"
         )
-    method = hook["method"]
-    if method not in available_hooks:
-        raise ValueError(f"Invalid hook: {hook}, it m {list(available_hooks.keys())}")
-    hook_func = available_hooks[method]
-    hook.pop("method")
-    hook_func(new_version=new_version, **hook)
+    hook_func = get_hook(hook["method"], registered)
+    kwargs = {key: value for key, value in hook.items() if key != "method"}
+    with _hook_seconds.time(method=hook["method"]):
+        hook_func(new_version=new_version, **kwargs)
@@ -0,0 +1,214 @@
+"""
+Lightweight semantic version parsing.
+
+Parsing uses a single compiled regular expression and results are cached, so
+validating and comparing versions is cheap. The `semver` package is only
+imported when a full `semver.Version` is requested with `Version.to_semver`.
+"""
+
+import functools
+import re
+
+# Regex from https://semver.org:
+SEMVER = re.compile(
+    r"(0|[1-9]\d*)\.(0|[1-9]\d*)\.(0|[1-9]\d*)"
+    r"(?:-((?:0|[1-9]\d*|\d*[a-zA-Z-][0-9a-zA-Z-]*)"
+    r"(?:\.(?:0|[1-9]\d*|\d*[a-zA-Z-][0-9a-zA-Z-]*))*))?"
+    r"(?:\+([0-9a-zA-Z-]+(?:\.[0-9a-zA-Z-]+)*))?"
+)
+
+# Key for versions without prerelease, higher than any prerelease key:
+_RELEASE_KEY = ((2, 0),)
+
+
+@functools.lru_cache(maxsize=1024)
+def _prerelease_key(prerelease: str | None) -> tuple:
+    """
+    Key for ordering by prerelease identifiers.
+    """
+    if prerelease is None:
+        return _RELEASE_KEY
+    # Numeric identifiers have lower precedence than alphanumeric:
+    return tuple(
+        (0, int(part)) if part.isdigit() else (1, part)
+        for part in prerelease.split(".")
+    )
+
+
+class Version:
+    """
+    A parsed semantic version.
+
+    Versions are ordered by semver precedence, build metadata is ignored when
+    comparing.
+    """
+
+    __slots__ = ("major", "minor", "patch", "prerelease", "build", "key")
+
+    def __init__(
+        self,
+        major: int,
+        minor: int,
+        patch: int,
+        prerelease: str | None = None,
+        build: str | None = None,
+    ):
+        """
+        Create a version from its parts.
+        """
+        self.major = major
+        self.minor = minor
+        self.patch = patch
+        self.prerelease = prerelease
+        self.build = build
+        self.key = (major, minor, patch, _prerelease_key(prerelease))
+
+    @property
+    def is_release(self) -> bool:
+        """
+        True if the version has neither prerelease nor build information.
+        """
+        return self.prerelease is None and self.build is None
+
+    def bump(self, part: str) -> "Version":
+        """
+        Bump part of the version.
+
+        Prerelease and build information is dropped.
+
+        Args:
+        part: The part to bump ('major', 'minor' or 'patch').
+
+        Returns:
+        Version: The bumped version.
+
+        Raises:
+        ValueError: If the part is not 'major', 'minor', or 'patch'.
+        """
+        if part == "major":
+            return Version(self.major + 1, 0, 0)
+        if part == "minor":
+            return Version(self.major, self.minor + 1, 0)
+        if part == "patch":
+            return Version(self.major, self.minor, self.patch + 1)
+        raise ValueError("Invalid part to bump: must be 'major', 'minor', or 'patch'")
+
+    def to_semver(self):
+        """
+        Convert to a `semver.Version` for functionality not provided here.
+        """
+        import semver
+
+        return semver.Version(
+            self.major, self.minor, self.patch, self.prerelease, self.build
+        )
+
+    def __str__(self) -> str:
+        """
+        Render the version as a semver string.
+        """
+        version = f"{self.major}.{self.minor}.{self.patch}"
+        if self.prerelease is not None:
+            version += f"-{self.prerelease}"
+        if self.build is not None:
+            version += f"+{self.build}"
+        return version
+
+    def __repr__(self) -> str:
+        """
+        Represent the version for debugging.
+        """
+        return f"Version('{self}')"
+
+    def __eq__(self, other) -> bool:
+        """
+        Compare by precedence, ignoring build metadata.
+        """
+        if not isinstance(other, Version):
+            return NotImplemented
+        return self.key == other.key
+
+    def __hash__(self) -> int:
+        """
+        Hash consistently with equality.
+        """
+        return hash(self.key)
+
+    def __lt__(self, other: "Version") -> bool:
+        """
+        Check if the precedence is lower than the other's.
+        """
+        return self.key < other.key
+
+    def __le__(self, other: "Version") -> bool:
+        """
+        Check if the precedence is lower than or equal to the other's.
+        """
+        return self.key <= other.key
+
+    def __gt__(self, other: "Version") -> bool:
+        """
+        Check if the precedence is greater than the other's.
+        """
+        return self.key > other.key
+
+    def __ge__(self, other: "Version") -> bool:
+        """
+        Check if the precedence is greater than or equal to the other's.
+        """
+        return self.key >= other.key
+
+
+@functools.lru_cache(maxsize=4096)
+def parse(version: str) -> Version:
+    """
+    Parse a semantic version string.
+
+    Args:
+    version: The version string, e.g. '1.2.3-rc.1+build.4'.
+
+    Returns:
+    Version: The parsed version.
+
+    Raises:
+    ValueError: If the version is not a valid semantic version.
+    """
+    match = SEMVER.fullmatch(version)
+    if match is None:
+        raise ValueError(f"{version} is not a valid semantic version")
+    major, minor, patch, prerelease, build = match.groups()
+    return Version(int(major), int(minor), int(patch), prerelease, build)
+
+
+def is_valid(version: str, release: bool = False) -> bool:
+    """
+    Check if a string is a valid semantic version.
+
+    Args:
+    version: The version string.
+    release: Only accept release versions, i.e. without prerelease and build
+        information.
+
+    Returns:
+    bool: True if the version is valid.
+    """
+    match = SEMVER.fullmatch(version)
+    if match is None:
+        return False
+    return not release or (match.group(4) is None and match.group(5) is None)
+
+
+def sort_key(version: str) -> tuple:
+    """
+    Key for sorting version strings by semver precedence.
+
+    Equal to `parse(version).key` without creating a Version object.
+
+    Raises:
+    ValueError: If the version is not a valid semantic version.
+    """
+    match = SEMVER.fullmatch(version)
+    if match is None:
+        raise ValueError(f"{version} is not a valid semantic version")
+    major, minor, patch, prerelease, _ = match.groups()
+    return (int(major), int(minor), int(patch), _prerelease_key(prerelease))
@@ -0,0 +1,208 @@
+"""
+Span preserving lookups and edits in TOML documents.
+
+Only the small subset of TOML needed to locate a key is understood: table
+headers, (dotted) keys and enough of the value syntax (strings, arrays, inline
+tables and comments) to skip over values. Edits are made by replacing the
+located span, so formatting and comments in the rest of the file is untouched.
+"""
+
+import re
+from typing import Iterator
+
+# Matches a (possibly dotted) key followed by '='. Groups: 1 = the key.
+_KEY = re.compile(
+    r"[ \t]*((?:[A-Za-z0-9_-]+|\"(?:[^\"\\\n]|\\.)*\"|'[^'\n]*')"
+    r"(?:[ \t]*\.[ \t]*(?:[A-Za-z0-9_-]+|\"(?:[^\"\\\n]|\\.)*\"|'[^'\n]*'))*)"
+    r"[ \t]*=[ \t]*"
+)
+# Matches a table or array-of-tables header. Groups: 1 = '[' for arrays, 2 = name
+_HEADER = re.compile(r"[ \t]*\[(\[)?[ \t]*([^\[\]\n]+?)[ \t]*\]\]?[ \t]*(?:#[^\n]*)?")
+_KEY_PART = re.compile(r"[A-Za-z0-9_-]+|\"(?:[^\"\\\n]|\\.)*\"|'[^'\n]*'")
+# Tokens relevant when skipping over a value:
+_TOKEN = re.compile(
+    r"\"\"\"(?:[^\"\\]|\\.|\"(?!\"\"))*\"\"\"\"{0,2}"
+    r"|'''(?:[^']|'(?!''))*''''{0,2}"
+    r"|\"(?:[^\"\\\n]|\\.)*\"|'[^'\n]*'|[\[\]{}#\n]"
+)
+_STRING = re.compile(r"\"((?:[^\"\\\n]|\\.)*)\"|'([^'\n]*)'")
+
+# Marker used in paths for entries inside an array of tables. Such entries are
+# never matched by a lookup.
+_ARRAY = "[]"
+
+
+def _split_key(key: str) -> tuple[str, ...]:
+    """
+    Split a dotted key in its (unquoted) parts.
+    """
+    return tuple(part.strip("\"'") for part in _KEY_PART.findall(key))
+
+
+def _value_end(content: str, pos: int) -> int:
+    """
+    Find the end of the value starting at `pos`.
+
+    Trailing whitespace and comments are not included in the value.
+    """
+    depth = 0
+    end = len(content)
+    index = pos
+    while True:
+        match = _TOKEN.search(content, index)
+        if match is None:
+            break
+        token = match.group()
+        index = match.end()
+        if token == "#":
+            if depth == 0:
+                end = match.start()
+                break
+            # Comments are allowed inside multi-line arrays:
+            newline = content.find("\n", index)
+            if newline == -1:
+                break
+            index = newline
+        elif token == "\n":
+            if depth == 0:
+                end = match.start()
+                break
+        elif token in "[{":
+            depth += 1
+        elif token in "]}":
+            depth -= 1
+    return len(content[pos:end].rstrip()) + pos
+
+
+def iter_entries(content: str) -> Iterator[tuple[tuple[str, ...], int, int]]:
+    """
+    Iterate over all key/value entries in a TOML document.
+
+    Args:
+    content: The TOML document.
+
+    Yields:
+    tuple: (path, start, end) where path is the full key path including the
+        table, and start/end is the span of the raw value in content.
+    """
+    table: tuple[str, ...] = ()
+    pos = 0
+    length = len(content)
+    while pos < length:
+        newline = content.find("\n", pos)
+        line_end = length if newline == -1 else newline
+        line = content[pos:line_end].strip()
+
+        if not line or line.startswith("#"):
+            pos = line_end + 1
+            continue
+
+        if line.startswith("["):
+            header = _HEADER.match(content, pos, line_end)
+            if header is None:
+                raise ValueError(f"Invalid table header: {line}")
+            table = _split_key(header.group(2))
+            if header.group(1):
+                table = table + (_ARRAY,)
+            pos = line_end + 1
+            continue
+
+        key = _KEY.match(content, pos, line_end)
+        if key is None:
+            raise ValueError(f"Invalid key/value pair: {line}")
+        start = key.end()
+        end = _value_end(content, start)
+        yield table + _split_key(key.group(1)), start, end
+
+        # Skip to the line following the value:
+        newline = content.find("\n", end)
+        pos = length if newline == -1 else newline + 1
+
+
+def find_value(content: str, path: str | tuple[str, ...]) -> tuple[int, int] | None:
+    """
+    Find the span of the raw value for a key.
+
+    The whole document is searched, the tables of a dotted key may be split
+    up, e.g. `[project.urls]` before `[project]`.
+
+    Args:
+    content: The TOML document.
+    path: Full (dotted) path of the key, e.g. 'project.version'.
+
+    Returns:
+    tuple: Start and end of the value in content or None if not found.
+    """
+    if isinstance(path, str):
+        path = _split_key(path)
+    for entry_path, start, end in iter_entries(content):
+        if entry_path == path:
+            return start, end
+    return None
+
+
+def find_string(content: str, path: str | tuple[str, ...]) -> tuple[int, int] | None:
+    """
+    Find the span of the contents of a single line string value.
+
+    Args:
+    content: The TOML document.
+    path: Full (dotted) path of the key, e.g. 'project.version'.
+
+    Returns:
+    tuple: Start and end of the string contents (without quotes) or None if the
+        key is not found.
+
+    Raises:
+    ValueError: If the value is not a single line string.
+    """
+    span = find_value(content, path)
+    if span is None:
+        return None
+    match = _STRING.fullmatch(content, *span)
+    if match is None:
+        raise ValueError(
+            f"Value of '{path}' is not a string: {content[span[0]:span[1]]}"
+        )
+    group = 1 if match.group(1) is not None else 2
+    return match.start(group), match.end(group)
+
+
+def get_string(content: str, path: str | tuple[str, ...]) -> str | None:
+    """
+    Get the contents of a single line string value.
+
+    Escape sequences are not interpreted.
+
+    Args:
+    content: The TOML document.
+    path: Full (dotted) path of the key, e.g. 'project.version'.
+
+    Returns:
+    str: The string or None if the key is not found.
+    """
+    span = find_string(content, path)
+    if span is None:
+        return None
+    return content[span[0] : span[1]]
+
+
+def replace_string(content: str, path: str | tuple[str, ...], value: str) -> str:
+    """
+    Replace a single line string value, keeping the rest of the document.
+
+    Args:
+    content: The TOML document.
+    path: Full (dotted) path of the key, e.g. 'project.version'.
+    value: The new contents of the string.
+
+    Returns:
+    str: The modified document.
+
+    Raises:
+    ValueError: If the key is not found or is not a string.
+    """
+    span = find_string(content, path)
+    if span is None:
+        raise ValueError(f"Key not found: {path}")
+    return content[: span[0]] + value + content[span[1] :]
@@ -0,0 +1,361 @@
+"""
+Versioning of multiple packages in a workspace (monorepo).
+
+Packages are declared in the `workspace` section of the configuration. Each
+package has its own `VERSION` and `RELEASE` files and hooks, and all packages
+are handled in one process sharing configuration and version control state.
+"""
+
+import bisect
+import contextvars
+import fnmatch
+import glob
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from artisan_tools.app import App
+from artisan_tools.version.api import bump_files, update_files, get_build_info
+from artisan_tools.version.main import read_version_file, check_version
+from artisan_tools.version.index import VersionIndex
+from artisan_tools.version import commits
+from artisan_tools.log import get_logger
+
+log = get_logger("version.workspace")
+
+
+def get_packages(app: App, patterns: list[str] | tuple[str, ...] = ()) -> list[dict]:
+    """
+    Get the packages in the workspace.
+
+    Packages are given in `workspace.packages` either as a path (glob patterns
+    are expanded to directories) or a dictionary with at least a `path`. The
+    name of a package defaults to its path and `current`/`release` default to
+    the `VERSION`/`RELEASE` files in the package directory.
+
+    Args:
+        app (App): The application object.
+        patterns (list): Only include packages with a name matching one of the
+            (fnmatch) patterns, all packages are included when empty.
+
+    Returns:
+        list: The packages as dictionaries with `name`, `path`, `current`,
+            `release`, `bump-hooks`, `update-hooks` and `tag`.
+
+    Raises:
+        ValueError: If the workspace is not configured or no packages match.
+    """
+    workspace = app.config["workspace"]
+    entries = workspace["packages"]
+    if not entries:
+        raise ValueError("No packages configured in 'workspace.packages'.")
+
+    packages: list[dict] = []
+    for entry in entries:
+        if isinstance(entry, str):
+            paths = sorted(
+                path for path in glob.glob(entry) if os.path.isdir(path)
+            ) or [entry]
+            packages.extend(_package(workspace, {"path": path}) for path in paths)
+        else:
+            packages.append(_package(workspace, entry))
+
+    if patterns:
+        packages = [
+            package
+            for package in packages
+            if any(fnmatch.fnmatchcase(package["name"], p) for p in patterns)
+        ]
+        if not packages:
+            raise ValueError(f"No packages in the workspace match {list(patterns)}")
+    return packages
+
+
+def _package(workspace: dict, entry: dict) -> dict:
+    """
+    Fill in defaults for a package entry.
+    """
+    if "path" not in entry:
+        raise ValueError(f"Invalid package: {entry}, it must contain a 'path'")
+    path = os.path.normpath(entry["path"])
+    return {
+        "name": entry.get("name", path),
+        "path": path,
+        "current": os.path.join(path, entry.get("current", "VERSION")),
+        "release": os.path.join(path, entry.get("release", "RELEASE")),
+        "bump-hooks": entry.get("bump-hooks", []),
+        "update-hooks": entry.get("update-hooks", []),
+        "tag": entry.get("tag", workspace["tag"]),
+    }
+
+
+def render_tag(package: dict, version: str) -> str:
+    """
+    Render the tag for a version of a package.
+
+    `@name` is replaced with the package name and `@version` with the version.
+    """
+    return package["tag"].replace("@name", package["name"]).replace("@version", version)
+
+
+def last_release_tag(package: dict, tags: list[str]) -> str | None:
+    """
+    Find the tag of the latest release of a package.
+
+    Args:
+        package (dict): The package.
+        tags (list): All tags in the repository, sorted.
+
+    Returns:
+        str: The tag with the highest release version or None if the package
+            has not been released.
+    """
+    prefix, _, suffix = (
+        package["tag"].replace("@name", package["name"]).partition("@version")
+    )
+    # Tags starting with prefix are adjacent in the sorted list:
+    start = bisect.bisect_left(tags, prefix)
+    end = bisect.bisect_left(tags, prefix + "\U0010ffff", lo=start)
+
+    index = VersionIndex(tags[start:end], prefix, suffix)
+    latest = index.latest()
+    return None if latest is None else index.tag(latest)
+
+
+class PathTrie:
+    """
+    Map paths to the value of the longest matching directory prefix.
+    """
+
+    _VALUE = object()
+
+    def __init__(self):
+        """
+        Create an empty trie.
+        """
+        self._root: dict = {}
+
+    @staticmethod
+    def _parts(path: str) -> list[str]:
+        path = os.path.normpath(path).replace(os.sep, "/")
+        return [] if path == "." else path.split("/")
+
+    def insert(self, path: str, value) -> None:
+        """
+        Add a directory with a value.
+        """
+        node = self._root
+        for part in self._parts(path):
+            node = node.setdefault(part, {})
+        node[self._VALUE] = value
+
+    def longest_prefix(self, path: str):
+        """
+        Get the value of the deepest directory containing path.
+
+        Args:
+            path (str): A normalized, '/' separated path.
+
+        Returns:
+            The value or None if no directory contains the path.
+        """
+        node = self._root
+        value = node.get(self._VALUE)
+        for part in path.split("/"):
+            if part not in node:
+                break
+            node = node[part]
+            value = node.get(self._VALUE, value)
+        return value
+
+
+def changed_packages(app: App, packages: list[dict]) -> list[dict]:
+    """
+    Find the packages with changes since their latest release.
+
+    Packages are grouped by their latest release tag and changed files are
+    retrieved once for each group. Each changed file belongs to the package
+    with the deepest directory containing it. Packages that have not been
+    released are always considered changed.
+
+    Args:
+        app (App): The application object.
+        packages (list): The packages to check.
+
+    Returns:
+        list: The changed packages, in the order of packages.
+    """
+    vcs = app.get_extension("vcs")
+    tags = sorted(vcs.get_tags())  # type: ignore[attr-defined]
+    groups: dict[str | None, list[dict]] = {}
+    for package in packages:
+        groups.setdefault(last_release_tag(package, tags), []).append(package)
+
+    # One trie of all packages, so a file of a nested package is never
+    # attributed to its parent, also if they were released separately:
+    trie = PathTrie()
+    for package in packages:
+        trie.insert(package["path"], package["name"])
+
+    changed = {package["name"] for package in groups.pop(None, [])}
+    for tag, group in groups.items():
+        names = {package["name"] for package in group}
+        # Package paths are relative to the working directory, which need not
+        # be the repository root:
+        files = vcs.get_changed_files(tag, relative=True)  # type: ignore[attr-defined]
+        for path in files:
+            name = trie.longest_prefix(path)
+            if name in names:
+                changed.add(name)
+        log.debug(f"Packages changed since {tag}: {changed}")
+
+    return [package for package in packages if package["name"] in changed]
+
+
+def _map(app: App, function, packages: list[dict]) -> dict:
+    """
+    Run function for each package concurrently.
+
+    Returns:
+        dict: Results by package name, in the order of packages.
+    """
+    jobs = app.config["workspace"]["jobs"]
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        # Run in a copy of the context so traced commands have the right parent:
+        futures = [
+            executor.submit(contextvars.copy_context().run, function, package)
+            for package in packages
+        ]
+        return {
+            package["name"]: future.result()
+            for package, future in zip(packages, futures)
+        }
+
+
+def get_versions(app: App, patterns: list[str] | tuple[str, ...] = ()) -> dict:
+    """
+    Get the current version of packages.
+
+    Args:
+        app (App): The application object.
+        patterns (list): Package name patterns, see `get_packages`.
+
+    Returns:
+        dict: The current version by package name.
+    """
+    packages = get_packages(app, patterns)
+    return _map(app, lambda package: read_version_file(package["current"]), packages)
+
+
+def bump(
+    app: App,
+    target: str,
+    patterns: list[str] | tuple[str, ...] = (),
+    changed_only: bool = False,
+) -> dict:
+    """
+    Bump the version of packages.
+
+    Args:
+        app (App): The application object.
+        target (str): Either part to bump [major|minor|patch], 'auto' to infer
+            the part for each package from conventional commits touching the
+            package since its latest release or a full version string.
+        patterns (list): Package name patterns, see `get_packages`.
+        changed_only (bool): Only bump packages with changes since their latest
+            release, see `changed_packages`.
+
+    Returns:
+        dict: The new version by package name.
+    """
+    packages = get_packages(app, patterns)
+    if changed_only:
+        packages = changed_packages(app, packages)
+    if target != "auto":
+        return _map(
+            app,
+            lambda package: bump_files(app, package, target, root=package["path"]),
+            packages,
+        )
+
+    vcs = app.get_extension("vcs")
+    tags = sorted(vcs.get_tags())  # type: ignore[attr-defined]
+    head = vcs.get_commit_hash(short=False)  # type: ignore[attr-defined]
+    cache = commits.load_cache(app)
+
+    def bump_auto(package):
+        part = commits.infer_bump(
+            app,
+            since=last_release_tag(package, tags),
+            paths=[package["path"]],
+            cache=cache,
+            head=head,
+        )
+        return bump_files(app, package, part, root=package["path"])
+
+    versions = _map(app, bump_auto, packages)
+    commits.save_cache(app, cache)
+    return versions
+
+
+def update(
+    app: App, release: bool = False, patterns: list[str] | tuple[str, ...] = ()
+) -> dict:
+    """
+    Update the `VERSION` file of packages.
+
+    Version control information for non-release versions is retrieved once and
+    shared by all packages.
+
+    Args:
+        app (App): The application object.
+        release (bool): Flag to indicate if the version is a release
+            in which case build info is not added.
+        patterns (list): Package name patterns, see `get_packages`.
+
+    Returns:
+        dict: The new version by package name.
+    """
+    packages = get_packages(app, patterns)
+    build_info = None if release else get_build_info(app)
+    return _map(
+        app,
+        lambda package: update_files(app, package, build_info, root=package["path"]),
+        packages,
+    )
+
+
+def verify(
+    app: App, check_tag: bool = False, patterns: list[str] | tuple[str, ...] = ()
+) -> dict:
+    """
+    Verify the current version of packages.
+
+    Remote tags are retrieved once and shared by all packages.
+
+    Args:
+        app (App): The application object.
+        check_tag (bool): Check that the tag for the current version doesn't
+            exist.
+        patterns (list): Package name patterns, see `get_packages`.
+
+    Returns:
+        dict: An error message (or None if verification passed) by package
+            name.
+    """
+    packages = get_packages(app, patterns)
+    versions = _map(
+        app, lambda package: read_version_file(package["current"]), packages
+    )
+    remote_tags = set(app.get_extension("vcs").get_remote_tags()) if check_tag else ()  # type: ignore[attr-defined]
+
+    errors: dict[str, str | None] = {}
+    for package in packages:
+        version = versions[package["name"]]
+        errors[package["name"]] = None
+        if not check_version(version):
+            errors[package["name"]] = f"Invalid semver version: {version}."
+        elif check_tag and render_tag(package, version) in remote_tags:
+            errors[package["name"]] = (
+                f"Tag '{render_tag(package, version)}' already exists."
+            )
+    return errors
@@ -0,0 +1,159 @@
+import base64
+import json
+import threading
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+
+class FakeRegistry(ThreadingHTTPServer):
+    """
+    Stand-in for an OCI registry with bearer token authentication.
+    """
+
+    daemon_threads = True
+
+    def __init__(self):
+        """
+        Listen on a free port of localhost.
+        """
+        super().__init__(("127.0.0.1", 0), RegistryHandler)
+        self.tags = {"org/app": ["1.0.0", "1.0.1", "latest"]}
+        self.manifests = {}
+        self.credentials = ("test", "test")
+        self.requests = []
+        self.token_requests = []
+        self.connections = 0
+        self.lock = threading.Lock()
+
+    @property
+    def address(self):
+        """
+        The address of the registry, host:port.
+        """
+        return f"127.0.0.1:{self.server_address[1]}"
+
+
+class RegistryHandler(BaseHTTPRequestHandler):
+    """
+    Handle token and registry API requests of `FakeRegistry`.
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        """
+        Count the connection.
+        """
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def log_message(self, format, *args):
+        """
+        Don't log requests.
+        """
+        pass
+
+    def send(self, status, content=None, headers=(), type="application/json"):
+        """
+        Send a response with JSON content.
+        """
+        body = json.dumps(content).encode() if content is not None else b""
+        self.send_response(status)
+        for name, value in headers:
+            self.send_header(name, value)
+        self.send_header("Content-Type", type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def handle_token(self, params):
+        """
+        Issue a token for a scope, checking basic authentication.
+        """
+        self.server.token_requests.append(params)
+        expected = ":".join(self.server.credentials).encode()
+        if self.headers.get("Authorization") != (
+            "Basic " + base64.b64encode(expected).decode()
+        ):
+            self.send(401, {"errors": [{"code": "UNAUTHORIZED"}]})
+        else:
+            self.send(200, {"token": f"token-{params['scope']}", "expires_in": 300})
+
+    def handle_v2(self, path, params):
+        """
+        Serve tags and manifests, challenging requests without token.
+        """
+        repository, _, rest = path.removeprefix("/v2/").rpartition("/")
+        repository = repository.removesuffix("/tags").removesuffix("/manifests")
+        action = "push" if self.command == "PUT" else "pull"
+        scope = f"repository:{repository}:{action}"
+        token = self.headers.get("Authorization", "").removeprefix("Bearer token-")
+        name, _, actions = token.rpartition(":")
+        if name != f"repository:{repository}" or action not in actions.split(","):
+            realm = f"http://{self.server.address}/token"
+            challenge = f'Bearer realm="{realm}",service="fake",scope="{scope}"'
+            self.send(401, {"errors": []}, [("WWW-Authenticate", challenge)])
+            return
+        if repository not in self.server.tags:
+            self.send(404, {"errors": [{"code": "NAME_UNKNOWN"}]})
+        elif rest == "list":
+            tags = sorted(self.server.tags[repository])
+            if "last" in params:
+                tags = [t for t in tags if t > params["last"]]
+            headers = []
+            if "n" in params and len(tags) > int(params["n"]):
+                tags = tags[: int(params["n"])]
+                query = urllib.parse.urlencode({"n": params["n"], "last": tags[-1]})
+                link = f'</v2/{repository}/tags/list?{query}>; rel="next"'
+                headers.append(("Link", link))
+            self.send(200, {"name": repository, "tags": tags}, headers)
+        elif self.command == "PUT":
+            length = int(self.headers["Content-Length"])
+            self.server.manifests[(repository, rest)] = self.rfile.read(length)
+            self.server.tags[repository].append(rest)
+            self.send(201)
+        elif rest in self.server.tags[repository]:
+            manifest = {"schemaVersion": 2, "tag": rest}
+            digest = f"sha256:{rest}"
+            self.send(
+                200,
+                manifest,
+                [("Docker-Content-Digest", digest)],
+                type="application/vnd.oci.image.manifest.v1+json",
+            )
+        else:
+            self.send(404, {"errors": [{"code": "MANIFEST_UNKNOWN"}]})
+
+    def do_GET(self):
+        """
+        Record and dispatch the request, also for HEAD and PUT.
+        """
+        url = urllib.parse.urlsplit(self.path)
+        params = dict(urllib.parse.parse_qsl(url.query))
+        with self.server.lock:
+            self.server.requests.append((self.command, url.path))
+        if url.path == "/token":
+            self.handle_token(params)
+        elif url.path.startswith("/v2/"):
+            self.handle_v2(url.path, params)
+        else:
+            self.send(404)
+
+    do_HEAD = do_PUT = do_GET
+
+
+@pytest.fixture
+def fake_registry():
+    """
+    Fixture running a fake registry, with repository 'org/app'.
+    """
+    server = FakeRegistry()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
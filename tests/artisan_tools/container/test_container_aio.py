@@ -0,0 +1,96 @@
+import asyncio
+import os
+import subprocess
+
+import pytest
+
+from artisan_tools.container import api
+
+
+@pytest.fixture
+def fake_podman(tmp_path, monkeypatch):
+    """
+    A podman executable logging its arguments, login state is kept in a file.
+    """
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    log = tmp_path / "podman.log"
+    state = tmp_path / "logged_in"
+    script = bin_dir / "podman"
+    script.write_text(f"""#!/bin/sh
+echo "$*" >> {log}
+case "$1 $2" in
+    "login --get-login") [ -f {state} ] && exit 0
+        echo "not logged in" >&2; exit 125;;
+    "login "*) cat > /dev/null; sleep 0.1; touch {state};;
+    "logout "*) rm {state};;
+    "push "*) sleep 0.1;;
+esac
+""")
+    script.chmod(0o755)
+    monkeypatch.setenv("PATH", f"{bin_dir}:{os.environ['PATH']}")
+
+    def commands():
+        return log.read_text().splitlines() if log.exists() else []
+
+    return commands
+
+
+def test_apush_concurrent(app_with_config, fake_podman):
+    app = app_with_config
+
+    async def main():
+        await asyncio.gather(
+            api.apush(app, "image", "localhost:5000/image", ["1", "2"]),
+            api.apush(app, "image", "localhost:5000/other", ["1"]),
+            api.arun_command_with_auth(app, "true"),
+        )
+
+    asyncio.run(main())
+
+    commands = fake_podman()
+    logins = [c for c in commands if c.startswith("login localhost")]
+    assert logins == [
+        "login localhost:5000 -u test --password-stdin --tls-verify=False"
+    ]
+    assert commands[-1] == "logout localhost:5000"
+    pushes = [c.split()[1] for c in commands if c.startswith("push")]
+    assert sorted(pushes) == [
+        "localhost:5000/image:1",
+        "localhost:5000/image:2",
+        "localhost:5000/other:1",
+    ]
+
+    # A new event loop, e.g. a second `asyncio.run`, logs in again:
+    asyncio.run(api.arun_command_with_auth(app, "true"))
+    assert len([c for c in fake_podman() if c.startswith("login localhost")]) == 2
+
+
+def test_apush_metrics(app_with_config, fake_podman):
+    pushes = api._push_seconds.count(registry="docker.io")
+    asyncio.run(api.apush(app_with_config, "image", "org/image", ["1"]))
+    assert api._push_seconds.count(registry="docker.io") == pushes + 1
+
+
+def test_aauthorized_registry_errors(app_with_config, fake_podman):
+    app = app_with_config
+
+    with pytest.raises(subprocess.CalledProcessError):
+        asyncio.run(api.arun_command_with_auth(app, "exit 3"))
+    # Logged out, also when the command failed:
+    assert fake_podman()[-1] == "logout localhost:5000"
+
+    with pytest.raises(ValueError):
+        asyncio.run(api.apush(app, "image", "localhost:5000/image:1", ["2"]))
+
+
+def test_aauthorized_registry_nested(app_with_config, fake_podman, mocker):
+    app = app_with_config
+    login = mocker.patch.object(api, "login", return_value=True)
+    logout = mocker.patch.object(api, "logout")
+
+    # The login of the outer synchronous block is used:
+    with api.authorized_registry(app):
+        asyncio.run(api.arun_command_with_auth(app, "true"))
+    assert login.call_count == logout.call_count == 1
+    assert fake_podman() == []
@@ -0,0 +1,127 @@
+import os
+
+import pytest
+
+from artisan_tools.container import api, contenthash
+from artisan_tools.container.contenthash import (
+    context_hash,
+    is_ignored,
+    list_files,
+    read_ignore,
+)
+
+
+@pytest.fixture
+def context(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    context = tmp_path / "context"
+    (context / "src" / "pkg").mkdir(parents=True)
+    (context / "build").mkdir()
+    (context / "Dockerfile").write_text("FROM alpine\nCOPY . /app\n")
+    (context / "src" / "main.py").write_text("print('hello')\n")
+    (context / "src" / "pkg" / "cache.tmp").write_text("temporary")
+    (context / "build" / "out.bin").write_text("binary")
+    (context / "build" / "keep.txt").write_text("keep")
+    (context / "debug.log").write_text("log")
+    (context / ".dockerignore").write_text(
+        "# Build output\n*.log\nbuild\n!build/keep.txt\n**/*.tmp\nDockerfile\n"
+    )
+    # Old modification times, so the digests are cached:
+    for root, _, files in os.walk(context):
+        for name in files:
+            os.utime(os.path.join(root, name), (1e9, 1e9))
+    return str(context)
+
+
+def test_is_ignored():
+    rules = [(False, contenthash._compile(p)) for p in ("*.log", "docs", "**/*.tmp")]
+    rules.append((True, contenthash._compile("docs/README.md")))
+
+    assert is_ignored("debug.log", rules)
+    assert not is_ignored("src/debug.log", rules)
+    assert is_ignored("docs/index.md", rules)
+    assert not is_ignored("docs/README.md", rules)
+    assert is_ignored("a/b/c.tmp", rules)
+    assert is_ignored("c.tmp", rules)
+    assert not is_ignored("src/main.py", rules)
+
+
+def test_read_ignore(tmp_path):
+    (tmp_path / ".dockerignore").write_text("/build/\n\n# comment\n!./keep\n")
+    rules = read_ignore(str(tmp_path))
+    assert [(e, p.pattern) for e, p in rules] == [(False, "build"), (True, "keep")]
+    assert read_ignore(str(tmp_path / "missing")) == []
+
+
+def test_list_files(context):
+    assert list_files(context) == [
+        ".dockerignore",
+        "build/keep.txt",
+        "src/",
+        "src/main.py",
+        "src/pkg/",
+    ]
+
+
+def test_context_hash(context):
+    first = context_hash(context)
+    assert len(first) == 64
+    assert context_hash(context, cache=False) == first
+
+    # Excluded files don't change the hash:
+    with open(os.path.join(context, "debug.log"), "w") as file:
+        file.write("more log")
+    assert context_hash(context) == first
+
+    # The Dockerfile is included, although it's excluded:
+    with open(os.path.join(context, "Dockerfile"), "a") as file:
+        file.write("RUN true\n")
+    second = context_hash(context)
+    assert second != first
+
+    os.chmod(os.path.join(context, "src", "main.py"), 0o755)
+    assert context_hash(context) != second
+
+
+def test_context_hash_cache(context, monkeypatch):
+    context_hash(context)
+
+    read = []
+    file_digest = contenthash._file_digest
+
+    def counting_digest(path):
+        read.append(os.path.relpath(path, context))
+        return file_digest(path)
+
+    monkeypatch.setattr(contenthash, "_file_digest", counting_digest)
+    first = context_hash(context)
+    assert read == ["Dockerfile"]
+
+    # A changed file is read again, although the size is the same:
+    path = os.path.join(context, "src", "main.py")
+    with open(path, "w") as file:
+        file.write("print('world')\n")
+    read.clear()
+    assert context_hash(context) != first
+    assert read == ["src/main.py", "Dockerfile"]
+
+
+def test_content_hash_dockerfile(app_with_config, context, tmp_path):
+    app = app_with_config
+    dockerfile = tmp_path / "build.Dockerfile"
+    dockerfile.write_text("FROM alpine\n")
+
+    default = api.content_hash(app, context)
+    other = api.content_hash(app, context, str(dockerfile))
+    assert other != default
+    assert api.content_hash(app, context) == default
+
+
+def test_dockerfile_option():
+    assert api._dockerfile_option(["--pull"]) is None
+    assert api._dockerfile_option(["--file=a/Dockerfile"]) == "a/Dockerfile"
+    assert api._dockerfile_option(["--file", "a/Dockerfile", "--pull"]) == (
+        "a/Dockerfile"
+    )
+    assert api._dockerfile_option(["-f", "a/Dockerfile"]) == "a/Dockerfile"
+    assert api._dockerfile_option(["-fa/Dockerfile"]) == "a/Dockerfile"
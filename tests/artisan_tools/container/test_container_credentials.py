@@ -0,0 +1,115 @@
+import json
+import os
+
+import pytest
+import yaml
+
+from artisan_tools.app import App
+from artisan_tools.container import api, main
+
+
+@pytest.fixture
+def isolated():
+    main.enable_isolated_credentials()
+    yield main._isolated["directory"]
+    main.disable_isolated_credentials()
+
+
+@pytest.fixture
+def docker_config(tmp_path, monkeypatch):
+    directory = tmp_path / "docker"
+    (directory / "cli-plugins").mkdir(parents=True)
+    config = {
+        "credsStore": "desktop",
+        "credHelpers": {"gcr.io": "gcloud"},
+        "auths": {"ghcr.io": {}},
+        "proxies": {"default": {"httpProxy": "http://proxy:3128"}},
+    }
+    (directory / "config.json").write_text(json.dumps(config))
+    monkeypatch.setenv("DOCKER_CONFIG", str(directory))
+    return directory
+
+
+def test_isolated_config(docker_config, isolated):
+    with open(os.path.join(isolated, "config.json")) as file:
+        assert json.load(file) == {
+            "proxies": {"default": {"httpProxy": "http://proxy:3128"}}
+        }
+    assert os.path.islink(os.path.join(isolated, "cli-plugins"))
+    assert main.engine_env()["DOCKER_CONFIG"] == isolated
+    assert main.engine_env()["REGISTRY_AUTH_FILE"].startswith(isolated)
+    assert not main.check_login("ghcr.io", "docker")
+
+    main.disable_isolated_credentials()
+    assert not os.path.exists(isolated)
+    assert main.engine_env() is None
+
+
+def test_isolated_fork(isolated):
+    read, write = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        # The forked process gets its own store and only removes that one:
+        main.enable_isolated_credentials()
+        os.write(write, main._isolated["directory"].encode())
+        main.disable_isolated_credentials()
+        os._exit(0)
+    os.close(write)
+    directory = os.read(read, 4096).decode()
+    os.close(read)
+    os.waitpid(pid, 0)
+
+    assert directory and directory != isolated
+    assert not os.path.exists(directory)
+    assert os.path.isdir(isolated)
+
+
+def test_isolated_commands(app_with_config, tmp_path, monkeypatch, isolated):
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    log = tmp_path / "podman.log"
+    script = bin_dir / "podman"
+    script.write_text(f"""#!/bin/sh
+echo "$1 $REGISTRY_AUTH_FILE" >> {log}
+case "$1 $2" in
+    "login --get-login") [ -f "$REGISTRY_AUTH_FILE" ] && exit 0
+        echo "not logged in" >&2; exit 125;;
+    "login "*) cat > /dev/null; echo {{}} > "$REGISTRY_AUTH_FILE";;
+    "logout "*) rm "$REGISTRY_AUTH_FILE";;
+esac
+""")
+    script.chmod(0o755)
+    monkeypatch.setenv("PATH", f"{bin_dir}:{os.environ['PATH']}")
+    auth_file = os.path.join(isolated, "auth.json")
+
+    api.push(app_with_config, "image", "localhost:5000/image", ["1"])
+    api.run_command_with_auth(app_with_config, f"echo cmd $REGISTRY_AUTH_FILE >> {log}")
+
+    commands = log.read_text().splitlines()
+    # `login --get-login` is run twice before logging in:
+    login = ["login"] * 3
+    assert [c.split()[0] for c in commands] == [
+        *login,
+        "tag",
+        "push",
+        "logout",
+        *login,
+        "cmd",
+        "logout",
+    ]
+    assert all(c.split()[1] == auth_file for c in commands)
+
+
+def test_setup(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    config = {"container": {"isolated-credentials": True}}
+    (tmp_path / "artisan.yaml").write_text(yaml.dump(config))
+
+    app = App()
+    app.load_extensions()
+    directory = main._isolated["directory"]
+    assert os.path.isdir(directory)
+
+    app.close()
+    assert not main._isolated
+    assert not os.path.exists(directory)
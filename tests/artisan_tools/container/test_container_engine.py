@@ -0,0 +1,251 @@
+import base64
+import json
+import socketserver
+import threading
+import urllib.parse
+from http.server import BaseHTTPRequestHandler
+
+import pytest
+
+from artisan_tools import error
+from artisan_tools.container import api
+from artisan_tools.container.engine import EngineClient, default_socket
+
+
+class FakeEngine(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """
+    Stand-in for the engine API socket, recording requests and connections.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, path):
+        super().__init__(path, EngineHandler)
+        self.images = {"app:latest": {"Id": "sha256:abc"}}
+        self.requests = []
+        self.connections = 0
+        self.keep_alive = True
+
+
+class EngineHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        self.server.connections += 1
+
+    def log_message(self, format, *args):
+        pass
+
+    def end_headers(self):
+        super().end_headers()
+        if not self.server.keep_alive:
+            self.close_connection = True
+
+    def send_json(self, status, content):
+        body = json.dumps(content).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_stream(self, messages):
+        self.send_response(200)
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for message in messages:
+            data = (json.dumps(message, ensure_ascii=False) + "\r\n").encode()
+            # Split messages between chunks, within the first non-ASCII
+            # character if there is one:
+            split = next((i + 1 for i, byte in enumerate(data) if byte > 127), 1)
+            for chunk in (data[:split], data[split:]):
+                self.wfile.write(f"{len(chunk):x}\r\n".encode() + chunk + b"\r\n")
+        self.wfile.write(b"0\r\n\r\n")
+
+    def do_GET(self):
+        url = urllib.parse.urlsplit(self.path)
+        self.server.requests.append(("GET", url.path, {}, self.headers))
+        if url.path == "/_ping":
+            self.send_json(200, "OK")
+        elif url.path.endswith("/json"):
+            name = url.path.removeprefix("/images/").removesuffix("/json")
+            if name in self.server.images:
+                self.send_json(200, self.server.images[name])
+            else:
+                self.send_json(404, {"message": f"No such image: {name}"})
+        else:
+            self.send_json(404, {"message": "page not found"})
+
+    def do_POST(self):
+        url = urllib.parse.urlsplit(self.path)
+        params = dict(urllib.parse.parse_qsl(url.query))
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length)) if length else None
+        self.server.requests.append(("POST", url.path, params, self.headers))
+        if url.path == "/auth":
+            if body["password"] == "test":
+                self.send_json(200, {"Status": "Login Succeeded"})
+            else:
+                self.send_json(401, {"message": "unauthorized"})
+        elif url.path.endswith("/tag"):
+            name = url.path.removeprefix("/images/").removesuffix("/tag")
+            if name not in self.server.images:
+                self.send_json(404, {"message": f"No such image: {name}"})
+            else:
+                target = f"{params['repo']}:{params['tag']}"
+                self.server.images[target] = self.server.images[name]
+                self.send_response(201)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+        elif url.path.endswith("/push"):
+            name = url.path.removeprefix("/images/").removesuffix("/push")
+            messages = [
+                {"status": "Preparing", "id": "layer"},
+                {"status": "Pushing", "progressDetail": {"current": 1}, "id": "layer"},
+            ]
+            if f"{name}:{params['tag']}" not in self.server.images:
+                messages.append({"error": "An image does not exist locally"})
+            else:
+                messages.append({"status": f"{params['tag']}: digest: sha256:abc"})
+            messages.append({"status": "Pushed ✓"})
+            self.send_stream(messages)
+        else:
+            self.send_json(404, {"message": "page not found"})
+
+
+@pytest.fixture
+def fake_engine(tmp_path):
+    server = FakeEngine(str(tmp_path / "engine.sock"))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def client(fake_engine):
+    client = EngineClient(fake_engine.server_address)
+    yield client
+    client.close()
+
+
+def test_ping(client, tmp_path):
+    assert client.ping()
+    assert not EngineClient(str(tmp_path / "missing.sock")).ping()
+
+
+def test_tag_and_push(client, fake_engine):
+    client.tag("app:latest", "localhost:5000/app:1.0.0")
+    assert "localhost:5000/app:1.0.0" in fake_engine.images
+
+    messages = []
+    auth = {"username": "test", "password": "test"}
+    client.push("localhost:5000/app:1.0.0", auth, progress=messages.append)
+
+    assert messages[-2:] == [
+        {"status": "1.0.0: digest: sha256:abc"},
+        {"status": "Pushed ✓"},
+    ]
+    method, path, params, headers = fake_engine.requests[-1]
+    assert path == "/images/localhost:5000/app/push"
+    assert params == {"tag": "1.0.0"}
+    assert json.loads(base64.urlsafe_b64decode(headers["X-Registry-Auth"])) == auth
+    # All requests use one connection:
+    assert fake_engine.connections == 1
+
+
+def test_push_error(client, fake_engine):
+    messages = []
+    with pytest.raises(error.ExternalError, match="does not exist locally"):
+        client.push("localhost:5000/missing:1.0.0", progress=messages.append)
+    assert len(messages) == 2
+
+    # The rest of the failed response isn't read by the next requests:
+    client.tag("app:latest", "localhost:5000/app:1.0.0")
+    client.push("localhost:5000/app:1.0.0")
+    assert fake_engine.connections == 2
+
+
+def test_inspect_image(client):
+    assert client.inspect_image("app:latest") == {"Id": "sha256:abc"}
+    assert client.inspect_image("missing") is None
+
+
+def test_login(client):
+    auth = client.login("test", "test", "localhost:5000")
+    assert auth["serveraddress"] == "localhost:5000"
+    with pytest.raises(error.ExternalError, match="401"):
+        client.login("test", "wrong", "localhost:5000")
+
+
+def test_tag_missing_image(client):
+    with pytest.raises(error.ExternalError, match="No such image"):
+        client.tag("missing", "localhost:5000/app:1.0.0")
+
+
+def test_reconnect(client, fake_engine):
+    # The engine closes the connection after each response:
+    fake_engine.keep_alive = False
+    assert client.ping()
+    client.tag("app:latest", "localhost:5000/app:1.0.0")
+    assert fake_engine.connections == 2
+
+
+def test_default_socket(monkeypatch):
+    monkeypatch.setenv("DOCKER_HOST", "unix:///tmp/docker.sock")
+    assert default_socket("docker") == "/tmp/docker.sock"
+    monkeypatch.setenv("DOCKER_HOST", "tcp://localhost:2375")
+    assert default_socket("docker") is None
+    monkeypatch.setenv("CONTAINER_HOST", "unix:///tmp/podman.sock")
+    assert default_socket("podman") == "/tmp/podman.sock"
+
+
+def test_api_push(app_with_config, fake_engine, capsys):
+    app = app_with_config
+    app.config["container"]["backend"] = "api"
+    app.config["container"]["socket"] = fake_engine.server_address
+
+    api.push(app, "app:latest", "localhost:5000/app", ["1", "2"])
+
+    assert "localhost:5000/app:2" in fake_engine.images
+    pushes = [r for r in fake_engine.requests if r[1].endswith("/push")]
+    assert [r[2]["tag"] for r in pushes] == ["1", "2"]
+    assert "Successfully pushed app:latest to localhost:5000/app:2" in (
+        capsys.readouterr().out
+    )
+    assert [r[1] for r in fake_engine.requests[:3]] == [
+        "/_ping",
+        "/images/app:latest/json",
+        "/auth",
+    ]
+    assert fake_engine.connections == 1
+
+    app.close()
+    assert api.engine_client(app)._connection is None
+
+    with pytest.raises(error.ExternalError, match="does not exist"):
+        api.push(app, "missing", "localhost:5000/app", ["1"])
+
+
+def test_api_backend_without_auth(app_with_config, fake_engine):
+    app = app_with_config
+    app.config["container"]["backend"] = "api"
+    app.config["container"]["socket"] = fake_engine.server_address
+    # Credentials of a CLI login can only be used by the CLI:
+    app.config["container"]["auth"]["method"] = None
+    assert api.engine_client(app) is None
+
+
+def test_api_backend_unreachable(app_with_config, tmp_path):
+    app = app_with_config
+    app.config["container"]["socket"] = str(tmp_path / "missing.sock")
+
+    app.config["container"]["backend"] = "auto"
+    assert api.engine_client(app) is None
+
+    api._clients.pop(app)
+    app.config["container"]["backend"] = "api"
+    with pytest.raises(error.ExternalError, match="not reachable"):
+        api.engine_client(app)
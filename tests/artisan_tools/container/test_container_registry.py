@@ -0,0 +1,168 @@
+import contextlib
+
+import pytest
+from typer.testing import CliRunner
+
+from artisan_tools import error
+from artisan_tools.container import api
+from artisan_tools.container.cli import factory
+from artisan_tools.container.registry import Registry, registry_url, split_repository
+
+
+@pytest.fixture
+def registry(fake_registry):
+    with Registry(fake_registry.address, "test", "test") as registry:
+        yield registry
+
+
+def test_registry_url():
+    assert registry_url("ghcr.io") == ("https", "ghcr.io")
+    assert registry_url("localhost:5000") == ("http", "localhost:5000")
+    assert registry_url("localhost:5000", insecure=False) == ("https", "localhost:5000")
+    assert registry_url("docker.io") == ("https", "registry-1.docker.io")
+    assert registry_url("http://registry:5000") == ("http", "registry:5000")
+
+
+def test_split_repository():
+    assert split_repository("ghcr.io/org/app") == ("ghcr.io", "org/app")
+    assert split_repository("localhost:5000/app") == ("localhost:5000", "app")
+    assert split_repository("localhost/app") == ("localhost", "app")
+    assert split_repository("org/app") == ("docker.io", "org/app")
+    assert split_repository("alpine") == ("docker.io", "library/alpine")
+
+
+def test_tag_exists(registry, fake_registry):
+    assert registry.tag_exists("org/app", "1.0.0")
+    assert not registry.tag_exists("org/app", "2.0.0")
+    assert not registry.tag_exists("org/missing", "1.0.0")
+    # One token per repository scope:
+    assert [r["scope"] for r in fake_registry.token_requests] == [
+        "repository:org/app:pull",
+        "repository:org/missing:pull",
+    ]
+
+
+def test_digest(registry):
+    assert registry.digest("org/app", "1.0.1") == "sha256:1.0.1"
+    assert registry.digest("org/app", "2.0.0") is None
+
+
+def test_tags_exist(registry, fake_registry):
+    tags = [f"1.0.{i}" for i in range(20)]
+    result = registry.tags_exist("org/app", tags, workers=4)
+
+    assert result == {tag: tag in ("1.0.0", "1.0.1") for tag in tags}
+    assert len(fake_registry.token_requests) == 1
+    # Connections are reused, at most one per worker and the first request:
+    assert fake_registry.connections <= 5
+
+
+def test_list_tags(registry, fake_registry):
+    fake_registry.tags["org/app"] = [f"1.0.{i}" for i in range(25)]
+
+    tags = registry.list_tags("org/app", page_size=10)
+
+    assert sorted(tags) == sorted(fake_registry.tags["org/app"])
+    pages = [r for r in fake_registry.requests if r[1].endswith("/tags/list")]
+    # The first request is challenged, then three pages:
+    assert len(pages) == 4
+    assert registry.list_tags("org/missing") == []
+
+
+def test_invalid_credentials(fake_registry):
+    with Registry(fake_registry.address, "test", "wrong") as registry:
+        with pytest.raises(error.ExternalError, match="token"):
+            registry.tag_exists("org/app", "1.0.0")
+
+
+@pytest.fixture
+def app_with_registry(app_with_config, fake_registry):
+    app = app_with_config
+    app.config["container"]["registry"] = fake_registry.address
+    app.config["container"]["auth"] = {
+        "method": "direct",
+        "user": "test",
+        "token": "test",
+    }
+    return app
+
+
+def test_check_no_tag(app_with_registry, fake_registry):
+    app = app_with_registry
+    repository = f"{fake_registry.address}/org/app"
+    fake_registry.tags["org/app"].append("0.99.9")
+
+    assert api.check_no_tag(app, repository, ["@version", "2.0.0"]) == ["0.99.9"]
+    assert api.check_no_tag(app, repository, ["2.0.0"]) == []
+    heads = [r for r in fake_registry.requests if r[0] == "HEAD"]
+    assert len(heads) == 4  # including the challenged request
+
+    # For many tags, the tag list is fetched instead:
+    tags = [f"2.0.{i}" for i in range(5)] + ["1.0.0"]
+    assert api.check_no_tag(app, repository, tags, list_threshold=3) == ["1.0.0"]
+    assert fake_registry.requests[-1] == ("GET", "/v2/org/app/tags/list")
+
+    app.close()
+    assert not api.registry_client(app, fake_registry.address)._pools
+
+
+def test_check_no_tag_cli(app_with_registry, fake_registry):
+    repository = f"{fake_registry.address}/org/app"
+    cli = factory(app_with_registry)
+
+    result = CliRunner().invoke(cli, ["check-no-tag", repository, "2.0.0", "3.0.0"])
+    assert result.exit_code == 0, result.output
+
+    result = CliRunner().invoke(cli, ["check-no-tag", repository, "2.0.0", "1.0.1"])
+    assert result.exit_code == 1
+    assert "Tags already exist in" in result.output
+    assert "1.0.1" in result.output
+
+
+def test_tag(registry, fake_registry):
+    registry.tag("org/app", "1.0.0", "stable")
+
+    assert registry.digest("org/app", "stable")
+    assert b'"tag": "1.0.0"' in fake_registry.manifests[("org/app", "stable")]
+    with pytest.raises(error.ExternalError, match="manifest"):
+        registry.tag("org/app", "missing", "stable")
+
+
+def test_build_push_avoid_rebuild(app_with_registry, fake_registry, monkeypatch):
+    app = app_with_registry
+    repository = f"{fake_registry.address}/org/app"
+    builds = []
+    monkeypatch.setattr(api, "build_push_main", lambda **kwargs: builds.append(kwargs))
+    monkeypatch.setattr(api, "authorized_registry", contextlib.nullcontext)
+    content_hash = api.content_hash(app)
+
+    # Not built yet:
+    assert api.build_push(
+        app, repository, ["@contenthash", "@version"], avoid_rebuild=True
+    )
+    assert builds[0]["tags"] == [content_hash, "0.99.9"]
+
+    fake_registry.tags["org/app"].append(content_hash)
+    assert not api.build_push(
+        app, repository, ["@contenthash", "@version"], avoid_rebuild=True
+    )
+    assert len(builds) == 1
+    assert "0.99.9" in fake_registry.tags["org/app"]
+
+    # Build avoidance is disabled by default:
+    assert api.build_push(app, repository, ["@contenthash"])
+    assert len(builds) == 2
+
+
+def test_build_push_dockerfile(app_with_config, tmp_path, monkeypatch):
+    app = app_with_config
+    builds = []
+    monkeypatch.setattr(api, "build_push_main", lambda **kwargs: builds.append(kwargs))
+    monkeypatch.setattr(api, "authorized_registry", contextlib.nullcontext)
+    dockerfile = tmp_path / "build.Dockerfile"
+    dockerfile.write_text("FROM alpine\n")
+
+    api.build_push(app, "org/app", ["@contenthash"], options=("-f", str(dockerfile)))
+
+    assert builds[0]["tags"] == [api.content_hash(app, ".", str(dockerfile))]
+    assert builds[0]["tags"] != [api.content_hash(app)]
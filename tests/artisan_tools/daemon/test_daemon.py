@@ -0,0 +1,123 @@
+import os
+import threading
+import time
+
+import pytest
+import yaml
+
+from artisan_tools import client
+from artisan_tools.container import main
+from artisan_tools.daemon.server import Daemon
+
+
+@pytest.fixture
+def daemon(app_with_config, tmp_path, monkeypatch):
+    """
+    Fixture running a daemon for the test directory in a thread.
+    """
+    # Keep the socket path short and test specific:
+    monkeypatch.setenv("XDG_RUNTIME_DIR", str(tmp_path))
+    daemon = Daemon(idle_timeout=30)
+    thread = threading.Thread(target=daemon.serve)
+    thread.start()
+    while not os.path.exists(daemon.path):
+        time.sleep(0.01)
+    yield daemon
+    client.stop()
+    thread.join()
+
+
+def test_forward_without_daemon(app_with_config, tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_RUNTIME_DIR", str(tmp_path))
+    assert client.forward(["version", "get"]) is None
+
+
+def test_forward(daemon, capfd):
+    capfd.readouterr()
+    assert client.forward(["version", "get"]) == 0
+    assert capfd.readouterr().out == "0.99.9"
+
+    assert client.forward(["version", "verify"]) == 0
+    assert client.forward(["no-such-command"]) == 2
+
+
+def test_forward_disabled(daemon, monkeypatch):
+    monkeypatch.setenv(client.DISABLE_VAR, "1")
+    assert client.forward(["version", "get"]) is None
+
+
+def test_invalidation(daemon, capfd):
+    assert not daemon.is_stale()
+    app = daemon.app
+
+    # Commands can change files, the daemon is reloaded on the next command:
+    assert client.forward(["version", "bump", "1.0.0"]) == 0
+    assert client.forward(["version", "update", "--release"]) == 0
+    capfd.readouterr()
+    assert client.forward(["version", "get"]) == 0
+    assert capfd.readouterr().out == "1.0.0"
+    assert daemon.app is not app
+
+    with open("VERSION", "w") as f:
+        f.write("invalid")
+    assert client.forward(["version", "verify"]) == 1
+
+
+def test_stop(daemon):
+    assert client.stop()
+    while os.path.exists(daemon.path):
+        time.sleep(0.01)
+    assert not client.stop()
+
+
+def test_concurrent_commands(daemon, tmp_path, monkeypatch):
+    waiting = tmp_path / "waiting"
+    started = tmp_path / "started"
+
+    def run_command(argv):
+        # Runs in the forked child, the first command waits for the second:
+        if argv == ["second"]:
+            started.touch()
+            return 0
+        waiting.touch()
+        deadline = time.monotonic() + 10
+        while not started.exists():
+            if time.monotonic() > deadline:
+                return 3
+            time.sleep(0.01)
+        return 0
+
+    monkeypatch.setattr(daemon, "_run_command", run_command)
+    codes = []
+    first = threading.Thread(target=lambda: codes.append(client.forward(["first"])))
+    first.start()
+    while not waiting.exists():
+        time.sleep(0.01)
+    assert client.forward(["second"]) == 0
+    first.join()
+    assert codes == [0]
+
+
+def test_isolated_credentials(daemon, tmp_path, monkeypatch):
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    (bin_dir / "podman").write_text("#!/bin/sh\n")
+    (bin_dir / "podman").chmod(0o755)
+    monkeypatch.setenv("PATH", f"{bin_dir}:{os.environ['PATH']}")
+    with open("artisan.yaml") as f:
+        config = yaml.safe_load(f)
+    config["container"]["isolated-credentials"] = True
+    with open("artisan.yaml", "w") as f:
+        yaml.dump(config, f)
+
+    log = tmp_path / "auth.log"
+    command = f"echo $REGISTRY_AUTH_FILE >> {log}"
+    assert client.forward(["container", "command", command]) == 0
+    assert client.forward(["container", "command", command]) == 0
+    assert daemon.command is None
+
+    # Every command used and removed its own credential store:
+    directories = [os.path.dirname(f) for f in log.read_text().split()]
+    assert len(set(directories)) == 2
+    assert main._isolated["directory"] not in directories
+    assert not any(os.path.exists(d) for d in directories)
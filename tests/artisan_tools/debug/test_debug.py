@@ -0,0 +1,44 @@
+from artisan_tools.debug.main import parse_importtime, profile_startup, format_profile
+
+IMPORTTIME = """\
+import time: self [us] | cumulative | imported package
+import time:       221 |        221 |   _io
+import time:       100 |        100 |     typer.core
+import time:       300 |        400 |   typer
+import time:      1000 |       1400 | artisan_tools.app
+"""
+
+
+def test_parse_importtime():
+    modules = parse_importtime(IMPORTTIME)
+    assert [m["name"] for m in modules] == [
+        "_io",
+        "typer.core",
+        "typer",
+        "artisan_tools.app",
+    ]
+    assert [m["depth"] for m in modules] == [1, 2, 1, 0]
+    assert modules[-1]["self"] == 0.001
+    assert modules[-1]["cumulative"] == 0.0014
+
+
+def test_profile_startup(app_with_config):
+    profile = profile_startup(["version", "get"])
+    assert profile["returncode"] == 0
+    assert profile["stdout"] == "0.99.9"
+    assert "artisan_tools.version" in profile["extensions"]
+    assert 0 < profile["imports"] < profile["wall"]
+    assert any(m["name"] == "artisan_tools.app" for m in profile["modules"])
+    # Only imported by the asynchronous APIs:
+    assert not any(m["name"] == "asyncio" for m in profile["modules"])
+    assert profile["stderr"] == ""
+
+    # Errors of the command are kept, the profiling output is removed:
+    profile = profile_startup(["no-such-command"])
+    assert profile["returncode"] == 2
+    assert "No such command" in profile["stderr"]
+    assert "import time:" not in profile["stderr"]
+
+    report = format_profile(profile, top=5)
+    assert "artisan_tools.version" in report
+    assert "Slowest imports" in report
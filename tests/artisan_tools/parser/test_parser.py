@@ -1,4 +1,5 @@
 from artisan_tools.parser.api import parse
+from artisan_tools.vcs.main import run_git_command
 
 
 def test_parse_replaces_version_tag(app_with_config):
@@ -25,3 +26,26 @@ def test_parse_empty_string(app_with_config):
 
     # Assert
     assert result == expected_output, "An empty string should return an empty string."
+
+
+def test_parse_replaces_latest_tag(app_with_repo):
+    app = app_with_repo
+    assert parse(app, "latest=@latest") == "latest="
+
+    run_git_command("tag v1.2.0")
+    run_git_command("tag v1.10.0")
+    assert parse(app, "latest=@latest") == "latest=1.10.0"
+
+
+def test_parse_contenthash(app_with_config, tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    context = tmp_path / "context"
+    context.mkdir()
+    (context / "Dockerfile").write_text("FROM alpine\n")
+
+    result = parse(app_with_config, "@contenthash-@version", context=str(context))
+
+    content_hash, version = result.split("-")
+    assert len(content_hash) == 16
+    assert version == "0.99.9"
+    assert parse(app_with_config, "@contenthash") != content_hash
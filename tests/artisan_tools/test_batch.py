@@ -0,0 +1,83 @@
+from typer.testing import CliRunner
+
+from artisan_tools.batch import read_steps, run_steps
+from artisan_tools.container import api as container_api
+
+runner = CliRunner()
+
+
+def test_read_steps():
+    lines = ["# Release", "version update --release", "", "  vcs add-tag 'v@version'"]
+    assert read_steps(lines) == [
+        ["version", "update", "--release"],
+        ["vcs", "add-tag", "v@version"],
+    ]
+
+
+def test_run(app_with_config):
+    app = app_with_config
+    result = runner.invoke(
+        app.cli,
+        ["run", "version bump 1.0.0", "version update --release", "version get"],
+        catch_exceptions=False,
+    )
+    assert result.exit_code == 0
+    assert "Version updated to 1.0.0" in result.output
+    assert result.output.count(" ok ") == 3
+
+
+def test_run_batch_file(app_with_config, tmp_path):
+    batch = tmp_path / "release.txt"
+    batch.write_text("version bump 1.0.0\nversion update --release\n")
+    result = runner.invoke(
+        app_with_config.cli, ["run", "--batch", str(batch)], catch_exceptions=False
+    )
+    assert result.exit_code == 0
+    assert app_with_config.get_extension("version").get_version(app_with_config) == (
+        "1.0.0"
+    )
+
+
+def test_run_steps_failure(app_with_config):
+    steps = [["version", "bump", "invalid"], ["version", "get"], ["run"]]
+    results = run_steps(app_with_config, steps)
+    assert [code for _, code, _ in results] == [1, None, None]
+
+    results = run_steps(app_with_config, steps, keep_going=True)
+    assert [code for _, code, _ in results] == [1, 0, 2]
+
+    result = runner.invoke(app_with_config.cli, ["run", "version bump invalid"])
+    assert result.exit_code == 1
+    assert "failed" in result.output
+
+
+def test_shared_registry_login(app_with_config, mocker):
+    login = mocker.patch.object(container_api, "login", return_value=True)
+    logout = mocker.patch.object(container_api, "logout")
+    app = app_with_config
+
+    with container_api.keep_login(app):
+        with container_api.authorized_registry(app):
+            pass
+        with container_api.authorized_registry(app):
+            pass
+        assert logout.call_count == 0
+    assert login.call_count == 1
+    assert logout.call_count == 1
+
+    # No login without commands needing the registry:
+    with container_api.keep_login(app):
+        pass
+    assert login.call_count == 1
+
+
+def test_run_steps_registry_login(app_with_config, mocker):
+    login = mocker.patch.object(container_api, "login", return_value=True)
+    logout = mocker.patch.object(container_api, "logout")
+    steps = [["container", "command", "true"], ["container", "command", "true"]]
+
+    results = run_steps(app_with_config, steps)
+
+    assert [code for _, code, _ in results] == [0, 0]
+    assert login.call_count == 1
+    assert logout.call_count == 1
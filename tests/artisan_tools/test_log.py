@@ -0,0 +1,60 @@
+import json
+import logging
+
+import pytest
+
+from artisan_tools.log import setup_root_handler, get_logger
+
+
+@pytest.fixture
+def restore_logging():
+    """
+    Restore the logging setup of the test session.
+    """
+    yield
+    setup_root_handler(level="debug")
+
+
+def artisan_handlers():
+    return [h for h in logging.getLogger().handlers if getattr(h, "artisan", False)]
+
+
+def test_json_format(restore_logging, capsys):
+    setup_root_handler(level="info", format="json")
+    get_logger("test").info("Hello %s", "world")
+    get_logger("test").debug("Not emitted")
+
+    lines = capsys.readouterr().err.splitlines()
+    assert len(lines) == 1
+    entry = json.loads(lines[0])
+    assert entry["level"] == "info"
+    assert entry["logger"] == "test"
+    assert entry["event"] == "Hello world"
+
+
+def test_plain_format(restore_logging, capsys):
+    setup_root_handler(level="warning", format="plain")
+    get_logger("test").warning("Careful")
+    assert capsys.readouterr().err.endswith("[WARNING] test: Careful\n")
+
+
+def test_console_format_is_lazy(restore_logging, capsys):
+    setup_root_handler(level="warning", format="console")
+    (handler,) = artisan_handlers()
+    get_logger("test").info("Not emitted")
+    assert handler.formatter._formatter is None
+
+    get_logger("test").warning("Emitted")
+    assert handler.formatter._formatter is not None
+    assert "Emitted" in capsys.readouterr().err
+
+
+def test_setup_replaces_handler(restore_logging):
+    setup_root_handler(level="info")
+    setup_root_handler(level="info", format="json")
+    assert len(artisan_handlers()) == 1
+
+
+def test_invalid_format(restore_logging):
+    with pytest.raises(ValueError):
+        setup_root_handler(format="xml")
@@ -0,0 +1,81 @@
+import pytest
+from typer.testing import CliRunner
+
+from artisan_tools import metrics
+
+
+@pytest.fixture(autouse=True)
+def clear_metrics():
+    metrics.clear()
+    yield
+    metrics.clear()
+
+
+def test_counter():
+    pushes = metrics.counter("test_pushes", "Pushed images.", ["registry"])
+    pushes.inc(registry="ghcr.io")
+    pushes.inc(2, registry="ghcr.io")
+    pushes.inc(registry='my "registry"')
+    assert pushes.get(registry="ghcr.io") == 3
+    assert metrics.counter("test_pushes", "Pushed images.", ["registry"]) is pushes
+
+    with pytest.raises(ValueError):
+        pushes.inc(repository="image")
+    with pytest.raises(ValueError):
+        metrics.histogram("test_pushes", "Pushed images.", ["registry"])
+
+    text = metrics.render()
+    assert "# TYPE test_pushes_total counter" in text
+    assert 'test_pushes_total{registry="ghcr.io"} 3' in text
+    assert 'test_pushes_total{registry="my \\"registry\\""} 1' in text
+
+    text = metrics.render("openmetrics")
+    assert "# TYPE test_pushes counter" in text
+    assert text.endswith("# EOF\n")
+
+
+def test_histogram():
+    seconds = metrics.histogram("test_seconds", "Durations.", buckets=[1, 0.1])
+    seconds.observe(0.05)
+    seconds.observe(0.5)
+    seconds.observe(5)
+    with seconds.time():
+        pass
+    assert seconds.count() == 4
+
+    lines = metrics.render().splitlines()
+    assert 'test_seconds_bucket{le="0.1"} 2' in lines
+    assert 'test_seconds_bucket{le="1.0"} 3' in lines
+    assert 'test_seconds_bucket{le="+Inf"} 4' in lines
+    assert "test_seconds_count 4" in lines
+
+
+def test_clear_and_write(tmp_path):
+    metrics.counter("test_writes", "Writes.").inc()
+    metrics.clear()
+    assert "test_writes" not in metrics.render()
+
+    metrics.counter("test_writes", "Writes.").inc()
+    metrics.write(tmp_path / "artisan.prom")
+    assert "test_writes_total 1" in (tmp_path / "artisan.prom").read_text()
+    assert [path.name for path in tmp_path.iterdir()] == ["artisan.prom"]
+
+    with pytest.raises(ValueError):
+        metrics.write(tmp_path / "artisan.json", "json")
+
+
+def test_cli_metrics_file(app_with_config, tmp_path):
+    app = app_with_config
+    path = tmp_path / "artisan.prom"
+    result = CliRunner().invoke(
+        app.cli,
+        ["--metrics-file", str(path), "version", "bump", "patch"],
+        catch_exceptions=False,
+    )
+    assert result.exit_code == 0
+    assert 'artisan_version_bumps_total{part="patch"} 1' in path.read_text()
+
+    result = CliRunner().invoke(
+        app.cli, ["--metrics-format", "xml", "version", "get"], catch_exceptions=False
+    )
+    assert result.exit_code != 0
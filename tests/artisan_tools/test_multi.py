@@ -0,0 +1,87 @@
+import json
+
+from typer.testing import CliRunner
+
+from artisan_tools.multi import find_repositories, run_repositories
+
+runner = CliRunner()
+
+
+def make_repositories(tmp_path):
+    for name, version in [("a", "1.0.0"), ("b", "2.0.0"), ("c", "invalid")]:
+        repo = tmp_path / "repos" / name
+        repo.mkdir(parents=True)
+        (repo / "artisan.yaml").write_text("")
+        (repo / "VERSION").write_text(version)
+        (repo / "RELEASE").write_text(version)
+    # Not a repository root:
+    (tmp_path / "repos" / "d").mkdir()
+    return tmp_path / "repos"
+
+
+def test_find_repositories(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    repos = make_repositories(tmp_path)
+    (tmp_path / "repos.txt").write_text("# Services\nrepos/b\n\nrepos/a\n")
+
+    assert find_repositories(["repos/*", "repos/a"]) == [
+        str(repos / name) for name in "abcd"
+    ]
+    assert find_repositories(["repos.txt", "missing/*"]) == [
+        str(repos / "b"),
+        str(repos / "a"),
+    ]
+
+
+def test_run_repositories(tmp_path):
+    repos = make_repositories(tmp_path)
+    paths = [str(repos / name) for name in "abcd"]
+
+    a, b, c, d = run_repositories(
+        paths, [["version", "get"], ["version", "verify"]], jobs=2
+    )
+    assert (a["exit_code"], a["error"]) == (0, None)
+    assert a["stdout"].startswith("1.0.0")
+    assert b["stdout"].startswith("2.0.0")
+    assert c["exit_code"] != 0
+    assert d["exit_code"] == 1
+    assert d["error"].startswith("FileNotFoundError")
+
+
+def test_run_repositories_isolated(tmp_path):
+    repos = make_repositories(tmp_path)
+    paths = [str(repos / name) for name in "ab"]
+    # Local extensions with the same name, which must not be shared:
+    for name in "ab":
+        (repos / name / "artisan.yaml").write_text("extensions: [local_ext]\n")
+        (repos / name / "local_ext.py").write_text(f"""
+def setup(app):
+    def whoami():
+        print("{name}")
+
+    app.add_command(whoami, name="whoami")
+""")
+
+    a, b = run_repositories(paths, [["whoami"]], jobs=1)
+    assert (a["exit_code"], a["stdout"]) == (0, "a\n")
+    assert (b["exit_code"], b["stdout"]) == (0, "b\n")
+
+
+def test_cli_multi(app_with_config, tmp_path):
+    make_repositories(tmp_path)
+    result = runner.invoke(
+        app_with_config.cli,
+        ["multi", "version verify", "--repos", "repos/[ab]", "--format", "json"],
+        catch_exceptions=False,
+    )
+    assert result.exit_code == 0, result.output
+    results = json.loads(result.stdout)
+    assert [r["exit_code"] for r in results] == [0, 0]
+
+    result = runner.invoke(
+        app_with_config.cli,
+        ["multi", "version verify", "--repos", "repos/*", "-j", "4"],
+        catch_exceptions=False,
+    )
+    assert result.exit_code == 1
+    assert "Failed in 2 of 4 repositories: repos/c repos/d" in result.output
@@ -0,0 +1,95 @@
+import json
+import subprocess
+
+import pytest
+from typer.testing import CliRunner
+
+from artisan_tools import trace
+
+
+@pytest.fixture(autouse=True)
+def clear_spans():
+    trace.clear()
+    trace.enable()
+    yield
+    trace.enable(False)
+    trace.clear()
+
+
+def test_command_name():
+    assert trace.command_name("git -c safe.directory=* ls-remote --tags") == (
+        "git ls-remote"
+    )
+    assert trace.command_name(["/usr/bin/docker", "buildx", "build"]) == (
+        "docker buildx"
+    )
+    assert trace.command_name(["podman", "--log-level", "debug", "push"]) == (
+        "podman push"
+    )
+
+
+def test_run_records_span(tmp_path):
+    with trace.span("at test") as attributes:
+        attributes["extra"] = 1
+        trace.run(["echo", "hello"], capture_output=True, cwd=tmp_path)
+        with pytest.raises(subprocess.CalledProcessError):
+            trace.check_output("exit 3", shell=True)
+
+    echo, failed, parent = trace.get_spans()
+    assert echo["name"] == "echo hello"
+    assert echo["attributes"]["cwd"] == str(tmp_path)
+    assert echo["attributes"]["exit_code"] == 0
+    assert echo["attributes"]["output_bytes"] == 6
+    assert failed["attributes"]["exit_code"] == 3
+    assert failed["attributes"]["error"] == "CalledProcessError"
+    assert echo["parent"] == failed["parent"] == parent["id"]
+    assert parent["attributes"] == {"extra": 1}
+    assert parent["duration"] >= echo["duration"] > 0
+
+    summary = trace.summary()
+    assert summary["at test"]["echo hello"]["count"] == 1
+
+
+def test_disabled():
+    trace.enable(False)
+    with trace.span("at test") as attributes:
+        trace.run(["true"])
+        trace.add_span("step", 0, 1)
+    assert attributes == {}
+    assert trace.get_spans() == []
+
+
+def test_export(tmp_path):
+    with trace.span("at test"):
+        trace.run(["true"])
+
+    trace.export(tmp_path / "trace.json")
+    chrome = json.loads((tmp_path / "trace.json").read_text())
+    assert [event["name"] for event in chrome["traceEvents"]] == ["true", "at test"]
+    assert chrome["traceEvents"][0]["ph"] == "X"
+
+    trace.export(tmp_path / "otel.json", "otel")
+    otel = json.loads((tmp_path / "otel.json").read_text())
+    child, parent = otel["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    assert child["parentSpanId"] == parent["spanId"]
+    assert child["traceId"] == parent["traceId"]
+    assert "parentSpanId" not in parent
+
+    with pytest.raises(ValueError):
+        trace.export(tmp_path / "trace.xml", "xml")
+
+
+def test_cli_trace(app_with_repo, tmp_path):
+    app = app_with_repo
+    result = CliRunner().invoke(
+        app.cli,
+        ["--trace", str(tmp_path / "trace.json"), "version", "update"],
+        catch_exceptions=False,
+    )
+    assert result.exit_code == 0
+
+    events = json.loads((tmp_path / "trace.json").read_text())["traceEvents"]
+    assert events[-1]["name"] == "at version update"
+    assert {"git branch", "git rev-parse", "git status"} <= {
+        event["name"] for event in events
+    }
@@ -0,0 +1,86 @@
+import pytest
+from typer.testing import CliRunner
+
+from artisan_tools.vcs.cli import factory
+from artisan_tools.vcs.main import run_git_command
+from artisan_tools.vcs.release_index import ReleaseIndex, released_in
+
+GIT_USER = "-c user.name=at -c user.email=at@at.com"
+
+
+@pytest.fixture
+def repo(tmp_path, monkeypatch):
+    """
+    Repository with releases on master and a maintenance branch.
+    """
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "artisan.yaml").write_text("")
+    run_git_command("init -b master")
+    commits = {}
+
+    def commit(name, tag=None):
+        run_git_command(f"{GIT_USER} commit --allow-empty -qm {name}")
+        commits[name] = run_git_command("rev-parse HEAD")
+        if tag:
+            run_git_command(f"{GIT_USER} tag -a {tag} -m {tag}")
+
+    commit("c1")
+    commit("c2", "v1.0.0")
+    commit("c3")
+    commit("c4", "v1.1.0-rc.1")
+    commit("c5", "v1.1.0")
+    commit("c6")
+    commits["commit"] = commit
+    return commits
+
+
+def test_released_in(repo):
+    with ReleaseIndex() as index:
+        assert index.update() == 2
+        assert index.released_in(repo["c1"]) == "v1.0.0"
+        assert index.released_in(repo["c2"][:7]) == "v1.0.0"
+        assert index.released_in(repo["c4"]) == "v1.1.0"
+        assert index.released_in(repo["c6"]) is None
+        with pytest.raises(ValueError):
+            index.released_in("no-such-commit")
+        assert index.update() == 0
+
+    # New tag, added in place:
+    repo["commit"]("c7", "v1.2.0")
+    with ReleaseIndex() as index:
+        assert index.update() == 1
+        assert index.released_in(repo["c6"]) == "v1.2.0"
+
+    # Release from a maintenance branch, rebuilt:
+    run_git_command("checkout -q -b maintenance v1.0.0")
+    repo["commit"]("fix", "v1.0.1")
+    run_git_command("checkout -q master")
+    run_git_command(f"{GIT_USER} merge -q --no-edit maintenance")
+    repo["commit"]("c8", "v1.3.0")
+    with ReleaseIndex() as index:
+        assert index.update() == 5
+        assert index.released_in(repo["fix"]) == "v1.0.1"
+        assert index.released_in(repo["c8"]) == "v1.3.0"
+        assert index.released_in(repo["c3"]) == "v1.1.0"
+
+    # Prereleases:
+    assert released_in(repo["c4"], include_prerelease=True) == "v1.1.0-rc.1"
+    assert released_in(repo["c4"]) == "v1.1.0"
+
+
+def test_cli_released_in(repo, app):
+    runner = CliRunner()
+    result = runner.invoke(
+        factory(app), ["released-in", repo["c3"]], catch_exceptions=False
+    )
+    assert result.exit_code == 0
+    assert result.output == "v1.1.0\n"
+
+    result = runner.invoke(
+        factory(app), ["released-in", repo["c6"]], catch_exceptions=False
+    )
+    assert result.exit_code == 1
+    assert "is not in a release" in result.output
+
+    result = runner.invoke(factory(app), ["released-in", "nope"])
+    assert result.exit_code == 2
@@ -0,0 +1,44 @@
+import asyncio
+import subprocess
+
+import pytest
+
+from artisan_tools.vcs import aio
+from artisan_tools.vcs.main import get_commit_hash, get_remote_tags, run_git_command
+
+
+def test_get_status(setup_git_repos):
+    status = asyncio.run(aio.get_status())
+    assert status == {"branch": "master", "hash": get_commit_hash(), "clean": True}
+
+    with open("file.txt", "a") as f:
+        f.write("New line")
+    assert not asyncio.run(aio.check_clean())
+    assert asyncio.run(aio.get_commit_hash(short=False)) == get_commit_hash(False)
+
+
+def test_tags(setup_git_repos, app):
+    repo1, repo2 = setup_git_repos
+
+    async def main():
+        assert await aio.check_tag("v1.0.1")
+        await aio.add_and_push_tag(app.config["vcs"], "v1.0.2", "Another tag")
+        return await aio.get_remote_tags(cached=True, cwd=str(repo2))
+
+    assert sorted(asyncio.run(main())) == ["v1.0.1", "v1.0.2"]
+    # The cache is shared with the synchronous API:
+    run_git_command("tag v1.0.3", cwd=repo1)
+    assert "v1.0.3" not in get_remote_tags(cached=True)
+
+    with pytest.raises(subprocess.CalledProcessError) as error:
+        asyncio.run(aio.run_git_command("rev-parse no-such-revision"))
+    assert "no-such-revision" in error.value.output
+
+
+def test_map_repositories(setup_git_repos, tmp_path):
+    repo1, repo2 = setup_git_repos
+    paths = [str(repo1), str(repo2), str(tmp_path)]
+
+    results = asyncio.run(aio.map_repositories(aio.get_status, paths, limit=2))
+    assert results[str(repo1)]["branch"] == results[str(repo2)]["branch"] == "master"
+    assert isinstance(results[str(tmp_path)], subprocess.CalledProcessError)
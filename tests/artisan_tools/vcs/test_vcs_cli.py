@@ -59,3 +59,12 @@ def test_add_tag(setup_git_repos, app):
         ["git", "tag"], cwd=setup_git_repos[0], capture_output=True, text=True
     )
     assert "v1.0.0" in tags.stdout
+
+
+def test_prepare(setup_git_repos, app):
+    result = runner.invoke(factory(app), ["prepare"], catch_exceptions=False)
+    assert result.exit_code == 0, result.stdout
+    assert "Tag 'v1.0.1' is reachable, history deepened by 0 commits." in result.stdout
+
+    result = runner.invoke(factory(app), ["prepare"], catch_exceptions=False)
+    assert "Already prepared for the current commit." in result.stdout
@@ -1,10 +1,26 @@
+import os
+import subprocess
+
+import pytest
+
+from artisan_tools.app import App
 from artisan_tools.vcs.main import (
+    DIRTY_CHECKS,
+    disable_ssh_multiplexing,
+    enable_ssh_multiplexing,
+    git_env,
     run_git_command,
     check_tag,
     check_current_branch,
     add_and_push_tag,
     get_commit_hash,
     check_clean,
+    get_remote_tags,
+    get_last_tag,
+    iter_commit_messages,
+    get_status,
+    is_shallow,
+    prepare,
 )
 
 
@@ -46,3 +62,185 @@ def test_check_clean(setup_git_repos):
     with open("file.txt", "a") as f:
         f.write("New line")
     assert not check_clean()
+
+
+@pytest.mark.parametrize("strategy", DIRTY_CHECKS)
+def test_check_clean_strategies(setup_git_repos, strategy):
+    assert check_clean(strategy)
+
+    # Untracked files:
+    with open("new.txt", "w") as f:
+        f.write("New file")
+    assert not check_clean(strategy)
+    assert not check_clean(strategy, caches=True)
+    assert check_clean(strategy, untracked=False)
+    with open(".git/info/exclude", "a") as f:
+        f.write("new.txt\n")
+    assert check_clean(strategy)
+
+    # Touched but unchanged files are clean, changed files are not:
+    os.utime("file.txt", (0, 0))
+    assert check_clean(strategy)
+    with open("file.txt", "a") as f:
+        f.write("New line")
+    assert not check_clean(strategy, untracked=False)
+
+
+def test_check_clean_errors(tmp_path):
+    with pytest.raises(ValueError):
+        check_clean("fast")
+    # Not a repository:
+    with pytest.raises(subprocess.CalledProcessError):
+        check_clean(cwd=tmp_path)
+
+
+def test_get_remote_tags_with_slash(setup_git_repos):
+    run_git_command(
+        "-c user.name=at -c user.email=at@at.com tag -a pkg/v1.0.0 -m 'Annotated'",
+        cwd=setup_git_repos[0],
+    )
+    assert sorted(get_remote_tags()) == ["pkg/v1.0.0", "v1.0.1"]
+
+
+def test_iter_commit_messages(setup_git_repos):
+    run_git_command(
+        '-c user.name="at" -c user.email="at@at.com" '
+        "commit --allow-empty -m 'Second' -m 'Body'"
+    )
+    messages = list(iter_commit_messages("v1.0.1..HEAD"))
+    assert messages == ["Second\n\nBody\n"]
+
+
+def test_get_last_tag(setup_git_repos):
+    assert get_last_tag() == "v1.0.1"
+    assert get_last_tag("nomatch*") is None
+
+
+def test_get_remote_tags_cached(setup_git_repos, app):
+    assert get_remote_tags(cached=True) == ["v1.0.1"]
+    run_git_command("tag v1.0.2", cwd=setup_git_repos[0])
+    # Cached result is reused until cleared:
+    assert get_remote_tags(cached=True) == ["v1.0.1"]
+    assert sorted(get_remote_tags()) == ["v1.0.1", "v1.0.2"]
+    add_and_push_tag(app.config["vcs"], "v1.0.3", "Another tag")
+    assert sorted(get_remote_tags(cached=True)) == ["v1.0.1", "v1.0.2", "v1.0.3"]
+
+
+def test_get_status(setup_git_repos):
+    assert get_status() == {
+        "branch": "master",
+        "hash": get_commit_hash(),
+        "clean": True,
+    }
+    with open("file.txt", "a") as f:
+        f.write("New line")
+    assert not get_status()["clean"]
+    assert get_status(dirty_check={"strategy": "tracked"})["clean"] is False
+
+
+@pytest.fixture
+def shallow_clone(tmp_path, monkeypatch):
+    """
+    A depth 1 clone without tags of a repository with 30 commits.
+    """
+    upstream = tmp_path / "upstream"
+    upstream.mkdir()
+    run_git_command("init", cwd=upstream)
+    for i in range(1, 31):
+        run_git_command(
+            f"-c user.name=at -c user.email=at@at.com commit --allow-empty -qm '{i}'",
+            cwd=upstream,
+        )
+        if i in (5, 12):
+            run_git_command(f"tag v1.{i}.0", cwd=upstream)
+        if i == 20:
+            run_git_command("tag other", cwd=upstream)
+    clone = tmp_path / "clone"
+    run_git_command(f"clone -q --depth=1 --no-tags file://{upstream} {clone}")
+    monkeypatch.chdir(clone)
+    return clone
+
+
+def test_prepare(shallow_clone):
+    assert is_shallow()
+    assert get_last_tag() is None
+
+    result = prepare(step=4)
+    assert result == {"tag": "v1.12.0", "deepened": 4 + 8 + 16, "fetched": True}
+    assert get_last_tag() == "v1.12.0"
+    assert "other" not in run_git_command("tag")
+
+    # Recorded, nothing is fetched again:
+    assert prepare(step=4) == {**result, "fetched": False}
+
+    with pytest.raises(ValueError):
+        prepare(match="v*.*")
+
+
+def test_ssh_multiplexing(setup_git_repos, app, tmp_path, monkeypatch):
+    repo1, repo2 = setup_git_repos
+    # Stand-in for ssh running the remote command locally:
+    log = tmp_path / "ssh.log"
+    ssh = tmp_path / "ssh"
+    ssh.write_text(f"""#!/bin/sh
+echo "$*" >> {log}
+for command; do :; done
+case "$*" in *"-O exit"*) exit 0;; esac
+exec sh -c "$command"
+""")
+    ssh.chmod(0o755)
+    monkeypatch.setenv("GIT_SSH_COMMAND", str(ssh))
+    run_git_command(f"remote set-url origin localhost:{repo1}")
+
+    enable_ssh_multiplexing()
+    try:
+        assert check_tag("v1.0.1")
+        add_and_push_tag(app.config["vcs"], "v1.0.2", "Another tag")
+        calls = log.read_text().splitlines()
+        assert len(calls) == 2
+        assert all("-o ControlMaster=auto" in call for call in calls)
+        control_path = git_env()["GIT_SSH_COMMAND"].split("ControlPath=")[1]
+        control_dir = os.path.dirname(control_path.split()[0])
+        # A connection, as created by ssh:
+        open(os.path.join(control_dir, "connection"), "w").close()
+    finally:
+        disable_ssh_multiplexing()
+
+    assert log.read_text().splitlines()[-1].endswith("-O exit artisan")
+    assert not os.path.exists(control_dir)
+    assert git_env() is None
+
+
+def test_ssh_multiplexing_core_ssh_command(setup_git_repos, tmp_path, monkeypatch):
+    repo1, repo2 = setup_git_repos
+    log = tmp_path / "ssh.log"
+    ssh = tmp_path / "ssh"
+    ssh.write_text(f"""#!/bin/sh
+echo "$*" >> {log}
+for command; do :; done
+exec sh -c "$command"
+""")
+    ssh.chmod(0o755)
+    monkeypatch.delenv("GIT_SSH_COMMAND", raising=False)
+    monkeypatch.setenv("GIT_SSH", "/no/such/ssh")
+    run_git_command(f"config core.sshCommand '{ssh} -o User=deploy'")
+    run_git_command(f"remote set-url origin localhost:{repo1}")
+
+    enable_ssh_multiplexing()
+    try:
+        assert check_tag("v1.0.1")
+    finally:
+        disable_ssh_multiplexing()
+
+    call = log.read_text().splitlines()[0]
+    assert call.startswith("-o User=deploy -o ControlMaster=auto")
+
+
+def test_app_cleanup_ssh_multiplexing(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "artisan.yaml").write_text("vcs:\n  ssh-multiplex: true\n")
+    app = App()
+    app.load_extensions()
+    assert "ControlMaster" in git_env()["GIT_SSH_COMMAND"]
+    app.close()
+    assert git_env() is None
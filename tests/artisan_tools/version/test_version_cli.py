@@ -1,5 +1,7 @@
 from typer.testing import CliRunner
 
+from artisan_tools.vcs.main import run_git_command
+
 from artisan_tools.version.cli import (
     factory,
 )
@@ -27,3 +29,27 @@ def test_get(tmpdir, app_with_config):
     assert result.exit_code == 0
     version = app.get_extension("version").get_version(app)
     assert result.output == version
+
+
+def test_latest_and_list(app_with_repo):
+    app = app_with_repo
+    for tag in ["v1.0.0", "v1.2.0", "v2.0.0-rc.1"]:
+        run_git_command(f"tag {tag}")
+
+    result = runner.invoke(factory(app), ["latest"], catch_exceptions=False)
+    assert result.exit_code == 0
+    assert result.output == "1.2.0"
+
+    result = runner.invoke(
+        factory(app), ["latest", "--prerelease"], catch_exceptions=False
+    )
+    assert result.output == "2.0.0-rc.1"
+
+    result = runner.invoke(
+        factory(app), ["latest", "--range", "3.x"], catch_exceptions=False
+    )
+    assert result.exit_code == 1
+
+    result = runner.invoke(factory(app), ["list"], catch_exceptions=False)
+    assert result.exit_code == 0
+    assert result.output.split() == ["1.0.0", "1.2.0", "2.0.0-rc.1"]
@@ -0,0 +1,81 @@
+import pytest
+
+from artisan_tools.version import commits
+from artisan_tools.version.api import bump
+from artisan_tools.vcs.main import run_git_command
+
+
+def commit(message):
+    """
+    Add an empty commit with message.
+    """
+    run_git_command(
+        '-c user.name="at" -c user.email="at@at.com" '
+        f"commit --allow-empty -m '{message}'"
+    )
+
+
+@pytest.mark.parametrize(
+    "message, level",
+    [
+        ("feat: add feature", "minor"),
+        ("feat(parser)!: drop support", "major"),
+        ("fix: a bug\n\nBREAKING CHANGE: it was used", "major"),
+        ("Fix(vcs): a bug", "patch"),
+        ("perf: faster", "patch"),
+        ("docs: update", None),
+        ("Update readme", None),
+    ],
+)
+def test_bump_level(message, level):
+    assert commits.bump_level(message) == level
+
+
+def test_scan_stops_at_major():
+    def messages():
+        yield "feat: first"
+        yield "feat!: second"
+        raise AssertionError("Scan should stop at breaking change")
+
+    assert commits.scan(messages()) == "major"
+
+
+def test_bump_auto(app_with_repo):
+    run_git_command("tag v0.99.9")
+    commit("fix: a bug")
+    commit("feat: a feature")
+    commit("chore: cleanup")
+
+    assert bump(app_with_repo, "auto") == "0.100.0"
+
+
+def test_bump_auto_no_release_commits(app_with_repo):
+    run_git_command("tag v0.99.9")
+    commit("docs: update")
+
+    assert bump(app_with_repo, "auto") == "0.99.10"
+
+
+def test_infer_bump_cache_scans_new_commits_only(app_with_repo, monkeypatch):
+    run_git_command("tag v0.99.9")
+    commit("fix: a bug")
+    assert commits.infer_bump(app_with_repo, since="v0.99.9") == "patch"
+
+    scanned = []
+    vcs = app_with_repo.get_extension("vcs")
+    iter_commit_messages = vcs.iter_commit_messages
+
+    def tracking_iter(*args, **kwargs):
+        for message in iter_commit_messages(*args, **kwargs):
+            scanned.append(message)
+            yield message
+
+    monkeypatch.setattr(vcs, "iter_commit_messages", tracking_iter)
+
+    # Nothing new, result is taken from the cache:
+    assert commits.infer_bump(app_with_repo, since="v0.99.9") == "patch"
+    assert scanned == []
+
+    commit("feat: a feature")
+    assert commits.infer_bump(app_with_repo, since="v0.99.9") == "minor"
+    assert [message.strip() for message in scanned] == ["feat: a feature"]
@@ -0,0 +1,143 @@
+import importlib.metadata
+import pytest
+
+from artisan_tools.version import main
+from artisan_tools.version.api import bump
+from artisan_tools.version.hooks import (
+    replace_in_package_json,
+    replace_in_cargo_toml,
+    replace_in_chart_yaml,
+    replace_in_pom_xml,
+)
+
+
+# --- package.json -------------------------------------------------------------
+def test_replace_in_package_json(tmpdir):
+    package_json = tmpdir.join("package.json")
+    content = (
+        '{\n  "name": "pkg",\n  "dependencies": {"version": "1.0.0"},\n'
+        '  "files": ["version"],\n  "version": "1.0.0"\n}\n'
+    )
+    package_json.write(content)
+
+    replace_in_package_json(str(package_json), "2.0.0")
+
+    assert package_json.read() == content.replace(
+        '"version": "1.0.0"\n', '"version": "2.0.0"\n'
+    )
+
+
+def test_replace_in_package_json_not_found(tmpdir):
+    package_json = tmpdir.join("package.json")
+    package_json.write('{"name": "pkg", "dependencies": {"version": "1.0.0"}}')
+
+    with pytest.raises(ValueError, match="not found"):
+        replace_in_package_json(str(package_json), "2.0.0")
+
+
+# --- Cargo.toml ---------------------------------------------------------------
+def test_replace_in_cargo_toml(tmpdir):
+    cargo_toml = tmpdir.join("Cargo.toml")
+    content = (
+        '[package]\nname = "crate"\nversion = "1.0.0"\n\n'
+        '[dependencies]\nserde = { version = "1.0.0" }\n'
+    )
+    cargo_toml.write(content)
+
+    replace_in_cargo_toml(str(cargo_toml), "2.0.0")
+
+    assert cargo_toml.read() == content.replace(
+        'version = "1.0.0"\n', 'version = "2.0.0"\n'
+    )
+
+
+def test_replace_in_cargo_toml_workspace(tmpdir):
+    cargo_toml = tmpdir.join("Cargo.toml")
+    cargo_toml.write(
+        '[package]\nname = "crate"\nversion.workspace = true\n\n'
+        '[workspace.package]\nversion = "1.0.0"\n'
+    )
+
+    replace_in_cargo_toml(str(cargo_toml), "2.0.0")
+
+    assert cargo_toml.read().endswith('[workspace.package]\nversion = "2.0.0"\n')
+
+
+# --- Chart.yaml ---------------------------------------------------------------
+def test_replace_in_chart_yaml(tmpdir):
+    chart_yaml = tmpdir.join("Chart.yaml")
+    content = (
+        'apiVersion: v2\nversion: 1.0.0 # chart\nappVersion: "1.0.0"\n'
+        "dependencies:\n  - name: dep\n    version: 1.0.0\n"
+    )
+    chart_yaml.write(content)
+
+    replace_in_chart_yaml(str(chart_yaml), "2.0.0", keys=["version", "appVersion"])
+
+    assert chart_yaml.read() == (
+        'apiVersion: v2\nversion: 2.0.0 # chart\nappVersion: "2.0.0"\n'
+        "dependencies:\n  - name: dep\n    version: 1.0.0\n"
+    )
+
+
+# --- pom.xml ------------------------------------------------------------------
+def test_replace_in_pom_xml(tmpdir):
+    pom_xml = tmpdir.join("pom.xml")
+    content = (
+        '<?xml version="1.0"?>\n<project>\n'
+        "  <parent><version>0.1.0</version></parent>\n"
+        "  <!-- <version>0.0.1</version> -->\n"
+        "  <artifactId>app</artifactId>\n  <version>1.0.0</version>\n"
+        "  <dependencies><dependency><version>1.0.0</version></dependency>"
+        "</dependencies>\n</project>\n"
+    )
+    pom_xml.write(content)
+
+    replace_in_pom_xml(str(pom_xml), "2.0.0")
+
+    assert pom_xml.read() == content.replace(
+        "  <version>1.0.0</version>", "  <version>2.0.0</version>"
+    )
+
+
+# --- Registry -----------------------------------------------------------------
+def test_run_hook_registered(tmpdir):
+    calls = []
+
+    main.run_hook(
+        {"method": "custom", "option": 1},
+        new_version="1.0.0",
+        registered={"custom": lambda **kwargs: calls.append(kwargs)},
+    )
+
+    assert calls == [{"new_version": "1.0.0", "option": 1}]
+
+
+def test_run_hook_does_not_modify_hook():
+    hook = {"method": "custom"}
+    main.run_hook(hook, new_version="1.0.0", registered={"custom": lambda **_: None})
+    assert hook == {"method": "custom"}
+
+
+def test_run_hook_entry_point(monkeypatch):
+    entry_point = importlib.metadata.EntryPoint(
+        name="fake", value="fake_extension:test_function", group="artisan_tools.hooks"
+    )
+    monkeypatch.setattr(main, "_entry_point_hooks", lambda: {"fake": entry_point})
+
+    main.run_hook({"method": "fake"}, new_version="1.0.0")
+
+
+def test_run_hook_unknown_method():
+    with pytest.raises(ValueError, match="Invalid hook method"):
+        main.run_hook({"method": "does-not-exist"}, new_version="1.0.0")
+
+
+def test_bump_with_app_registered_hook(app_with_config):
+    calls = []
+    app_with_config.register_hook("custom", lambda **kwargs: calls.append(kwargs))
+    app_with_config.config["version"]["bump-hooks"] = [{"method": "custom"}]
+
+    bump(app_with_config, "patch")
+
+    assert calls == [{"new_version": "0.99.10"}]
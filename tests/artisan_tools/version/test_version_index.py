@@ -0,0 +1,113 @@
+import pytest
+
+from artisan_tools.version.index import VersionIndex, parse_range
+
+TAGS = [
+    "v1.0.0",
+    "v1.2.0",
+    "v1.10.0",
+    "v1.10.1-rc.1",
+    "v2.0.0-alpha",
+    "v0.9.0",
+    "latest",
+    "pkg/v3.0.0",
+    "vnot-a-version",
+]
+
+
+@pytest.fixture
+def index():
+    return VersionIndex(TAGS)
+
+
+def test_versions_sorted(index):
+    assert index.versions() == [
+        "0.9.0",
+        "1.0.0",
+        "1.2.0",
+        "1.10.0",
+        "1.10.1-rc.1",
+        "2.0.0-alpha",
+    ]
+    assert index.versions(include_prerelease=False) == [
+        "0.9.0",
+        "1.0.0",
+        "1.2.0",
+        "1.10.0",
+    ]
+    assert len(index) == 6
+
+
+def test_latest(index):
+    assert index.latest() == "1.10.0"
+    assert index.latest(include_prerelease=True) == "2.0.0-alpha"
+    assert VersionIndex([]).latest() is None
+
+
+@pytest.mark.parametrize(
+    "spec,expected",
+    [
+        ("1.x", "1.10.0"),
+        ("1", "1.10.0"),
+        ("1.2.*", "1.2.0"),
+        ("1.2.0", "1.2.0"),
+        ("1.3.0", None),
+        ("0.x", "0.9.0"),
+        ("3.x", None),
+        (">=1.0.0,<1.10.0", "1.2.0"),
+        ("<=1.2.0", "1.2.0"),
+        (">1.10.0", None),
+        (">= 0.1", "1.10.0"),
+        ("==1.0.0", "1.0.0"),
+    ],
+)
+def test_latest_in_range(index, spec, expected):
+    assert index.latest_in_range(spec) == expected
+
+
+def test_latest_in_range_prerelease(index):
+    assert index.latest_in_range("1.x", include_prerelease=True) == "1.10.1-rc.1"
+    assert index.latest_in_range("<2", include_prerelease=True) == "1.10.1-rc.1"
+
+
+def test_parse_range_invalid():
+    with pytest.raises(ValueError):
+        parse_range("~1.2")
+    with pytest.raises(ValueError):
+        parse_range("1.a")
+
+
+def test_contains_and_tag(index):
+    assert "1.2.0" in index
+    assert "1.3.0" not in index
+    assert "invalid" not in index
+    assert index.tag("1.2.0") == "v1.2.0"
+    with pytest.raises(KeyError):
+        index.tag("1.3.0")
+
+
+def test_prefix_suffix():
+    index = VersionIndex(
+        ["pkg/v1.0.0-linux", "pkg/v1.1.0-linux", "v2.0.0"], "pkg/v", "-linux"
+    )
+    assert index.versions() == ["1.0.0", "1.1.0"]
+    assert index.tag("1.1.0") == "pkg/v1.1.0-linux"
+
+
+def test_tag_build_metadata():
+    index = VersionIndex(["v1.0.0+b2", "v1.0.0+b1", "v1.0.0"])
+    assert index.tag("1.0.0+b1") == "v1.0.0+b1"
+    assert index.tag("1.0.0+b2") == "v1.0.0+b2"
+    assert index.tag("1.0.0") == "v1.0.0"
+    with pytest.raises(KeyError):
+        index.tag("1.0.0+b3")
+
+
+def test_next_available(index):
+    assert index.next_available("patch") == "1.10.1"
+    assert index.next_available("minor") == "1.11.0"
+    assert index.next_available("major") == "2.0.0"
+    assert index.next_available("minor", base="1.0.0") == "1.1.0"
+    taken = VersionIndex(["v1.0.0", "v1.0.1", "v1.0.2"])
+    assert taken.next_available("patch", base="1.0.0") == "1.0.3"
+    assert VersionIndex([]).next_available("minor") == "0.1.0"
@@ -170,3 +170,50 @@ def test_run_hook_pyproject_replace(tmpdir):
 
     # Check if the version is updated
     assert 'version = "2.0.0"' in updated_content
+
+
+def test_replace_in_pyproject_only_project_table(tmpdir):
+    pyproject_file = tmpdir.join("pyproject.toml")
+    content = (
+        '[project]\nname = "my-package"\nversion = "1.0.0"  # keep\n\n'
+        '[tool.something]\nversion = "1.0.0"\n'
+    )
+    pyproject_file.write(content)
+
+    replace_in_pyproject(str(pyproject_file), "2.0.0")
+
+    assert pyproject_file.read() == content.replace('"1.0.0"  #', '"2.0.0"  #')
+
+
+def test_replace_in_pyproject_not_found(tmpdir):
+    pyproject_file = tmpdir.join("pyproject.toml")
+    pyproject_file.write('[tool.something]\nversion = "1.0.0"\n')
+
+    with pytest.raises(ValueError, match="Version not found"):
+        replace_in_pyproject(str(pyproject_file), "2.0.0")
+
+
+def test_replace_in_pyproject_dynamic_file(tmpdir):
+    pyproject_file = tmpdir.join("pyproject.toml")
+    pyproject_file.write(
+        '[project]\nname = "my-package"\ndynamic = ["version"]\n\n'
+        '[tool.setuptools.dynamic]\nversion = {file = "VERSION"}\n'
+    )
+    tmpdir.join("VERSION").write("1.0.0\n")
+
+    replace_in_pyproject(str(pyproject_file), "2.0.0")
+
+    assert tmpdir.join("VERSION").read() == "2.0.0\n"
+
+
+def test_replace_in_pyproject_dynamic_hatch(tmpdir):
+    pyproject_file = tmpdir.join("pyproject.toml")
+    pyproject_file.write(
+        '[project]\nname = "my-package"\ndynamic = [\n  "version",\n]\n\n'
+        '[tool.hatch.version]\npath = "about.py"\n'
+    )
+    tmpdir.join("about.py").write('__version__ = "1.0.0"\n')
+
+    replace_in_pyproject(str(pyproject_file), "2.0.0")
+
+    assert tmpdir.join("about.py").read() == '__version__ = "2.0.0"\n'
@@ -0,0 +1,60 @@
+import pytest
+
+from artisan_tools.version.semantic import parse, is_valid, sort_key, Version
+
+
+def test_parse():
+    version = parse("1.2.3-rc.1+build.4")
+    assert (version.major, version.minor, version.patch) == (1, 2, 3)
+    assert version.prerelease == "rc.1"
+    assert version.build == "build.4"
+    assert str(version) == "1.2.3-rc.1+build.4"
+    assert not version.is_release
+
+
+@pytest.mark.parametrize("version", ["1.2", "01.2.3", "1.2.3-", "v1.2.3", "1.2.3 "])
+def test_parse_invalid(version):
+    assert not is_valid(version)
+    with pytest.raises(ValueError, match="not a valid semantic version"):
+        parse(version)
+
+
+def test_is_valid_release():
+    assert is_valid("1.2.3", release=True)
+    assert not is_valid("1.2.3-rc1", release=True)
+    assert not is_valid("1.2.3+build", release=True)
+    assert is_valid("1.2.3+build")
+
+
+def test_precedence():
+    # Example from https://semver.org:
+    ordered = [
+        "1.0.0-alpha",
+        "1.0.0-alpha.1",
+        "1.0.0-alpha.beta",
+        "1.0.0-beta",
+        "1.0.0-beta.2",
+        "1.0.0-beta.11",
+        "1.0.0-rc.1",
+        "1.0.0",
+        "1.0.1",
+        "1.10.0",
+        "2.0.0",
+    ]
+    assert sorted(reversed(ordered), key=sort_key) == ordered
+
+
+def test_build_is_ignored_in_comparison():
+    assert parse("1.0.0+a") == parse("1.0.0+b")
+    assert not parse("1.0.0+a") < parse("1.0.0")
+
+
+@pytest.mark.parametrize(
+    "part, expected", [("major", "2.0.0"), ("minor", "1.3.0"), ("patch", "1.2.4")]
+)
+def test_bump(part, expected):
+    assert str(parse("1.2.3-rc1+build").bump(part)) == expected
+
+
+def test_to_semver():
+    assert str(Version(1, 2, 3, "rc1").to_semver()) == "1.2.3-rc1"
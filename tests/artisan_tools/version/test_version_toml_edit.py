@@ -0,0 +1,107 @@
+import pytest
+
+from artisan_tools.version.toml_edit import (
+    iter_entries,
+    find_value,
+    get_string,
+    replace_string,
+)
+
+DOCUMENT = """\
+# Top comment
+name = "root"
+
+[project]
+name = "my-package"  # trailing comment
+version = "1.0.0"
+dependencies = [
+  "semver",  # comment in array
+  ["nested"],
+]
+description = \"\"\"
+[not.a.table]
+version = "0.0.0"
+\"\"\"
+
+[project.urls]
+home = 'https://example.com'
+
+[[tool.items]]
+version = "3.0.0"
+
+[tool.poetry]
+"version" = '2.0.0'
+
+[tool.other]
+version = "9.9.9"
+"""
+
+
+def test_iter_entries_paths():
+    paths = [path for path, _, _ in iter_entries(DOCUMENT)]
+    assert paths == [
+        ("name",),
+        ("project", "name"),
+        ("project", "version"),
+        ("project", "dependencies"),
+        ("project", "description"),
+        ("project", "urls", "home"),
+        ("tool", "items", "[]", "version"),
+        ("tool", "poetry", "version"),
+        ("tool", "other", "version"),
+    ]
+
+
+def test_find_value_excludes_comments():
+    start, end = find_value(DOCUMENT, "project.name")
+    assert DOCUMENT[start:end] == '"my-package"'
+
+
+def test_find_value_multiline_array():
+    start, end = find_value(DOCUMENT, "project.dependencies")
+    assert DOCUMENT[start:end].startswith("[")
+    assert DOCUMENT[start:end].endswith("]")
+
+
+def test_find_value_not_found():
+    assert find_value(DOCUMENT, "project.missing") is None
+
+
+def test_get_string():
+    assert get_string(DOCUMENT, "project.version") == "1.0.0"
+    assert get_string(DOCUMENT, "tool.poetry.version") == "2.0.0"
+    assert get_string(DOCUMENT, "project.urls.home") == "https://example.com"
+
+
+def test_get_string_not_a_string():
+    with pytest.raises(ValueError, match="not a string"):
+        get_string(DOCUMENT, "project.dependencies")
+
+
+def test_replace_string_only_touches_value():
+    result = replace_string(DOCUMENT, "tool.poetry.version", "2.1.0")
+    assert result == DOCUMENT.replace("'2.0.0'", "'2.1.0'")
+
+
+def test_replace_string_dotted_key():
+    result = replace_string(
+        '[tool]\npoetry.version = "1.0.0"\n', "tool.poetry.version", "2.0.0"
+    )
+    assert result == '[tool]\npoetry.version = "2.0.0"\n'
+
+
+def test_replace_string_not_found():
+    with pytest.raises(ValueError, match="Key not found"):
+        replace_string(DOCUMENT, "tool.missing.version", "1.0.0")
+
+
+def test_replace_string_split_table():
+    # A sub-table before the table itself, with another table in between:
+    document = (
+        '[project.urls]\nhome = "https://example.com"\n\n'
+        '[tool.x]\nversion = "0.0.0"\n\n'
+        '[project]\nname = "pkg"\nversion = "1.0.0"\n'
+    )
+    assert get_string(document, "project.version") == "1.0.0"
+    result = replace_string(document, "project.version", "1.1.0")
+    assert result == document.replace('"1.0.0"', '"1.1.0"')
@@ -0,0 +1,225 @@
+import pathlib
+import pytest
+import re
+from typer.testing import CliRunner
+
+from artisan_tools.version import workspace
+from artisan_tools.version.cli import factory
+from artisan_tools.vcs.main import run_git_command
+
+runner = CliRunner()
+
+
+@pytest.fixture()
+def app_with_workspace(app_with_repo):
+    """
+    App with a workspace of three packages.
+    """
+    app = app_with_repo
+    for path in ["packages/a", "packages/b", "tools/c"]:
+        package = pathlib.Path(path)
+        package.mkdir(parents=True)
+        (package / "RELEASE").write_text("1.0.0\n")
+        (package / "VERSION").write_text("1.0.0\n")
+    (package / "pyproject.toml").write_text('[project]\nversion = "1.0.0"\n')
+    app.config["workspace"]["packages"] = [
+        "packages/*",
+        {
+            "name": "c",
+            "path": "tools/c",
+            "bump-hooks": [
+                {"method": "pyproject_replace", "file_path": "pyproject.toml"}
+            ],
+        },
+    ]
+    return app
+
+
+def test_get_packages(app_with_workspace):
+    packages = workspace.get_packages(app_with_workspace)
+    assert [p["name"] for p in packages] == ["packages/a", "packages/b", "c"]
+    assert packages[2]["release"] == "tools/c/RELEASE"
+
+
+def test_get_packages_filtered(app_with_workspace):
+    packages = workspace.get_packages(app_with_workspace, ["packages/*"])
+    assert [p["name"] for p in packages] == ["packages/a", "packages/b"]
+
+
+def test_get_packages_no_match(app_with_workspace):
+    with pytest.raises(ValueError, match="No packages"):
+        workspace.get_packages(app_with_workspace, ["nothing"])
+
+
+def test_get_packages_not_configured(app_with_config):
+    with pytest.raises(ValueError, match="No packages configured"):
+        workspace.get_packages(app_with_config)
+
+
+def test_bump(app_with_workspace):
+    versions = workspace.bump(app_with_workspace, "minor", ["c", "packages/a"])
+
+    assert versions == {"packages/a": "1.1.0", "c": "1.1.0"}
+    with open("packages/b/RELEASE") as f:
+        assert f.read() == "1.0.0\n"
+    # Hook path is relative to the package:
+    with open("tools/c/pyproject.toml") as f:
+        assert f.read() == '[project]\nversion = "1.1.0"\n'
+
+
+def test_update(app_with_workspace):
+    versions = workspace.update(app_with_workspace)
+
+    assert len(versions) == 3
+    for version in versions.values():
+        assert re.match(r"^1.0.0\+master\-\w{7}-dirty$", version)
+
+
+def test_verify(app_with_workspace):
+    with open("packages/b/VERSION", "w") as f:
+        f.write("1.0.0-rc1")
+
+    errors = workspace.verify(app_with_workspace)
+
+    assert errors == {
+        "packages/a": None,
+        "packages/b": "Invalid semver version: 1.0.0-rc1.",
+        "c": None,
+    }
+
+
+def test_render_tag(app_with_workspace):
+    package = workspace.get_packages(app_with_workspace, ["c"])[0]
+    assert workspace.render_tag(package, "1.0.0") == "c/v1.0.0"
+
+
+def test_cli_bump_all(app_with_workspace):
+    result = runner.invoke(
+        factory(app_with_workspace), ["bump", "patch", "--all"], catch_exceptions=False
+    )
+
+    assert result.exit_code == 0, result.stdout
+    assert "c: Version bumped to 1.0.1" in result.stdout
+
+
+def test_cli_get_package(app_with_workspace):
+    result = runner.invoke(
+        factory(app_with_workspace), ["get", "-p", "c"], catch_exceptions=False
+    )
+
+    assert result.exit_code == 0, result.stdout
+    assert result.stdout == "c 1.0.0\n"
+
+
+def test_path_trie():
+    trie = workspace.PathTrie()
+    trie.insert("packages/a", "a")
+    trie.insert("packages/a/nested", "nested")
+    trie.insert("./tools/", "tools")
+
+    assert trie.longest_prefix("packages/a/file.txt") == "a"
+    assert trie.longest_prefix("packages/a/nested/file.txt") == "nested"
+    assert trie.longest_prefix("tools/c/file.txt") == "tools"
+    assert trie.longest_prefix("packages/b/file.txt") is None
+    assert trie.longest_prefix("packages") is None
+
+
+def test_last_release_tag():
+    package = {"name": "a", "tag": "@name/v@version"}
+    tags = sorted(["a/v1.2.0", "a/v1.10.0", "a/v2.0.0-rc1", "ab/v3.0.0", "v9.0.0"])
+
+    assert workspace.last_release_tag(package, tags) == "a/v1.10.0"
+    assert workspace.last_release_tag({**package, "name": "b"}, tags) is None
+
+
+def test_bump_changed_only(app_with_workspace):
+    git_options = '-c user.name="at" -c user.email="at@at.com"'
+    run_git_command("add .")
+    run_git_command(f"{git_options} commit -m 'Add packages'")
+    run_git_command("tag packages/a/v1.0.0")
+    run_git_command("tag c/v1.0.0")
+    pathlib.Path("tools/c/file.txt").write_text("change")
+    run_git_command("add .")
+    run_git_command(f"{git_options} commit -m 'Change c'")
+
+    versions = workspace.bump(app_with_workspace, "patch", changed_only=True)
+
+    # packages/b has no release tag and is always bumped:
+    assert versions == {"packages/b": "1.0.1", "c": "1.0.1"}
+
+
+def test_changed_packages_nested(app_with_workspace):
+    app = app_with_workspace
+    nested = pathlib.Path("tools/c/sub")
+    nested.mkdir()
+    (nested / "RELEASE").write_text("1.0.0\n")
+    (nested / "VERSION").write_text("1.0.0\n")
+    app.config["workspace"]["packages"].append({"name": "d", "path": "tools/c/sub"})
+    git_options = '-c user.name="at" -c user.email="at@at.com"'
+    run_git_command("add .")
+    run_git_command(f"{git_options} commit -m 'Add packages'")
+    run_git_command("tag c/v1.0.0")
+    (nested / "file.txt").write_text("change")
+    run_git_command("add .")
+    run_git_command(f"{git_options} commit -m 'Change d'")
+    run_git_command("tag d/v1.0.1")
+
+    packages = workspace.get_packages(app)
+    changed = workspace.changed_packages(app, packages)
+
+    # The change since c/v1.0.0 belongs to d, which is released:
+    assert [p["name"] for p in changed] == ["packages/a", "packages/b"]
+
+
+def test_changed_packages_subdirectory(app_with_repo, monkeypatch):
+    app = app_with_repo
+    # The configuration is in a subdirectory of the repository:
+    project = pathlib.Path("project")
+    for path in ["packages/a", "packages/b"]:
+        (project / path).mkdir(parents=True)
+        (project / path / "VERSION").write_text("1.0.0\n")
+    monkeypatch.chdir(project)
+    app.config["workspace"]["packages"] = ["packages/*"]
+    git_options = '-c user.name="at" -c user.email="at@at.com"'
+    run_git_command("add .")
+    run_git_command(f"{git_options} commit -m 'Add packages'")
+    run_git_command("tag packages/a/v1.0.0")
+    run_git_command("tag packages/b/v1.0.0")
+    pathlib.Path("packages/b/file.txt").write_text("change")
+    run_git_command("add .")
+    run_git_command(f"{git_options} commit -m 'Change b'")
+
+    changed = workspace.changed_packages(app, workspace.get_packages(app))
+
+    assert [p["name"] for p in changed] == ["packages/b"]
+
+
+def test_cli_bump_changed_only_nothing_changed(app_with_workspace):
+    run_git_command("add .")
+    run_git_command('-c user.name="at" -c user.email="at@at.com" commit -m "Add"')
+    for tag in ["packages/a/v1.0.0", "packages/b/v1.0.0", "c/v1.0.0"]:
+        run_git_command(f"tag {tag}")
+
+    result = runner.invoke(
+        factory(app_with_workspace),
+        ["bump", "patch", "--changed-only"],
+        catch_exceptions=False,
+    )
+
+    assert result.exit_code == 0, result.stdout
+    assert "No changed packages to bump." in result.stdout
+
+
+def test_bump_auto(app_with_workspace):
+    git_options = '-c user.name="at" -c user.email="at@at.com"'
+    run_git_command("add .")
+    run_git_command(f"{git_options} commit -m 'feat: add packages'")
+    run_git_command("tag c/v1.0.0")
+    pathlib.Path("tools/c/file.txt").write_text("change")
+    run_git_command("add .")
+    run_git_command(f"{git_options} commit -m 'fix: change c'")
+
+    versions = workspace.bump(app_with_workspace, "auto")
+
+    # Packages without release include the feat commit:
+    assert versions == {"packages/a": "1.1.0", "packages/b": "1.1.0", "c": "1.0.1"}
@@ -0,0 +1,23 @@
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+
+@pytest.fixture
+def app_factory(tmp_path, monkeypatch):
+    """
+    Fixture for creating an Artisan Tools app in a temporary directory.
+
+    The returned factory takes the contents of artisan.yaml.
+    """
+    monkeypatch.chdir(tmp_path)
+
+    def factory(config: str = ""):
+        from artisan_tools.app import App
+
+        (tmp_path / "artisan.yaml").write_text(config)
+        app = App()
+        app.load_extensions()
+        return app
+
+    return factory
@@ -0,0 +1,40 @@
+import os
+import subprocess
+import sys
+
+STEPS = [
+    "version bump 1.0.1",
+    "version update --release",
+    "version verify",
+    "version get",
+]
+
+
+def run_cli(*args):
+    env = {**os.environ, "ARTISAN_NO_DAEMON": "1"}
+    command = [sys.executable, "-m", "artisan_tools.cli", *args]
+    subprocess.run(command, check=True, capture_output=True, env=env)
+
+
+def create_project(app_factory):
+    app_factory("")
+    with open("RELEASE", "w") as f:
+        f.write("1.0.0")
+    with open("VERSION", "w") as f:
+        f.write("1.0.0")
+
+
+def test_bench_separate_processes(benchmark, app_factory):
+    create_project(app_factory)
+
+    def run_separately():
+        for step in STEPS:
+            run_cli(*step.split())
+
+    benchmark.pedantic(run_separately, rounds=3)
+
+
+def test_bench_batch(benchmark, app_factory):
+    create_project(app_factory)
+
+    benchmark.pedantic(run_cli, args=("run", *STEPS), rounds=3)
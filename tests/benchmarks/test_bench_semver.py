@@ -0,0 +1,37 @@
+import random
+
+from artisan_tools.version.main import check_version
+from artisan_tools.version.semantic import sort_key
+
+VERSIONS = 1_000_000
+
+
+def generate_versions(count: int) -> list[str]:
+    """
+    Generate a reproducible mix of release, prerelease and build versions.
+    """
+    rng = random.Random(42)
+    suffixes = ["", "", "", "-rc.1", "-alpha", "-beta.11", "+build.7", "-rc.2+b"]
+    return [
+        f"{rng.randrange(20)}.{rng.randrange(50)}.{rng.randrange(100)}"
+        f"{rng.choice(suffixes)}"
+        for _ in range(count)
+    ]
+
+
+def test_bench_validate_versions(benchmark):
+    versions = generate_versions(VERSIONS)
+
+    valid = benchmark.pedantic(
+        lambda: sum(check_version(v, release=False) for v in versions), rounds=1
+    )
+
+    assert valid == VERSIONS
+
+
+def test_bench_sort_versions(benchmark):
+    versions = generate_versions(VERSIONS)
+
+    ordered = benchmark.pedantic(sorted, args=(versions,), kwargs={"key": sort_key})
+
+    assert sort_key(ordered[0]) <= sort_key(ordered[-1])
@@ -0,0 +1,42 @@
+"""
+Start-up time budgets for key commands.
+
+Commands are run in a new interpreter without the daemon. Budgets can be
+scaled for slow machines with ARTISAN_STARTUP_BUDGET_SCALE.
+"""
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+SCALE = float(os.environ.get("ARTISAN_STARTUP_BUDGET_SCALE", "1"))
+
+# Budgets in seconds:
+BUDGETS = {
+    "--version": 0.6,
+    "version get": 0.6,
+    "version verify": 0.6,
+    "--help": 0.8,
+}
+
+
+@pytest.mark.parametrize("command", BUDGETS)
+def test_bench_startup(benchmark, app_factory, command):
+    app_factory("")
+    with open("VERSION", "w") as f:
+        f.write("1.0.0")
+    env = {**os.environ, "ARTISAN_NO_DAEMON": "1"}
+
+    def run():
+        subprocess.run(
+            [sys.executable, "-m", "artisan_tools.cli", *command.split()],
+            check=True,
+            capture_output=True,
+            env=env,
+        )
+
+    benchmark.pedantic(run, rounds=5, warmup_rounds=1)
+
+    assert benchmark.stats.stats.median < BUDGETS[command] * SCALE
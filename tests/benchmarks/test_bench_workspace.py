@@ -0,0 +1,66 @@
+import pathlib
+import yaml
+
+from artisan_tools.version import workspace
+
+PACKAGES = 500
+
+
+def create_workspace(packages: int) -> str:
+    """
+    Generate a workspace with a pyproject.toml bump hook for each package.
+
+    Returns the configuration for artisan.yaml.
+    """
+    entries = []
+    for index in range(packages):
+        package = pathlib.Path("packages") / f"package-{index:04d}"
+        package.mkdir(parents=True)
+        (package / "RELEASE").write_text("1.0.0\n")
+        (package / "pyproject.toml").write_text(
+            f'[project]\nname = "package-{index:04d}"\nversion = "1.0.0"\n'
+        )
+        entries.append(
+            {
+                "path": str(package),
+                "bump-hooks": [
+                    {"method": "pyproject_replace", "file_path": "pyproject.toml"}
+                ],
+            }
+        )
+    return yaml.dump({"workspace": {"packages": entries}})
+
+
+def test_bench_workspace_bump(benchmark, app_factory):
+    app = app_factory(create_workspace(PACKAGES))
+
+    versions = benchmark.pedantic(workspace.bump, args=(app, "2.0.0"), rounds=5)
+
+    assert len(versions) == PACKAGES
+
+
+def test_bench_workspace_update(benchmark, app_factory):
+    app = app_factory(create_workspace(PACKAGES))
+
+    versions = benchmark.pedantic(
+        workspace.update, args=(app,), kwargs={"release": True}, rounds=5
+    )
+
+    assert len(versions) == PACKAGES
+
+
+def test_bench_path_trie_changed_files(benchmark):
+    trie = workspace.PathTrie()
+    for index in range(PACKAGES):
+        trie.insert(f"packages/package-{index:04d}", index)
+    changed_files = [
+        f"packages/package-{index % 700:04d}/src/module_{index}/file.py"
+        for index in range(50_000)
+    ]
+
+    def map_files():
+        return {trie.longest_prefix(path) for path in changed_files}
+
+    changed = benchmark(map_files)
+
+    assert len(changed) == PACKAGES + 1  # Files outside packages map to None